@@ -1,9 +1,24 @@
 import os
-import exifread
+import logging
+from bisect import bisect_left
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
+from pdfmoificador import trazas, renombrado
+from pdfmoificador.vigilante_carpeta import VigilanteCarpeta
+from pdfmoificador.metadata_catalog import MetadataCatalog
+from pdfmoificador.metadata_index import MetadataIndex
+from pdfmoificador.metadata_reader import IMAGE_EXTENSIONS, read_metadata, read_metadata_batch
+from pdfmoificador.image_previews import PreviewCache
+from pdfmoificador.similares import IndicePerceptual, listar_archivos
+from planificador import PlanificadorRender
+from tiled_viewer import TiledImageViewer
+
+# Imágenes por trabajo del pool; cada lote llega junto a la lista
+METADATA_BATCH_SIZE = 64
+# Espera tras la última tecla antes de filtrar
+FILTER_DEBOUNCE_MS = 200
 
 
 class ImageMetadataApp:
@@ -13,6 +28,9 @@ class ImageMetadataApp:
         self.root.geometry("1920x1080")
         self.root.resizable(True, True)
 
+        # Log con rotación; incluye las trazas de tiempos de cada etapa
+        trazas.configurar_log("image_metadata.log")
+
         # Carpeta inicial
         self.current_folder = "./image_folder"
         os.makedirs(self.current_folder, exist_ok=True)
@@ -23,6 +41,34 @@ class ImageMetadataApp:
         self.image_list = []
         self.metadata_list = []
         self.filtered_metadata_list = []
+        self.metadata_by_path = {}
+        self.filter_applied = False
+
+        # Índice en memoria para filtrar mientras se escribe; se actualiza en cada alta, baja o renombrado
+        self.metadata_index = MetadataIndex()
+        self.filter_job = None
+        self.index_job = None
+
+        # Catálogo persistente: sólo se vuelve a leer el EXIF de archivos nuevos o modificados
+        self.catalog = MetadataCatalog()
+
+        # Vistas previas de 400 px en caché (memoria y disco), precargadas por página
+        self.previews = PreviewCache()
+
+        # Hashes perceptuales en caché para encontrar la misma factura fotografiada o escaneada
+        self.perceptual_index = IndicePerceptual()
+
+        # Lectura del EXIF en un pool de procesos; los lotes llegan a la interfaz por el planificador
+        # y al cambiar de carpeta se descarta lo que quedaba de la anterior
+        self.metadata_pool = None
+        self.scheduler = PlanificadorRender(self.root)
+        self.pending_paths = set()
+        self.loaded_count = 0
+        self.total_to_load = 0
+
+        # Vigilar la carpeta: renombrados y archivos nuevos se corrigen en el lugar, sin recargar todo
+        self.folder_watcher = None
+        self.watch_interval_ms = 1000
 
         # Configuración del Grid
         self.root.grid_columnconfigure(0, weight=1)
@@ -41,6 +87,11 @@ class ImageMetadataApp:
         self.select_folder_button = ttk.Button(self.top_frame, text="Seleccionar Carpeta", command=self.select_folder)
         self.select_folder_button.grid(row=0, column=1, sticky="e", padx=5)
 
+        self.progress_bar = ttk.Progressbar(self.top_frame, mode="determinate", length=200)
+        self.progress_bar.grid(row=1, column=0, sticky="w", padx=5)
+        self.progress_label = ttk.Label(self.top_frame, text="")
+        self.progress_label.grid(row=1, column=1, sticky="e", padx=5)
+
         # Frame para los filtros
         self.filter_frame = tk.Frame(self.root, relief=tk.GROOVE, borderwidth=1)
         self.filter_frame.grid(row=1, column=0, sticky="ns", padx=10, pady=10)
@@ -55,8 +106,8 @@ class ImageMetadataApp:
 
         self.invoice_label = ttk.Label(self.filter_frame, text="Comprobante:")
         self.invoice_label.grid(row=2, column=0, sticky="w", padx=5, pady=5)
-        self.invoice_entry = ttk.Entry(self.filter_frame)
-        self.invoice_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=5)
+        self.invoice_filter_entry = ttk.Entry(self.filter_frame)
+        self.invoice_filter_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=5)
 
         self.date_label = ttk.Label(self.filter_frame, text="Fecha (YYYY-MM-DD):")
         self.date_label.grid(row=3, column=0, sticky="w", padx=5, pady=5)
@@ -65,12 +116,19 @@ class ImageMetadataApp:
         self.end_date_entry = ttk.Entry(self.filter_frame, width=10)
         self.end_date_entry.grid(row=3, column=1, sticky="e", padx=5, pady=5)
 
+        # Filtrar mientras se escribe
+        for entry in (self.name_entry, self.invoice_filter_entry, self.start_date_entry, self.end_date_entry):
+            entry.bind("<KeyRelease>", self.schedule_filter)
+
         self.search_button = ttk.Button(self.filter_frame, text="Buscar", command=self.search_images)
         self.search_button.grid(row=4, column=0, columnspan=2, pady=10)
 
         self.clear_search_button = ttk.Button(self.filter_frame, text="Limpiar Filtros", command=self.clear_search)
         self.clear_search_button.grid(row=5, column=0, columnspan=2, pady=10)
 
+        self.similar_button = ttk.Button(self.filter_frame, text="Buscar Similares", command=self.find_similar)
+        self.similar_button.grid(row=6, column=0, columnspan=2, pady=10)
+
         # Frame principal para las imágenes y su scroll
         self.main_frame = tk.Frame(self.root)
         self.main_frame.grid(row=1, column=1, sticky="nsew", padx=10, pady=10)
@@ -142,6 +200,19 @@ class ImageMetadataApp:
 
         # Cargar imágenes iniciales
         self.load_images()
+        self.root.after(self.watch_interval_ms, self.check_folder_changes)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.scheduler.nueva_generacion()
+        if self.metadata_pool is not None:
+            self.metadata_pool.shutdown(wait=False, cancel_futures=True)
+        if self.folder_watcher:
+            self.folder_watcher.cerrar()
+        self.catalog.close()
+        self.previews.close()
+        self.perceptual_index.cerrar()
+        self.root.destroy()
 
     def select_folder(self):
         folder = filedialog.askdirectory(title="Seleccionar Carpeta")
@@ -151,21 +222,211 @@ class ImageMetadataApp:
             self.load_images()
 
     def load_images(self):
+        # Lo que quedaba de la carpeta anterior se cancela o se descarta al llegar
+        self.scheduler.nueva_generacion()
+        if self.folder_watcher:
+            self.folder_watcher.cerrar()
+        self.folder_watcher = VigilanteCarpeta(self.current_folder, IMAGE_EXTENSIONS)
         self.image_list = [
             os.path.join(self.current_folder, file)
-            for file in os.listdir(self.current_folder)
-            if file.lower().endswith((".jpg", ".jpeg", ".png", ".jfif"))
+            for file in sorted(self.folder_watcher.nombres())
         ]
-        self.metadata_list = [self.extract_metadata(image) for image in self.image_list]
+
+        # Lo vigente en el catálogo se muestra enseguida; el resto se lee en el pool
+        with trazas.tramo("imagen.catalogo", carpeta=self.current_folder, archivos=len(self.image_list)):
+            self.metadata_list, stale = self.catalog.stale_paths(self.image_list)
+        self.metadata_by_path = {md["file_path"]: md for md in self.metadata_list}
+        self.metadata_index.build(self.metadata_list)
+        if self.index_job is None:
+            self.index_job = self.root.after(1, self.index_metadata_step)
         self.filtered_metadata_list = self.metadata_list.copy()
+        self.filter_applied = False
+        self.current_page = 0
         self.update_listbox()
 
+        self.pending_paths = set(stale)
+        self.loaded_count = 0
+        self.total_to_load = len(stale)
+        self.update_progress()
+        if not stale:
+            return
+
+        if self.metadata_pool is None:
+            self.metadata_pool = ProcessPoolExecutor()
+        futures = [
+            self.metadata_pool.submit(read_metadata_batch, stale[i:i + METADATA_BATCH_SIZE])
+            for i in range(0, len(stale), METADATA_BATCH_SIZE)
+        ]
+        self.scheduler.enviar(futures, self.add_loaded_metadata)
+
+    def add_loaded_metadata(self, batch):
+        """
+        Incorpora un lote leído en el pool (se llama desde el hilo de Tk).
+        """
+        self.loaded_count += len(batch)
+        self.update_progress()
+        trazas.registrar_tiempos(batch)
+
+        # El vigilante pudo haber tocado alguno de estos archivos mientras se leían
+        batch = [md for md in batch if md["file_path"] in self.pending_paths]
+        if not batch:
+            return
+        self.catalog.store(batch)
+
+        first_index = len(self.metadata_list)
+        for metadata in batch:
+            self.pending_paths.discard(metadata["file_path"])
+            first_index = min(first_index, self.insert_metadata(metadata))
+        if self.filter_applied:
+            # Con un filtro activo se vuelve a consultar el índice, sin cambiar de página
+            self.run_filter(show_errors=False)
+            self.update_listbox()
+            return
+
+        self.filtered_metadata_list = self.metadata_list.copy()
+        # Redibujar la lista sólo si el lote cae en la página que se está viendo
+        # (así no se pierde la selección mientras siguen llegando lotes)
+        end = (self.current_page + 1) * self.page_size
+        if first_index < end:
+            self.update_listbox()
+        else:
+            self.next_button.config(state=tk.NORMAL if end < len(self.filtered_metadata_list) else tk.DISABLED)
+
+    def index_metadata_step(self):
+        # Indexar en tandas cortas para no congelar la interfaz con carpetas grandes
+        if self.metadata_index.index_pending(budget_ms=15):
+            self.index_job = self.root.after(30, self.index_metadata_step)
+        else:
+            self.index_job = None
+
+    def update_progress(self):
+        total = self.total_to_load
+        done = min(self.loaded_count, total)
+        self.progress_bar.config(maximum=max(total, 1), value=done)
+        self.progress_label.config(text=f"Leyendo metadata: {done}/{total}" if done < total else "")
+
+    def check_folder_changes(self):
+        try:
+            if self.folder_watcher:
+                events = self.folder_watcher.sondear()
+                if events:
+                    self.apply_folder_changes(events)
+        except Exception as e:
+            logging.error(f"Error al aplicar los cambios de la carpeta: {e}")
+        finally:
+            # Un error no puede dejar la carpeta sin vigilar por el resto de la sesión
+            self.root.after(self.watch_interval_ms, self.check_folder_changes)
+
+    def apply_folder_changes(self, events):
+        # Sólo se tocan los archivos de cada evento; el resto no se vuelve a leer
+        for event in events:
+            old_path = os.path.join(self.current_folder, event.nombre)
+            # Si todavía se estaba leyendo en el pool, el evento tiene prioridad
+            self.pending_paths.discard(old_path)
+            if event.tipo == "eliminado":
+                self.previews.invalidate(old_path)
+                self.remove_metadata(old_path)
+            elif event.tipo == "renombrado":
+                new_path = os.path.join(self.current_folder, event.nombre_nuevo)
+                self.pending_paths.discard(new_path)
+                self.previews.invalidate(old_path)
+                metadata = self.metadata_by_path.get(old_path)
+                if metadata is None:
+                    # Ya está en new_path si lo renombró la propia aplicación (rename_file)
+                    if new_path not in self.metadata_by_path:
+                        self.add_metadata(new_path)
+                    continue
+                # Si el destino era otro archivo, el renombre lo reemplazó
+                self.previews.invalidate(new_path)
+                self.remove_metadata(new_path)
+                self.move_metadata(metadata, new_path)
+            elif event.tipo == "agregado":
+                self.previews.invalidate(old_path)
+                self.remove_metadata(old_path)
+                self.add_metadata(old_path)
+            elif event.tipo == "modificado":
+                self.previews.invalidate(old_path)
+                metadata = self.metadata_by_path.get(old_path)
+                if metadata is None:
+                    self.add_metadata(old_path)
+                else:
+                    metadata.update(self.extract_metadata(old_path))
+                    self.metadata_index.reindex(metadata)
+                    self.catalog.store([metadata])
+        self.update_listbox()
+
+    def add_metadata(self, image_path):
+        metadata = self.catalog.load([image_path], self.extract_metadata)
+        if not metadata:
+            return
+        metadata = metadata[0]
+        self.insert_metadata(metadata)
+        if not self.filter_applied:
+            self.insert_filtered(metadata)
+
+    def insert_metadata(self, metadata):
+        """
+        Agrega la entrada a la lista (ordenada por ruta), al diccionario y al índice.
+        Devuelve la posición en la que quedó.
+        """
+        self.metadata_by_path[metadata["file_path"]] = metadata
+        self.metadata_index.add(metadata)
+        index = bisect_left(self.metadata_list, metadata["file_path"], key=lambda md: md["file_path"])
+        self.metadata_list.insert(index, metadata)
+        return index
+
+    @staticmethod
+    def remove_sorted(entries, metadata):
+        """
+        Quita la entrada de una lista ordenada por ruta. Devuelve si estaba.
+        """
+        index = bisect_left(entries, metadata["file_path"], key=lambda md: md["file_path"])
+        if index < len(entries) and entries[index] is metadata:
+            del entries[index]
+            return True
+        return False
+
+    def insert_filtered(self, metadata):
+        # La lista filtrada también está ordenada por ruta (ver MetadataIndex.search)
+        index = bisect_left(self.filtered_metadata_list, metadata["file_path"], key=lambda md: md["file_path"])
+        self.filtered_metadata_list.insert(index, metadata)
+
+    def move_metadata(self, metadata, new_path):
+        """
+        Cambia la ruta de una entrada renombrada y la reubica en las listas, que
+        tienen que seguir ordenadas por ruta para las búsquedas con bisect.
+        Conserva si estaba o no en la lista filtrada.
+        """
+        old_path = metadata["file_path"]
+        self.metadata_by_path.pop(old_path, None)
+        self.remove_sorted(self.metadata_list, metadata)
+        self.metadata_index.remove(metadata)
+        filtered = self.remove_sorted(self.filtered_metadata_list, metadata)
+        metadata["file_name"] = os.path.basename(new_path)
+        metadata["file_path"] = new_path
+        self.insert_metadata(metadata)
+        if filtered:
+            self.insert_filtered(metadata)
+        self.catalog.rename(old_path, new_path)
+
+    def remove_metadata(self, image_path):
+        self.catalog.remove(image_path)
+        metadata = self.metadata_by_path.pop(image_path, None)
+        if metadata is None:
+            return
+        self.remove_sorted(self.metadata_list, metadata)
+        self.metadata_index.remove(metadata)
+        self.remove_sorted(self.filtered_metadata_list, metadata)
+
     def update_listbox(self):
         self.image_listbox.delete(0, tk.END)
         start = self.current_page * self.page_size
         end = start + self.page_size
-        for metadata in self.filtered_metadata_list[start:end]:
+        page = self.filtered_metadata_list[start:end]
+        for metadata in page:
             self.image_listbox.insert(tk.END, metadata["file_name"])
+        # Dejar listas las vistas previas de la página para navegar con las flechas sin esperas
+        self.previews.prefetch([metadata["file_path"] for metadata in page])
         self.previous_button.config(state=tk.NORMAL if self.current_page > 0 else tk.DISABLED)
         self.next_button.config(state=tk.NORMAL if end < len(self.filtered_metadata_list) else tk.DISABLED)
 
@@ -180,46 +441,115 @@ class ImageMetadataApp:
             self.update_listbox()
 
     def search_images(self):
-        name_query = self.name_entry.get().lower()
-        invoice_query = self.invoice_entry.get().lower()
-        start_date = self.start_date_entry.get()
-        end_date = self.end_date_entry.get()
+        if self.filter_job:
+            self.root.after_cancel(self.filter_job)
+            self.filter_job = None
+        if self.run_filter(show_errors=True):
+            self.current_page = 0
+            self.update_listbox()
 
-        self.filtered_metadata_list = self.metadata_list
+    def schedule_filter(self, event=None):
+        # Reiniciar la espera con cada tecla: se filtra cuando el usuario hace una pausa
+        if self.filter_job:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(FILTER_DEBOUNCE_MS, self.live_filter)
 
-        if name_query:
-            self.filtered_metadata_list = [
-                md for md in self.filtered_metadata_list if name_query in md["file_name"].lower()
-            ]
+    def live_filter(self):
+        self.filter_job = None
+        self.run_filter(show_errors=False)
+        self.current_page = 0
+        self.update_listbox()
 
-        if invoice_query:
-            self.filtered_metadata_list = [
-                md for md in self.filtered_metadata_list if md["invoice_number"] and invoice_query in md["invoice_number"].lower()
-            ]
+    def run_filter(self, show_errors):
+        """
+        Actualiza `filtered_metadata_list` consultando el índice.
+        Mientras se escribe, una fecha incompleta simplemente no filtra; con el botón
+        Buscar se avisa el error. Devuelve False si no se aplicó.
+        """
+        name_query = self.name_entry.get().strip()
+        invoice_query = self.invoice_filter_entry.get().strip()
+        start_date = self.start_date_entry.get().strip()
+        end_date = self.end_date_entry.get().strip()
 
         if start_date and end_date:
             try:
                 start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
                 end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-                self.filtered_metadata_list = [
-                    md for md in self.filtered_metadata_list if md["issue_date"] and start_date <= md["issue_date"] <= end_date
-                ]
             except ValueError:
-                messagebox.showerror("Error", "Las fechas deben estar en formato YYYY-MM-DD.")
-                return
-
-        self.current_page = 0
-        self.update_listbox()
+                if show_errors:
+                    messagebox.showerror("Error", "Las fechas deben estar en formato YYYY-MM-DD.")
+                    return False
+                start_date = end_date = None
+        else:
+            start_date = end_date = None
+
+        if not (name_query or invoice_query or start_date):
+            self.filtered_metadata_list = self.metadata_list.copy()
+            self.filter_applied = False
+            return True
+
+        self.filtered_metadata_list = self.metadata_index.search(name_query, invoice_query, start_date, end_date)
+        self.filter_applied = True
+        return True
 
     def clear_search(self):
+        if self.filter_job:
+            self.root.after_cancel(self.filter_job)
+            self.filter_job = None
         self.name_entry.delete(0, tk.END)
-        self.invoice_entry.delete(0, tk.END)
+        self.invoice_filter_entry.delete(0, tk.END)
         self.start_date_entry.delete(0, tk.END)
         self.end_date_entry.delete(0, tk.END)
         self.filtered_metadata_list = self.metadata_list.copy()
+        self.filter_applied = False
         self.current_page = 0
         self.update_listbox()
 
+    def find_similar(self):
+        """
+        Agrupa imágenes y PDFs que probablemente son la misma factura (foto, escaneo
+        o copia recomprimida). Se puede sumar otra carpeta, por ejemplo la de los PDFs.
+        """
+        folders = [self.current_folder]
+        extra_folder = filedialog.askdirectory(title="Carpeta adicional para comparar (opcional)")
+        if extra_folder and os.path.abspath(extra_folder) != os.path.abspath(self.current_folder):
+            folders.append(extra_folder)
+
+        try:
+            paths = [path for folder in folders for path in listar_archivos(folder)]
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo leer la carpeta: {e}")
+            return
+
+        self.similar_button.config(state=tk.DISABLED)
+        self.progress_label.config(text=f"Comparando {len(paths)} archivos...")
+        pool = ThreadPoolExecutor(max_workers=1)
+        future = pool.submit(self.perceptual_index.agrupar, paths)
+        pool.shutdown(wait=False)
+        self.root.after(200, self.show_similar, future)
+
+    def show_similar(self, future):
+        if not future.done():
+            self.root.after(200, self.show_similar, future)
+            return
+        self.similar_button.config(state=tk.NORMAL)
+        self.progress_label.config(text="")
+        try:
+            groups = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron comparar los archivos: {e}")
+            return
+        if not groups:
+            messagebox.showinfo("Similares", "No se encontraron archivos parecidos.")
+            return
+
+        lines = []
+        for group in groups[:15]:
+            lines.append(" = ".join(os.path.basename(path) for path in group))
+        if len(groups) > 15:
+            lines.append(f"... y {len(groups) - 15} grupos más")
+        messagebox.showinfo("Similares", f"{len(groups)} grupos de archivos parecidos:\n\n" + "\n".join(lines))
+
     def display_image(self, event):
         selection = self.image_listbox.curselection()
         if not selection:
@@ -228,9 +558,14 @@ class ImageMetadataApp:
         metadata = self.filtered_metadata_list[index]
 
         image_path = metadata["file_path"]
-        image = Image.open(image_path)
-        image.thumbnail((400, 400))
-        image_tk = ImageTk.PhotoImage(image)
+        try:
+            with trazas.tramo("imagen.decodificar", archivo=image_path):
+                data = self.previews.load(image_path)
+            with trazas.tramo("imagen.convertir", archivo=image_path):
+                image_tk = tk.PhotoImage(data=data)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir la imagen: {e}")
+            return
         self.image_label.configure(image=image_tk)
         self.image_label.image = image_tk
         self.image_label.image_path = image_path
@@ -261,38 +596,32 @@ class ImageMetadataApp:
         new_file_path = os.path.join(self.current_folder, new_name)
 
         try:
-            os.rename(current_file_path, new_file_path)
+            # Por el diario de renombres, igual que los lotes del visor de PDFs, así se puede deshacer
+            journal = renombrado.crear_lote([(current_file_path, new_file_path)], renombrado.DIRECTORIO_IMAGENES)
+            done, errors = renombrado.aplicar_lote(journal)
+            if errors:
+                raise OSError(errors[0][1])
+            if not done:
+                return
+            # Si el nombre ya existía, el diario le agregó _1, _2, ...
+            new_file_path = done[0][1]
+            new_name = os.path.basename(new_file_path)
             messagebox.showinfo("Éxito", "El archivo se renombró correctamente.")
-            self.load_images()
+            # Corregir la entrada renombrada en el lugar en vez de recargar toda la carpeta
+            metadata = self.metadata_by_path.get(current_file_path)
+            if metadata is not None:
+                if new_name.lower().endswith(IMAGE_EXTENSIONS):
+                    self.move_metadata(metadata, new_file_path)
+                    self.previews.invalidate(current_file_path)
+                else:
+                    self.remove_metadata(current_file_path)
+            self.image_label.image_path = new_file_path
+            self.update_listbox()
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo renombrar el archivo: {e}")
 
     def extract_metadata(self, image_path):
-        try:
-            with open(image_path, 'rb') as img_file:
-                tags = exifread.process_file(img_file)
-                issue_date = tags.get("EXIF DateTimeOriginal")
-                invoice_number = tags.get("InvoiceNumber")
-                reason_social = tags.get("ReasonSocial")
-
-                if issue_date:
-                    issue_date = datetime.strptime(issue_date.values, "%Y:%m:%d %H:%M:%S").date()
-
-                return {
-                    "file_name": os.path.basename(image_path),
-                    "file_path": image_path,
-                    "issue_date": issue_date,
-                    "invoice_number": invoice_number.values if invoice_number else None,
-                    "reason_social": reason_social.values if reason_social else None,
-                }
-        except Exception:
-            return {
-                "file_name": os.path.basename(image_path),
-                "file_path": image_path,
-                "issue_date": None,
-                "invoice_number": None,
-                "reason_social": None,
-            }
+        return read_metadata(image_path)
 
     def show_large_image(self, event):
         image_path = self.image_label.image_path
@@ -305,25 +634,9 @@ class ImageMetadataApp:
             top.geometry("800x600")
             top.resizable(True, True)
 
-            frame = tk.Frame(top)
-            frame.pack(fill=tk.BOTH, expand=True)
-
-            canvas = tk.Canvas(frame, bg="black")
-            canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-            x_scroll = tk.Scrollbar(frame, orient=tk.HORIZONTAL, command=canvas.xview)
-            x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
-
-            y_scroll = tk.Scrollbar(frame, orient=tk.VERTICAL, command=canvas.yview)
-            y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-
-            canvas.config(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
-
-            pil_image = Image.open(image_path)
-            self.large_image = ImageTk.PhotoImage(pil_image)
-
-            canvas.create_image(0, 0, anchor=tk.NW, image=self.large_image)
-            canvas.config(scrollregion=canvas.bbox(tk.ALL))
+            # Sólo se decodifican las teselas visibles del nivel de zoom actual
+            viewer = TiledImageViewer(top, image_path)
+            viewer.pack(fill=tk.BOTH, expand=True)
 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir la imagen: {e}")
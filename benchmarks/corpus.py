@@ -0,0 +1,151 @@
+"""
+Genera un corpus sintético de facturas para los benchmarks, sin red y reproducible
+(misma semilla, mismos archivos):
+
+    python -m benchmarks.corpus /tmp/corpus --pdfs 200 --paginas 4 --jpegs 500 --otros 2000
+
+Crea `pdf/` (PDFs de varias páginas con texto de factura), `jpg/` (JPEGs con fecha
+en el EXIF) y `mezcla/` (archivos chicos de varias extensiones en subcarpetas, para
+el organizador).
+"""
+import os
+import json
+import random
+import argparse
+from datetime import date, timedelta
+from PIL import Image, ImageDraw
+import fitz  # PyMuPDF
+
+
+RAZONES = ("Distribuidora Norte SA", "Ferretería El Tornillo", "Servicios Integrales SRL",
+           "Librería Central", "Transportes del Sur", "Estudio Contable Pérez")
+EXTENSIONES_MEZCLA = (".pdf", ".jpg", ".png", ".txt", ".xlsx", ".docx", ".csv", ".zip", "")
+# Etiquetas EXIF que lee pdfmoificador.metadata_reader.read_metadata
+TAG_EXIF_IFD = 0x8769
+TAG_FECHA_ORIGINAL = 0x9003
+TAG_DESCRIPCION = 0x010E
+
+
+def _fecha(rnd):
+    return date(2019, 1, 1) + timedelta(days=rnd.randrange(6 * 365))
+
+
+def _cuit(rnd):
+    return f"30-{rnd.randrange(10**7, 10**8)}-{rnd.randrange(10)}"
+
+
+def generar_pdfs(carpeta, cantidad, paginas, semilla=1):
+    """
+    PDFs de `paginas` páginas A4 con encabezado de factura (fecha, número, CUIT),
+    un detalle de renglones y algunos rectángulos. Devuelve las rutas.
+    """
+    rnd = random.Random(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = []
+    for n in range(cantidad):
+        fecha = _fecha(rnd)
+        numero = f"{rnd.randrange(1, 10):04d}-{rnd.randrange(10**8):08d}"
+        ruta = os.path.join(carpeta, f"factura_{n:05d}.pdf")
+        with fitz.open() as doc:
+            for p in range(paginas):
+                page = doc.new_page(width=595, height=842)
+                page.insert_text((50, 60), rnd.choice(RAZONES), fontsize=16)
+                page.insert_text((50, 85), f"Fecha de emisión: {fecha:%d-%m-%Y}", fontsize=11)
+                page.insert_text((50, 100), f"Comprobante Nro {numero}   CUIT {_cuit(rnd)}", fontsize=11)
+                page.draw_rect(fitz.Rect(40, 120, 555, 780), color=(0, 0, 0), width=0.8)
+                for renglon in range(40):
+                    y = 140 + renglon * 15
+                    page.insert_text(
+                        (50, y),
+                        f"{rnd.randrange(1, 50):>3} x Artículo {rnd.randrange(10**5):05d}"
+                        f"  ${rnd.randrange(100, 100000) / 100:>10.2f}",
+                        fontsize=9
+                    )
+                    if renglon % 8 == 0:
+                        page.draw_rect(fitz.Rect(45, y - 10, 550, y + 3), color=(0.2, 0.2, 0.6), width=0.3)
+                page.insert_text((450, 810), f"Página {p + 1} de {paginas}", fontsize=8)
+            doc.save(ruta, garbage=3, deflate=True)
+        rutas.append(ruta)
+    return rutas
+
+
+def generar_jpegs(carpeta, cantidad, lado=2000, semilla=1):
+    """
+    JPEGs de `lado` píxeles de ancho (proporción A4) que parecen una factura
+    fotografiada, con la fecha en EXIF DateTimeOriginal. Devuelve las rutas.
+    """
+    rnd = random.Random(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    alto = int(lado * 1.414)
+    rutas = []
+    for n in range(cantidad):
+        fondo = rnd.randrange(200, 250)
+        imagen = Image.new("RGB", (lado, alto), (fondo, fondo, fondo - 10))
+        dibujo = ImageDraw.Draw(imagen)
+        escala = lado / 600
+        for renglon in range(45):
+            y = int((60 + renglon * 17) * escala)
+            ancho = int(rnd.randrange(150, 500) * escala)
+            dibujo.rectangle((int(40 * escala), y, int(40 * escala) + ancho, y + int(6 * escala)), fill=(60, 60, 70))
+        dibujo.rectangle((int(30 * escala), int(40 * escala), int(570 * escala), int(820 * escala)),
+                         outline=(20, 20, 20), width=max(1, int(escala)))
+
+        exif = Image.Exif()
+        exif[TAG_DESCRIPCION] = rnd.choice(RAZONES)
+        exif.get_ifd(TAG_EXIF_IFD)[TAG_FECHA_ORIGINAL] = f"{_fecha(rnd):%Y:%m:%d} 10:{n % 60:02d}:00"
+        ruta = os.path.join(carpeta, f"foto_{n:05d}.jpg")
+        imagen.save(ruta, "JPEG", quality=85, exif=exif)
+        rutas.append(ruta)
+    return rutas
+
+
+def generar_mezcla(carpeta, cantidad, semilla=1):
+    """
+    Archivos chicos de varias extensiones repartidos en subcarpetas, con nombres
+    repetidos para ejercitar las colisiones del organizador. Devuelve las rutas.
+    """
+    rnd = random.Random(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    subcarpetas = [""] + [f"lote_{i}" for i in range(10)] + [os.path.join("lote_0", f"sub_{i}") for i in range(5)]
+    rutas = []
+    for n in range(cantidad):
+        subcarpeta = os.path.join(carpeta, rnd.choice(subcarpetas))
+        os.makedirs(subcarpeta, exist_ok=True)
+        # Un nombre de cada diez se repite en otra subcarpeta
+        nombre = f"archivo_{n if n % 10 else rnd.randrange(max(n, 1)):05d}{rnd.choice(EXTENSIONES_MEZCLA)}"
+        ruta = os.path.join(subcarpeta, nombre)
+        with open(ruta, "wb") as f:
+            f.write(rnd.randbytes(rnd.randrange(64, 4096)))
+        rutas.append(ruta)
+    return rutas
+
+
+def generar(destino, pdfs=100, paginas=4, jpegs=200, lado=2000, otros=1000, semilla=1):
+    """
+    Genera el corpus completo y guarda sus parámetros en corpus.json.
+    """
+    parametros = {"pdfs": pdfs, "paginas": paginas, "jpegs": jpegs, "lado": lado, "otros": otros, "semilla": semilla}
+    generar_pdfs(os.path.join(destino, "pdf"), pdfs, paginas, semilla)
+    generar_jpegs(os.path.join(destino, "jpg"), jpegs, lado, semilla)
+    generar_mezcla(os.path.join(destino, "mezcla"), otros, semilla)
+    with open(os.path.join(destino, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump(parametros, f, indent=2)
+    return parametros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de facturas.")
+    parser.add_argument("destino")
+    parser.add_argument("--pdfs", type=int, default=100)
+    parser.add_argument("--paginas", type=int, default=4)
+    parser.add_argument("--jpegs", type=int, default=200)
+    parser.add_argument("--lado", type=int, default=2000, help="ancho en píxeles de los JPEG")
+    parser.add_argument("--otros", type=int, default=1000, help="archivos para el organizador")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args(argv)
+    parametros = generar(args.destino, args.pdfs, args.paginas, args.jpegs, args.lado, args.otros, args.semilla)
+    print(json.dumps(parametros))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Mide los caminos críticos de las aplicaciones sin abrir ventanas y escribe el
+resultado en JSON:
+
+    python -m benchmarks.medir /tmp/corpus --salida resultados.json
+    python -m benchmarks.medir /tmp/corpus --comparar resultados.json
+
+Cada medición reporta cantidad, tiempo total, unidades por segundo, latencias
+(p50/p90/p99/máx en ms) y el pico de memoria de Python (tracemalloc, en una
+segunda pasada para no distorsionar los tiempos). Con --comparar se marca como
+regresión lo que empeoró más que la tolerancia, y el proceso sale con código 1.
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import date, datetime, timedelta
+import fitz  # PyMuPDF
+
+from pdfmoificador.renderizado import renderizar_paginas, MotorRenderizado
+from pdfmoificador.metadata_reader import read_metadata, read_metadata_batch
+from pdfmoificador.metadata_catalog import MetadataCatalog
+from pdfmoificador.metadata_index import MetadataIndex
+from pdfmoificador import organizador
+from vista_detalle import ZOOM_INICIAL, TAM_TESELA, FACTOR_BAJA_RESOLUCION, clip_tesela
+
+
+# Tamaño de la ventana de la vista detallada (abrir_vista_detallada usa 900x700)
+VENTANA_DETALLE = (900, 700)
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def medir(funcion, entradas, preparar=None, unidades=None, memoria=True):
+    """
+    Llama `funcion(entrada)` para cada entrada y devuelve el resumen.
+    `preparar(entrada)` corre antes de cada llamada, fuera del tiempo medido, y lo
+    que devuelve es lo que recibe la función. `unidades(entrada)` cuenta cuánto
+    trabajo representa cada entrada (páginas, archivos); por defecto 1.
+    """
+    latencias = []
+    total_unidades = 0
+    for entrada in entradas:
+        argumento = preparar(entrada) if preparar else entrada
+        inicio = time.perf_counter()
+        funcion(argumento)
+        latencias.append(time.perf_counter() - inicio)
+        total_unidades += unidades(entrada) if unidades else 1
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        for entrada in entradas:
+            argumento = preparar(entrada) if preparar else entrada
+            tracemalloc.reset_peak()
+            funcion(argumento)
+            pico = max(pico or 0, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total = sum(latencias)
+    ordenadas = sorted(latencias)
+    return {
+        "n": len(latencias),
+        "unidades": total_unidades,
+        "total_s": round(total, 4),
+        "por_segundo": round(total_unidades / total, 2) if total else None,
+        "p50_ms": round(_percentil(ordenadas, 50) * 1000, 3) if ordenadas else None,
+        "p90_ms": round(_percentil(ordenadas, 90) * 1000, 3) if ordenadas else None,
+        "p99_ms": round(_percentil(ordenadas, 99) * 1000, 3) if ordenadas else None,
+        "max_ms": round(ordenadas[-1] * 1000, 3) if ordenadas else None,
+        "pico_memoria_kb": round(pico / 1024) if pico is not None else None,
+    }
+
+
+def _paginas(ruta_pdf):
+    with fitz.open(ruta_pdf) as doc:
+        return len(doc)
+
+
+# -------------------- VISOR DE PDFs --------------------
+def miniaturas_pdf(ruta_pdf):
+    """
+    Lo que cuesta una entrada de cargar_miniaturas_pagina: abrir el PDF para medir
+    las páginas y renderizar todas las miniaturas a PPM.
+    """
+    with fitz.open(ruta_pdf) as doc:
+        rects = [page.rect for page in doc]
+    renderizar_paginas(ruta_pdf, range(len(rects)))
+
+
+def miniaturas_pool(rutas_pdf):
+    """
+    Todas las miniaturas del corpus a través del pool de MotorRenderizado (sin caché).
+    """
+    motor = MotorRenderizado(cache=None)
+    try:
+        futures = [fut for ruta in rutas_pdf for fut in motor.renderizar(ruta, range(_paginas(ruta)))]
+        for fut in futures:
+            fut.result()
+    finally:
+        motor.cerrar()
+
+
+def vista_detallada(ruta_pdf):
+    """
+    Lo que hace abrir_vista_detallada hasta mostrar la primera página nítida:
+    display list, pasada borrosa y teselas nítidas de la ventana inicial.
+    """
+    with fitz.open(ruta_pdf) as doc:
+        page = doc[0]
+        lista = page.get_displaylist()
+        rect = page.rect
+        ancho = min(VENTANA_DETALLE[0], math.ceil(rect.width * ZOOM_INICIAL))
+        alto = min(VENTANA_DETALLE[1], math.ceil(rect.height * ZOOM_INICIAL))
+        teselas = [
+            (c, f)
+            for f in range(math.ceil(alto / TAM_TESELA))
+            for c in range(math.ceil(ancho / TAM_TESELA))
+        ]
+        for zoom in (ZOOM_INICIAL * FACTOR_BAJA_RESOLUCION, ZOOM_INICIAL):
+            for c, f in teselas:
+                clip = clip_tesela(rect, ZOOM_INICIAL, c, f)
+                lista.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False).tobytes("ppm")
+
+
+# -------------------- METADATOS DE IMÁGENES --------------------
+def catalogo(rutas_jpg, ruta_db):
+    """
+    load_images sobre el catálogo: frío (lee todo con exifread) o tibio (todo vigente).
+    """
+    cat = MetadataCatalog(ruta_db)
+    try:
+        cat.load(rutas_jpg, read_metadata)
+    finally:
+        cat.close()
+
+
+def metadata_sintetica(cantidad, semilla=1):
+    """
+    Entradas como las de read_metadata, para medir el índice con más filas que JPEGs.
+    """
+    rnd = random.Random(semilla)
+    inicio = date(2019, 1, 1)
+    return [
+        {
+            "file_name": f"factura_{rnd.randrange(10**6):06d}_{n}.jpg",
+            "file_path": f"/corpus/factura_{n}.jpg",
+            "issue_date": inicio + timedelta(days=rnd.randrange(6 * 365)),
+            "invoice_number": f"{rnd.randrange(1, 10):04d}-{rnd.randrange(10**8):08d}",
+            "reason_social": None,
+        }
+        for n in range(cantidad)
+    ]
+
+
+def construir_indice(metadata_list):
+    indice = MetadataIndex()
+    indice.build(metadata_list)
+    indice.index_pending()
+    return indice
+
+
+def consultas_busqueda(cantidad, semilla=1):
+    """
+    Mezcla de filtros como los de search_images: nombre, comprobante y rango de fechas.
+    """
+    rnd = random.Random(semilla)
+    consultas = []
+    for n in range(cantidad):
+        tipo = n % 3
+        if tipo == 0:
+            consultas.append((f"{rnd.randrange(1000):03d}", "", None, None))
+        elif tipo == 1:
+            consultas.append(("", f"{rnd.randrange(10**4):04d}", None, None))
+        else:
+            desde = date(2019, 1, 1) + timedelta(days=rnd.randrange(5 * 365))
+            consultas.append(("factura", "", desde, desde + timedelta(days=30)))
+    return consultas
+
+
+# -------------------- ORGANIZADOR --------------------
+def organizar(raiz):
+    """
+    organize_folder sin la ventana: planificar y aplicar.
+    """
+    organizador.aplicar(organizador.planificar(raiz))
+
+
+def ejecutar(corpus, repeticiones=3, filas_indice=100_000, consultas=300, memoria=True):
+    """
+    Corre todas las mediciones sobre un corpus generado por benchmarks.corpus.
+    """
+    rutas_pdf = sorted(os.path.join(corpus, "pdf", f) for f in os.listdir(os.path.join(corpus, "pdf")))
+    rutas_jpg = sorted(os.path.join(corpus, "jpg", f) for f in os.listdir(os.path.join(corpus, "jpg")))
+    resultados = {}
+    trabajo = tempfile.mkdtemp(prefix="bench_visor_")
+    try:
+        resultados["miniaturas_pagina"] = medir(miniaturas_pdf, rutas_pdf, unidades=_paginas, memoria=memoria)
+        # El pool reparte entre procesos: el pico de memoria sería sólo el del proceso principal
+        resultados["miniaturas_pool"] = medir(
+            miniaturas_pool, [rutas_pdf] * repeticiones,
+            unidades=lambda rutas: sum(_paginas(r) for r in rutas), memoria=False
+        )
+        resultados["vista_detallada"] = medir(vista_detallada, rutas_pdf, memoria=memoria)
+
+        resultados["extract_metadata"] = medir(read_metadata, rutas_jpg, memoria=memoria)
+        resultados["read_metadata_batch"] = medir(
+            read_metadata_batch, [rutas_jpg], unidades=len, memoria=memoria
+        )
+        def db_frio(_):
+            # Una base nueva por llamada (también en la pasada de memoria)
+            return os.path.join(trabajo, f"catalogo_{time.perf_counter_ns()}.sqlite")
+
+        resultados["load_images_frio"] = medir(
+            lambda db: catalogo(rutas_jpg, db), range(repeticiones),
+            preparar=db_frio, unidades=lambda _: len(rutas_jpg), memoria=memoria
+        )
+        db_tibio = os.path.join(trabajo, "catalogo_tibio.sqlite")
+        catalogo(rutas_jpg, db_tibio)
+        resultados["load_images_tibio"] = medir(
+            lambda db: catalogo(rutas_jpg, db), [db_tibio] * repeticiones,
+            unidades=lambda _: len(rutas_jpg), memoria=memoria
+        )
+
+        filas = metadata_sintetica(filas_indice)
+        resultados["indice_metadata"] = medir(
+            construir_indice, [filas] * repeticiones, unidades=len, memoria=memoria
+        )
+        indice = construir_indice(filas)
+        resultados["search_images"] = medir(
+            lambda consulta: indice.search(*consulta), consultas_busqueda(consultas), memoria=memoria
+        )
+
+        mezcla = os.path.join(corpus, "mezcla")
+        total_mezcla = sum(len(archivos) for _, _, archivos in os.walk(mezcla))
+
+        def copia_nueva(n):
+            destino = os.path.join(trabajo, f"mezcla_{n}_{time.perf_counter_ns()}")
+            shutil.copytree(mezcla, destino)
+            return destino
+
+        resultados["organize_folder"] = medir(
+            organizar, range(repeticiones), preparar=copia_nueva,
+            unidades=lambda _: total_mezcla, memoria=memoria
+        )
+        organizada = copia_nueva("organizada")
+        organizar(organizada)
+        # Segunda pasada sobre una carpeta ya organizada: el manifiesto evita relistar
+        resultados["organize_folder_repetido"] = medir(
+            lambda raiz: organizador.planificar(raiz), [organizada] * repeticiones,
+            unidades=lambda _: total_mezcla, memoria=memoria
+        )
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return resultados
+
+
+def comparar(actual, anterior, tolerancia):
+    """
+    Devuelve las líneas del informe y si hubo regresiones (p50 más lento o menos
+    unidades por segundo que la tolerancia, en proporción).
+    """
+    lineas = []
+    regresion = False
+    for nombre, medicion in actual["resultados"].items():
+        base = anterior.get("resultados", {}).get(nombre)
+        if not base or not base.get("p50_ms") or not medicion.get("p50_ms"):
+            lineas.append(f"{nombre}: sin datos anteriores")
+            continue
+        razon_p50 = medicion["p50_ms"] / base["p50_ms"]
+        razon_velocidad = (base["por_segundo"] / medicion["por_segundo"]) if medicion.get("por_segundo") else float("inf")
+        peor = max(razon_p50, razon_velocidad) > 1 + tolerancia
+        regresion |= peor
+        lineas.append(
+            f"{nombre}: p50 {base['p50_ms']} -> {medicion['p50_ms']} ms (x{razon_p50:.2f}), "
+            f"{base['por_segundo']} -> {medicion['por_segundo']} /s{'  << REGRESIÓN' if peor else ''}"
+        )
+    return lineas, regresion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los caminos críticos sin interfaz gráfica.")
+    parser.add_argument("corpus", help="carpeta generada con benchmarks.corpus")
+    parser.add_argument("--salida", help="archivo JSON donde guardar el resultado")
+    parser.add_argument("--comparar", help="resultado anterior contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="empeoramiento aceptado (0.15 = 15%%)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--filas-indice", type=int, default=100_000)
+    parser.add_argument("--consultas", type=int, default=300)
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir el pico de memoria (más rápido)")
+    args = parser.parse_args(argv)
+
+    parametros_corpus = {}
+    try:
+        with open(os.path.join(args.corpus, "corpus.json"), encoding="utf-8") as f:
+            parametros_corpus = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pymupdf": fitz.VersionBind,
+        "corpus": parametros_corpus,
+        "resultados": ejecutar(
+            args.corpus, args.repeticiones, args.filas_indice, args.consultas, memoria=not args.sin_memoria
+        ),
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        lineas, regresion = comparar(informe, anterior, args.tolerancia)
+        print("\n".join(lineas), file=sys.stderr)
+        return 1 if regresion else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+from collections import defaultdict
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Lista con scroll que sólo mantiene widgets para las filas visibles.
+
+    Cada item es un dict con una clave "tipo". Las filas se crean con
+    `crear_fila(padre, tipo)` y se reciclan: al hacer scroll, las que salen de la
+    vista vuelven al pool y se reasignan con `vincular_fila(fila, item)` a los
+    items que entran. El estado de cada item vive en el dict, no en el widget.
+    Si se indica `al_cambiar_rango(desde, hasta)`, se llama después de cada refresco
+    con el rango de items a la vista (para renderizar sólo lo necesario).
+    """
+
+    def __init__(self, master, crear_fila, vincular_fila, al_cambiar_rango=None, margen=2, **kwargs):
+        super().__init__(master, **kwargs)
+        self.crear_fila = crear_fila
+        self.vincular_fila = vincular_fila
+        self.al_cambiar_rango = al_cambiar_rango
+        self.margen = margen  # Filas extra a cada lado de la vista
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar_y = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar_y.set)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.items = []
+        self.offsets = [0]  # offsets[i] = y de inicio del item i; el último es el alto total
+
+        # Filas libres por tipo y filas en uso por índice de item
+        self._libres = defaultdict(list)
+        self._en_uso = {}
+        self._refresco_pendiente = False
+
+        self.canvas.bind("<Configure>", lambda e: self.refrescar())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+
+    # -------------------- DATOS --------------------
+    def establecer_items(self, items, alturas):
+        """
+        Reemplaza el contenido. `alturas[i]` es el alto en píxeles del item i.
+        """
+        for indice in list(self._en_uso):
+            self._liberar(indice)
+        self.items = items
+        self.offsets = [0]
+        for alto in alturas:
+            self.offsets.append(self.offsets[-1] + alto)
+        self.canvas.configure(scrollregion=(0, 0, 1, self.offsets[-1]))
+        self.canvas.yview_moveto(0)
+        self.refrescar()
+
+    def actualizar_item(self, indice):
+        """
+        Vuelve a vincular el item si su fila está a la vista (p. ej. llegó su miniatura).
+        """
+        fila = self._en_uso.get(indice)
+        if fila is not None:
+            self.vincular_fila(fila, self.items[indice])
+
+    # -------------------- VISTA --------------------
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.refrescar()
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.refrescar()
+
+    def rango_visible(self):
+        """
+        Índices [desde, hasta) de los items que intersectan la vista, con margen.
+        """
+        if not self.items:
+            return 0, 0
+        y0 = self.canvas.canvasy(0)
+        y1 = y0 + self.canvas.winfo_height()
+        desde = max(0, bisect_right(self.offsets, y0) - 1 - self.margen)
+        hasta = min(len(self.items), bisect_right(self.offsets, y1) + self.margen)
+        return desde, hasta
+
+    def refrescar(self):
+        # Agrupar varios eventos de scroll en un solo refresco
+        if not self._refresco_pendiente:
+            self._refresco_pendiente = True
+            self.after_idle(self._refrescar)
+
+    def _refrescar(self):
+        self._refresco_pendiente = False
+        desde, hasta = self.rango_visible()
+
+        for indice in list(self._en_uso):
+            if not desde <= indice < hasta:
+                self._liberar(indice)
+
+        for indice in range(desde, hasta):
+            if indice not in self._en_uso:
+                self._ocupar(indice)
+
+        if self.al_cambiar_rango:
+            self.al_cambiar_rango(desde, hasta)
+
+    def _ocupar(self, indice):
+        item = self.items[indice]
+        tipo = item["tipo"]
+        if self._libres[tipo]:
+            fila = self._libres[tipo].pop()
+        else:
+            fila = self.crear_fila(self.canvas, tipo)
+            fila.tipo = tipo
+            fila.id_ventana = self.canvas.create_window(0, 0, window=fila, anchor=tk.NW)
+            self._propagar_rueda(fila)
+        self.canvas.coords(fila.id_ventana, 0, self.offsets[indice])
+        self.canvas.itemconfigure(fila.id_ventana, state="normal")
+        self.vincular_fila(fila, item)
+        self._en_uso[indice] = fila
+
+    def _propagar_rueda(self, widget):
+        # La rueda del mouse tiene que desplazar la lista aunque el puntero esté sobre una fila
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        for hijo in widget.winfo_children():
+            self._propagar_rueda(hijo)
+
+    def _liberar(self, indice):
+        fila = self._en_uso.pop(indice)
+        # Fuera de la región visible y oculta, lista para reutilizarse
+        self.canvas.coords(fila.id_ventana, 0, -10000)
+        self.canvas.itemconfigure(fila.id_ventana, state="hidden")
+        self._libres[fila.tipo].append(fila)
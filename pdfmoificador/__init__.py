@@ -0,0 +1,45 @@
+"""
+Lógica de las aplicaciones (renderizado, metadatos, renombrado, organizador...)
+sin dependencias de Tk, para usarla desde las interfaces, los benchmarks o
+trabajos por lotes:
+
+    from pdfmoificador import organizador
+    plan, errores = organizador.organizar("/ruta/a/carpeta")
+
+Los submódulos se importan recién al usarlos, y fitz, PIL y exifread recién
+cuando hacen falta (ver dependencias.py).
+"""
+import importlib
+
+__all__ = [
+    "cache_miniaturas",
+    "cli",
+    "dependencias",
+    "division",
+    "duplicados",
+    "extraccion",
+    "image_previews",
+    "indice_texto",
+    "metadata_catalog",
+    "metadata_index",
+    "metadata_reader",
+    "organizador",
+    "precarga",
+    "renderizado",
+    "renombrado",
+    "reporte_trazas",
+    "similares",
+    "trazas",
+    "validaciones",
+    "vigilante_carpeta",
+]
+
+
+def __getattr__(nombre):
+    if nombre in __all__:
+        return importlib.import_module(f".{nombre}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
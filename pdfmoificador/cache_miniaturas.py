@@ -0,0 +1,239 @@
+import os
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+import logging
+
+
+DIRECTORIO_POR_DEFECTO = Path.home() / ".visor_pdf_cache" / "miniaturas"
+TOPE_POR_DEFECTO = 512 * 1024 * 1024  # 512 MB
+
+
+class CacheMiniaturas:
+    """
+    Caché en disco de miniaturas (bytes PPM) por archivo y número de página.
+
+    Cada PDF tiene su propia subcarpeta (hash de la ruta absoluta). El nombre de
+    cada entrada incluye la huella del archivo (tamaño + mtime), así que si el PDF
+    cambia o se renombra sus miniaturas viejas se descartan solas.
+    Al superar `tope_bytes` se eliminan las entradas menos usadas (LRU).
+    """
+
+    ARCHIVO_ORIGEN = "origen.txt"
+
+    def __init__(self, directorio=DIRECTORIO_POR_DEFECTO, tope_bytes=TOPE_POR_DEFECTO):
+        self.directorio = Path(directorio)
+        self.tope_bytes = tope_bytes
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Índice LRU: ruta relativa de la entrada -> tamaño en bytes (más viejo primero)
+        self._entradas = OrderedDict()
+        self._bytes_totales = 0
+        # Ruta del PDF -> huella ya verificada en esta sesión
+        self._huellas = {}
+
+        self._cargar_indice()
+
+    # -------------------- CLAVES --------------------
+    @staticmethod
+    def huella(ruta_pdf):
+        """
+        Identidad del archivo: tamaño y fecha de modificación.
+        """
+        st = os.stat(ruta_pdf)
+        return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    def _carpeta(self, ruta_pdf):
+        ruta_abs = os.path.abspath(ruta_pdf)
+        return hashlib.sha1(ruta_abs.encode("utf-8")).hexdigest()[:20]
+
+    def _nombre(self, huella, page_index, zoom):
+        return f"{huella}_{zoom:g}_{page_index}.ppm"
+
+    # -------------------- ÍNDICE --------------------
+    def _cargar_indice(self):
+        """
+        Recorre la caché existente, descarta carpetas cuyo PDF ya no existe
+        y arma el índice LRU ordenado por fecha de último uso.
+        """
+        encontradas = []
+        for carpeta in os.scandir(self.directorio):
+            if not carpeta.is_dir():
+                continue
+            origen = Path(carpeta.path) / self.ARCHIVO_ORIGEN
+            try:
+                ruta_pdf = origen.read_text(encoding="utf-8")
+            except OSError:
+                ruta_pdf = None
+            if not ruta_pdf or not os.path.exists(ruta_pdf):
+                shutil.rmtree(carpeta.path, ignore_errors=True)
+                continue
+            for entrada in os.scandir(carpeta.path):
+                if entrada.name.endswith(".ppm"):
+                    st = entrada.stat()
+                    encontradas.append((st.st_mtime, f"{carpeta.name}/{entrada.name}", st.st_size))
+
+        encontradas.sort()
+        for _, clave, tam in encontradas:
+            self._entradas[clave] = tam
+            self._bytes_totales += tam
+        self._desalojar()
+
+    def _desalojar(self):
+        while self._bytes_totales > self.tope_bytes and self._entradas:
+            self._quitar(next(iter(self._entradas)))
+
+    def _verificar_huella(self, ruta_pdf):
+        """
+        Devuelve la huella actual del PDF y, si cambió desde la última vez,
+        borra las miniaturas que quedaron obsoletas.
+        """
+        huella = self.huella(ruta_pdf)
+        if self._huellas.get(ruta_pdf) == huella:
+            return huella
+
+        carpeta = self._carpeta(ruta_pdf)
+        ruta_carpeta = self.directorio / carpeta
+        if ruta_carpeta.is_dir():
+            for entrada in os.scandir(ruta_carpeta):
+                if entrada.name.endswith(".ppm") and not entrada.name.startswith(huella + "_"):
+                    self._quitar(f"{carpeta}/{entrada.name}")
+        self._huellas[ruta_pdf] = huella
+        return huella
+
+    def _quitar(self, clave, borrar_archivo=True):
+        """
+        Saca la entrada del índice descontando su tamaño y borra su archivo,
+        salvo que ya se haya reemplazado o se vaya a borrar la carpeta entera.
+        """
+        tam = self._entradas.pop(clave, None)
+        if tam is not None:
+            self._bytes_totales -= tam
+        if borrar_archivo:
+            try:
+                os.remove(self.directorio / clave)
+            except OSError:
+                pass
+
+    # -------------------- API --------------------
+    def obtener(self, ruta_pdf, page_index, zoom=0.2):
+        """
+        Devuelve los bytes PPM de la miniatura o None si no está en caché.
+        """
+        with self._lock:
+            try:
+                huella = self._verificar_huella(ruta_pdf)
+            except OSError:
+                return None
+            clave = f"{self._carpeta(ruta_pdf)}/{self._nombre(huella, page_index, zoom)}"
+            if clave not in self._entradas:
+                return None
+            self._entradas.move_to_end(clave)
+
+        ruta_entrada = self.directorio / clave
+        try:
+            datos = ruta_entrada.read_bytes()
+            os.utime(ruta_entrada)  # Marcar como usada para el LRU entre sesiones
+        except OSError:
+            with self._lock:
+                self._quitar(clave)
+            return None
+        return datos
+
+    def contiene(self, ruta_pdf, page_index, zoom=0.2):
+        """
+        Como `obtener`, pero sin leer la miniatura del disco.
+        """
+        with self._lock:
+            try:
+                huella = self._verificar_huella(ruta_pdf)
+            except OSError:
+                return False
+            return f"{self._carpeta(ruta_pdf)}/{self._nombre(huella, page_index, zoom)}" in self._entradas
+
+    def guardar(self, ruta_pdf, page_index, datos, zoom=0.2):
+        """
+        Guarda los bytes PPM de una miniatura y aplica el tope de tamaño.
+        """
+        with self._lock:
+            try:
+                huella = self._verificar_huella(ruta_pdf)
+            except OSError:
+                return
+            carpeta = self._carpeta(ruta_pdf)
+            ruta_carpeta = self.directorio / carpeta
+            if not ruta_carpeta.is_dir():
+                ruta_carpeta.mkdir(parents=True, exist_ok=True)
+                (ruta_carpeta / self.ARCHIVO_ORIGEN).write_text(os.path.abspath(ruta_pdf), encoding="utf-8")
+
+            clave = f"{carpeta}/{self._nombre(huella, page_index, zoom)}"
+            ruta_entrada = self.directorio / clave
+            temporal = ruta_entrada.with_suffix(".tmp")
+            try:
+                temporal.write_bytes(datos)
+                os.replace(temporal, ruta_entrada)
+            except OSError as e:
+                logging.warning(f"No se pudo guardar la miniatura en caché: {ruta_pdf}, página {page_index+1}: {e}")
+                return
+
+            self._quitar(clave, borrar_archivo=False)
+            self._entradas[clave] = len(datos)
+            self._bytes_totales += len(datos)
+            self._desalojar()
+
+    def invalidar(self, ruta_pdf):
+        """
+        Elimina todas las miniaturas de un PDF (por ejemplo, tras renombrarlo).
+        """
+        with self._lock:
+            carpeta = self._carpeta(ruta_pdf)
+            for clave in [c for c in self._entradas if c.startswith(carpeta + "/")]:
+                self._quitar(clave, borrar_archivo=False)
+            shutil.rmtree(self.directorio / carpeta, ignore_errors=True)
+            self._huellas.pop(ruta_pdf, None)
+
+
+class CacheMemoria:
+    """
+    Caché LRU en memoria de bytes PPM, limitada por tamaño total.
+    Se usa delante de la caché en disco para que las páginas precargadas
+    no necesiten ni siquiera una lectura de archivo.
+    """
+
+    def __init__(self, tope_bytes=64 * 1024 * 1024):
+        self.tope_bytes = tope_bytes
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._bytes_totales = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            datos = self._entradas.get(clave)
+            if datos is not None:
+                self._entradas.move_to_end(clave)
+            return datos
+
+    def guardar(self, clave, datos):
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes_totales -= len(anterior)
+            self._entradas[clave] = datos
+            self._bytes_totales += len(datos)
+            while self._bytes_totales > self.tope_bytes and self._entradas:
+                _, viejo = self._entradas.popitem(last=False)
+                self._bytes_totales -= len(viejo)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    def invalidar(self, ruta_pdf):
+        """
+        Quita de memoria todas las miniaturas de un PDF.
+        """
+        with self._lock:
+            for clave in [c for c in self._entradas if c[0] == ruta_pdf]:
+                self._bytes_totales -= len(self._entradas.pop(clave))
@@ -0,0 +1,354 @@
+"""
+Modo por lotes, sin ventanas, para los trabajos nocturnos:
+
+    python -m pdfmoificador renombrar-fecha /entrada/facturas --destino /salida
+    find /entrada -name '*.pdf' | python -m pdfmoificador miniaturas --workers 4
+    python -m pdfmoificador dividir a.pdf b.pdf --modo cada --valor 2
+    python -m pdfmoificador organizar /entrada --simular
+    python -m pdfmoificador metadatos /entrada > metadatos.jsonl
+    python -m pdfmoificador deshacer
+
+Los archivos vienen de los argumentos (las carpetas se recorren completas) o, si
+no hay ninguno o es "-", de stdin, uno por línea. Por stdout sale un registro JSON
+por archivo, a medida que se procesan, siempre con "archivo" y "estado" ("error"
+trae además el mensaje). El código de salida es 1 si algún archivo dio error.
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from . import trazas, renombrado, division, organizador
+from .renderizado import ZOOM_MINIATURA, calentar_cache
+from .cache_miniaturas import CacheMiniaturas
+from .extraccion import ExtractorFacturas
+from .metadata_reader import IMAGE_EXTENSIONS, read_metadata_batch
+from .validaciones import AlmacenValidaciones
+
+
+EXTENSION_PDF = ".pdf"
+# Imágenes por proceso en cada tarea de lectura de EXIF (como en app.py)
+LOTE_METADATOS = 64
+# La fecha de los nombres, igual que la que sugiere la extracción de los PDFs
+FORMATO_FECHA = "%d-%m-%Y"
+
+
+class Salida:
+    """
+    Escribe un registro JSON por línea y lleva la cuenta de los errores.
+    """
+
+    def __init__(self, archivo=None):
+        self.archivo = archivo or sys.stdout
+        self.errores = 0
+
+    def emitir(self, registro):
+        if registro.get("estado") == "error":
+            self.errores += 1
+        self.archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+        # Que el siguiente de la tubería lo reciba ya, no al llenarse el búfer
+        self.archivo.flush()
+
+    def error(self, ruta, mensaje, **datos):
+        self.emitir({"archivo": ruta, "estado": "error", "error": mensaje, **datos})
+
+
+# -------------------- ENTRADA --------------------
+def _argumentos_o_stdin(argumentos):
+    """
+    Los argumentos o, si no hay ninguno (o es "-"), las líneas de stdin a medida
+    que llegan. Se saltean las vacías.
+    """
+    if not argumentos or argumentos == ["-"]:
+        argumentos = (linea.rstrip("\r\n") for linea in sys.stdin)
+    return (ruta for ruta in argumentos if ruta.strip())
+
+
+def leer_rutas(argumentos, extensiones=None):
+    """
+    Rutas absolutas de los archivos a procesar. De las carpetas se toman,
+    recursivamente, los archivos con esas extensiones; los archivos nombrados
+    explícitamente se toman siempre.
+    """
+    for ruta in _argumentos_o_stdin(argumentos):
+        if os.path.isdir(ruta):
+            for carpeta, subcarpetas, archivos in os.walk(ruta):
+                subcarpetas.sort()
+                for nombre in sorted(archivos):
+                    if extensiones is None or nombre.lower().endswith(extensiones):
+                        yield os.path.abspath(os.path.join(carpeta, nombre))
+        else:
+            yield os.path.abspath(ruta)
+
+
+def leer_rutas_carpetas(argumentos, salida):
+    """
+    Como `leer_rutas`, pero para subcomandos que reciben carpetas.
+    """
+    for ruta in _argumentos_o_stdin(argumentos):
+        if os.path.isdir(ruta):
+            yield os.path.abspath(ruta)
+        else:
+            salida.error(os.path.abspath(ruta), "No es una carpeta.")
+
+
+def existentes(rutas, salida):
+    """
+    Deja pasar los archivos que existen; por los demás emite un error.
+    """
+    for ruta in rutas:
+        if os.path.isfile(ruta):
+            yield ruta
+        else:
+            salida.error(ruta, "No existe el archivo.")
+
+
+def es_pdf(ruta):
+    return ruta.lower().endswith(EXTENSION_PDF)
+
+
+def leer_exif(rutas, num_workers):
+    """
+    Metadatos EXIF de las imágenes, leídos por lotes en un pool de procesos.
+    Devuelve un generador de dicts de `read_metadata`, en el orden de `rutas`.
+    """
+    lotes = [rutas[i:i + LOTE_METADATOS] for i in range(0, len(rutas), LOTE_METADATOS)]
+    if not lotes:
+        return
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        for lote in pool.map(read_metadata_batch, lotes):
+            trazas.registrar_tiempos(lote)
+            yield from lote
+
+
+# -------------------- SUBCOMANDOS --------------------
+def renombrar_por_fecha(args, salida):
+    """
+    Antepone la fecha de emisión al nombre: la primera fecha sugerida por la
+    extracción en los PDFs y DateTimeOriginal en las imágenes. Los renombres van
+    por el diario, así el lote se puede deshacer con el subcomando `deshacer`.
+    """
+    rutas = []
+    for ruta in existentes(leer_rutas(args.rutas, (EXTENSION_PDF,) + IMAGE_EXTENSIONS), salida):
+        if renombrado.ya_renombrado(ruta):
+            salida.emitir({"archivo": ruta, "estado": "ya_renombrado"})
+        else:
+            rutas.append(ruta)
+    fechas = {}
+    extractor = ExtractorFacturas(num_workers=args.workers)
+    try:
+        for ruta, datos in extractor.extraer_carpeta([r for r in rutas if es_pdf(r)]):
+            if "error" in datos:
+                salida.error(ruta, datos["error"])
+            else:
+                fechas[ruta] = datos["fechas"][0] if datos["fechas"] else None
+    finally:
+        extractor.cerrar()
+    for metadata in leer_exif([r for r in rutas if not es_pdf(r)], args.workers):
+        fecha = metadata["issue_date"]
+        fechas[metadata["file_path"]] = fecha.strftime(FORMATO_FECHA) if fecha else None
+
+    pares = []
+    for ruta in rutas:
+        if ruta not in fechas:
+            continue
+        if fechas[ruta] is None:
+            salida.emitir({"archivo": ruta, "estado": "sin_fecha"})
+            continue
+        carpeta = args.destino or os.path.dirname(ruta)
+        pares.append((ruta, os.path.join(carpeta, renombrado.nombre_con_fecha(ruta, fechas[ruta]))))
+
+    if args.simular:
+        for r in renombrado.resolver_colisiones(pares):
+            salida.emitir({"archivo": r.origen, "estado": "simulado", "fecha": fechas[r.origen], "destino": r.destino})
+        return
+    if not pares:
+        return
+
+    if args.destino:
+        os.makedirs(args.destino, exist_ok=True)
+    ruta_lote = renombrado.crear_lote(pares, renombrado.DIRECTORIO_CLI)
+    hechos, errores = renombrado.aplicar_lote(ruta_lote)
+    # Las validaciones siguen al archivo, como cuando se renombra desde el visor
+    validaciones = AlmacenValidaciones()
+    try:
+        for origen, destino in hechos:
+            validaciones.renombrar(origen, destino)
+    finally:
+        validaciones.cerrar()
+    for origen, destino in hechos:
+        salida.emitir({"archivo": origen, "estado": "renombrado", "fecha": fechas[origen],
+                       "destino": destino, "lote": str(ruta_lote)})
+    for origen, mensaje in errores:
+        salida.error(origen, mensaje, fecha=fechas[origen], lote=str(ruta_lote))
+
+
+def deshacer(args, salida):
+    """
+    Revierte lotes de `renombrar-fecha`: los diarios indicados o, sin argumentos,
+    el último. Las validaciones vuelven con los archivos.
+    """
+    diarios = args.diarios or renombrado.lotes(renombrado.DIRECTORIO_CLI)[:1]
+    if not diarios:
+        logging.warning("No hay lotes de renombres para deshacer.")
+        return
+    validaciones = AlmacenValidaciones()
+    try:
+        for ruta_lote in diarios:
+            try:
+                revertidos, errores = renombrado.revertir_lote(ruta_lote)
+            except OSError as e:
+                salida.error(os.path.abspath(ruta_lote), str(e))
+                continue
+            for destino, origen in revertidos:
+                validaciones.renombrar(destino, origen)
+                salida.emitir({"archivo": destino, "estado": "revertido", "destino": origen,
+                               "lote": str(ruta_lote)})
+            for destino, mensaje in errores:
+                salida.error(destino, mensaje, lote=str(ruta_lote))
+    finally:
+        validaciones.cerrar()
+
+
+def dividir(args, salida):
+    """
+    Divide cada PDF según el modo; sin --destino, las partes quedan junto al original.
+    """
+    por_carpeta = {}
+    for ruta in existentes(leer_rutas(args.rutas, (EXTENSION_PDF,)), salida):
+        por_carpeta.setdefault(args.destino or os.path.dirname(ruta), []).append(ruta)
+    for carpeta_destino, rutas in por_carpeta.items():
+        os.makedirs(carpeta_destino, exist_ok=True)
+        for ruta, generadas, error in division.dividir_lote(rutas, carpeta_destino, args.modo, args.valor,
+                                                           num_workers=args.workers):
+            if error:
+                salida.error(ruta, error)
+            else:
+                salida.emitir({"archivo": ruta, "estado": "dividido", "generados": generadas})
+
+
+def organizar(args, salida):
+    """
+    Ordena cada carpeta por extensión con el organizador. Un registro por archivo
+    movido (son renombres dentro del mismo disco, no usa el pool).
+    """
+    for carpeta in leer_rutas_carpetas(args.rutas, salida):
+        plan, errores = organizador.organizar(carpeta, simular=args.simular)
+        fallidos = dict(errores)
+        for mov in plan.movimientos:
+            origen = os.path.join(carpeta, mov.origen)
+            destino = os.path.join(carpeta, mov.destino)
+            if mov.origen in fallidos:
+                salida.error(origen, fallidos[mov.origen], destino=destino)
+            else:
+                salida.emitir({"archivo": origen, "estado": "simulado" if args.simular else "movido",
+                               "destino": destino})
+
+
+def calentar_miniaturas(args, salida):
+    """
+    Deja en la caché de disco las miniaturas que después pide el visor.
+    """
+    cache = CacheMiniaturas()
+    rutas = existentes(leer_rutas(args.rutas, (EXTENSION_PDF,)), salida)
+    for ruta, paginas, en_cache, renderizadas, error in calentar_cache(rutas, cache, args.zoom, args.workers):
+        registro = {"archivo": ruta, "paginas": paginas, "en_cache": en_cache, "renderizadas": renderizadas}
+        if error:
+            salida.error(ruta, error, **registro)
+        else:
+            salida.emitir({**registro, "estado": "ok"})
+
+
+def volcar_metadatos(args, salida):
+    """
+    Fechas, números y CUITs de los PDFs (con la caché de extracción) y los datos
+    EXIF de las imágenes.
+    """
+    rutas = list(existentes(leer_rutas(args.rutas, (EXTENSION_PDF,) + IMAGE_EXTENSIONS), salida))
+    extractor = ExtractorFacturas(num_workers=args.workers)
+    try:
+        for ruta, datos in extractor.extraer_carpeta([r for r in rutas if es_pdf(r)]):
+            if "error" in datos:
+                salida.error(ruta, datos["error"], tipo="pdf")
+            else:
+                salida.emitir({"archivo": ruta, "estado": "ok", "tipo": "pdf", **datos})
+    finally:
+        extractor.cerrar()
+    for metadata in leer_exif([r for r in rutas if not es_pdf(r)], args.workers):
+        salida.emitir({
+            "archivo": metadata["file_path"],
+            "estado": "ok",
+            "tipo": "imagen",
+            "fecha": metadata["issue_date"],
+            "numero": metadata["invoice_number"],
+            "razon_social": metadata["reason_social"],
+        })
+
+
+# -------------------- ARGUMENTOS --------------------
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m pdfmoificador",
+        description="Procesa PDFs e imágenes por lotes y escribe un registro JSON por archivo."
+    )
+    parser.add_argument("--log", help="log con rotación donde quedan los avisos y las trazas de tiempos")
+    subparsers = parser.add_subparsers(dest="subcomando", required=True)
+
+    def subcomando(nombre, funcion, ayuda, workers=True):
+        sub = subparsers.add_parser(nombre, help=ayuda, description=ayuda)
+        sub.add_argument("rutas", nargs="*", help='archivos o carpetas; sin rutas (o "-"), se leen de stdin')
+        if workers:
+            sub.add_argument("--workers", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+        sub.set_defaults(funcion=funcion)
+        return sub
+
+    sub = subcomando("renombrar-fecha", renombrar_por_fecha, "Antepone la fecha de emisión al nombre.")
+    sub.add_argument("--destino", help="carpeta de destino (por defecto, la del archivo)")
+    sub.add_argument("--simular", action="store_true", help="muestra los nombres nuevos sin renombrar")
+
+    sub = subparsers.add_parser("deshacer", help="Revierte lotes de renombrar-fecha.",
+                                description="Revierte lotes de renombrar-fecha.")
+    sub.add_argument("diarios", nargs="*", help="diarios de los lotes (por defecto, el último)")
+    sub.set_defaults(funcion=deshacer)
+
+    sub = subcomando("dividir", dividir, "Divide PDFs en varios archivos.")
+    sub.add_argument("--modo", choices=(division.MODO_RANGOS, division.MODO_CADA, division.MODO_POR_PAGINA),
+                     default=division.MODO_POR_PAGINA)
+    sub.add_argument("--valor", help='rangos ("1-3,5,8-") o páginas por archivo, según el modo')
+    sub.add_argument("--destino", help="carpeta de destino (por defecto, la del archivo)")
+
+    sub = subcomando("organizar", organizar, "Ordena carpetas en subcarpetas por extensión.", workers=False)
+    sub.add_argument("--simular", action="store_true", help="muestra los movimientos sin mover nada")
+
+    sub = subcomando("miniaturas", calentar_miniaturas, "Precalienta la caché de miniaturas del visor.")
+    sub.add_argument("--zoom", type=float, default=ZOOM_MINIATURA)
+
+    subcomando("metadatos", volcar_metadatos, "Vuelca los metadatos de PDFs e imágenes.")
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "workers", None) is not None and args.workers < 1:
+        parser.error("--workers debe ser mayor a cero.")
+    if args.subcomando == "dividir" and args.modo != division.MODO_POR_PAGINA and not args.valor:
+        parser.error(f"el modo {args.modo} necesita --valor.")
+    if args.log:
+        trazas.configurar_log(args.log)
+    else:
+        # stdout es para los registros; los avisos van a stderr
+        logging.basicConfig(level=logging.WARNING, stream=sys.stderr, format=trazas.FORMATO_LOG)
+
+    salida = Salida()
+    try:
+        args.funcion(args, salida)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # El que leía la salida (head, por ejemplo) terminó antes; que el cierre
+        # de stdout al salir no vuelva a fallar
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 1 if salida.errores else 0
@@ -0,0 +1,41 @@
+import sys
+import types
+import importlib.util
+
+
+class _Faltante(types.ModuleType):
+    """
+    Módulo que no está instalado: recién falla cuando se lo usa, así lo que no
+    lo necesita (por ejemplo, organizar carpetas sin exifread) funciona igual.
+    """
+
+    def __getattr__(self, atributo):
+        raise ImportError(f"Falta el módulo '{self.__name__}' (instálelo para usar esta función).")
+
+
+def perezoso(nombre):
+    """
+    Importa un módulo recién cuando se accede a uno de sus atributos.
+    fitz, PIL y exifread tardan cientos de milisegundos en importarse y la mayoría
+    de los trabajos por lotes no los usa todos.
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    try:
+        spec = importlib.util.find_spec(nombre)
+    except ImportError:
+        spec = None
+    if spec is None:
+        return _Faltante(nombre)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# Dependencias pesadas, compartidas por todo el paquete y las interfaces
+fitz = perezoso("fitz")  # PyMuPDF
+Image = perezoso("PIL.Image")
+ImageTk = perezoso("PIL.ImageTk")
+exifread = perezoso("exifread")
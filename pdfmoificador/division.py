@@ -0,0 +1,151 @@
+import os
+import re
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .dependencias import fitz
+
+
+# Modos de división
+MODO_RANGOS = "rangos"      # Un archivo con las páginas de la especificación ("1-3,5,8-")
+MODO_CADA = "cada"          # Un archivo cada N páginas
+MODO_POR_PAGINA = "pagina"  # Un archivo por página
+
+PATRON_TRAMO = re.compile(r"^(\d*)\s*-\s*(\d*)$|^(\d+)$")
+
+
+def parsear_rangos(especificacion, total_paginas):
+    """
+    Convierte '1-3,5,8-' en tramos 0-based inclusivos [(0, 2), (4, 4), (7, total-1)].
+    '8-' llega hasta el final y '-3' empieza en la primera página.
+    Lanza ValueError con un mensaje para mostrar al usuario.
+    """
+    tramos = []
+    for parte in especificacion.split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        m = PATRON_TRAMO.match(parte)
+        if not m or parte == "-":
+            raise ValueError(f"Formato inválido: '{parte}'. Use por ejemplo '1-3,5,8-'.")
+        if m.group(3):
+            inicio = fin = int(m.group(3))
+        else:
+            inicio = int(m.group(1)) if m.group(1) else 1
+            fin = int(m.group(2)) if m.group(2) else total_paginas
+        if inicio > fin:
+            raise ValueError(f"Rango invertido: '{parte}'.")
+        if inicio < 1 or fin > total_paginas:
+            raise ValueError(f"El rango '{parte}' está fuera de las {total_paginas} páginas.")
+        tramos.append((inicio - 1, fin - 1))
+    if not tramos:
+        raise ValueError("Debe especificar un rango de páginas.")
+    return tramos
+
+
+def _unir_contiguos(tramos):
+    """
+    Junta tramos consecutivos ((0, 2), (3, 3) -> (0, 3)) para copiarlos con un solo insert_pdf.
+    """
+    unidos = []
+    for inicio, fin in tramos:
+        if unidos and unidos[-1][1] + 1 == inicio:
+            unidos[-1] = (unidos[-1][0], fin)
+        else:
+            unidos.append((inicio, fin))
+    return unidos
+
+
+def _tramo_texto(inicio, fin):
+    return str(inicio + 1) if inicio == fin else f"{inicio+1}-{fin+1}"
+
+
+def planificar(total_paginas, modo, valor=None):
+    """
+    Devuelve una lista de salidas; cada salida es (sufijo, [tramos]).
+    El sufijo escribe los tramos como "3" o "1-3" separados por comas
+    ("1,3" y "1-3" no deben dar el mismo nombre).
+    """
+    if modo == MODO_RANGOS:
+        tramos = _unir_contiguos(parsear_rangos(valor, total_paginas))
+        sufijo = ",".join(_tramo_texto(i, f) for i, f in tramos)
+        return [(sufijo, tramos)]
+    if modo == MODO_CADA:
+        try:
+            n = int(valor)
+        except (TypeError, ValueError):
+            raise ValueError("Ingrese la cantidad de páginas por archivo.")
+        if n < 1:
+            raise ValueError("La cantidad de páginas por archivo debe ser mayor a cero.")
+    elif modo == MODO_POR_PAGINA:
+        n = 1
+    else:
+        raise ValueError(f"Modo de división desconocido: {modo}")
+
+    salidas = []
+    for inicio in range(0, total_paginas, n):
+        fin = min(inicio + n, total_paginas) - 1
+        sufijo = _tramo_texto(inicio, fin)
+        salidas.append((sufijo, [(inicio, fin)]))
+    return salidas
+
+
+def _ruta_libre(carpeta_destino, base):
+    ruta = Path(carpeta_destino) / f"{base}.pdf"
+    c = 1
+    while ruta.exists():
+        ruta = Path(carpeta_destino) / f"{base}_{c}.pdf"
+        c += 1
+    return ruta
+
+
+def dividir_pdf(ruta_pdf, carpeta_destino, modo, valor=None):
+    """
+    Divide un PDF según el modo y devuelve las rutas generadas.
+    Cada tramo contiguo se copia con un solo insert_pdf y la salida se guarda
+    con recolección de objetos sin uso y compresión deflate.
+    """
+    base_original = os.path.splitext(os.path.basename(ruta_pdf))[0]
+    generadas = []
+    with fitz.open(ruta_pdf) as doc:
+        for sufijo, tramos in planificar(len(doc), modo, valor):
+            with fitz.open() as salida:
+                for inicio, fin in tramos:
+                    salida.insert_pdf(doc, from_page=inicio, to_page=fin)
+                ruta_salida = _ruta_libre(carpeta_destino, f"{base_original}_pag_{sufijo}")
+                salida.save(ruta_salida, garbage=3, deflate=True)
+            generadas.append(str(ruta_salida))
+    return generadas
+
+
+def dividir_seguro(ruta_pdf, carpeta_destino, modo, valor=None):
+    """
+    Como `dividir_pdf`, pero devuelve (ruta, generadas, error) en vez de lanzar.
+    Se ejecuta en los procesos del pool.
+    """
+    try:
+        return ruta_pdf, dividir_pdf(ruta_pdf, carpeta_destino, modo, valor), None
+    except Exception as e:
+        return ruta_pdf, [], str(e)
+
+
+def dividir_lote(rutas_pdf, carpeta_destino, modo, valor=None, num_workers=None):
+    """
+    Divide muchos PDFs en paralelo. Devuelve un generador de (ruta, generadas, error)
+    en el orden en que terminan.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    if len(rutas_pdf) == 1:
+        # Un solo archivo: no vale la pena levantar procesos
+        yield dividir_seguro(rutas_pdf[0], carpeta_destino, modo, valor)
+        return
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        futures = [
+            pool.submit(dividir_seguro, ruta, carpeta_destino, modo, valor)
+            for ruta in rutas_pdf
+        ]
+        for fut in as_completed(futures):
+            ruta, generadas, error = fut.result()
+            if error:
+                logging.warning(f"No se pudo dividir {ruta}: {error}")
+            yield ruta, generadas, error
@@ -0,0 +1,160 @@
+import os
+import re
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+TAM_PARCIAL = 64 * 1024
+TAM_BLOQUE = 1024 * 1024
+REGISTRO_CUARENTENA = "cuarentena.txt"
+# Carpeta de cuarentena por defecto (dentro de la carpeta revisada); no se revisa
+CARPETA_CUARENTENA = "_duplicados"
+
+# Nombres típicos de copias: "x - copia.pdf", "x (1).pdf", "x - copia (2).pdf"
+PATRON_COPIA = re.compile(r"( - copia| - copy|\(\d+\))", re.IGNORECASE)
+
+
+def _hash(ruta, limite=None):
+    """
+    Hash del archivo completo o de sus primeros `limite` bytes.
+    Se ejecuta en hilos: hashlib libera el GIL con bloques grandes.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    leidos = 0
+    with open(ruta, "rb") as f:
+        while limite is None or leidos < limite:
+            bloque = f.read(TAM_BLOQUE if limite is None else min(TAM_BLOQUE, limite - leidos))
+            if not bloque:
+                break
+            h.update(bloque)
+            leidos += len(bloque)
+    return h.hexdigest()
+
+
+def _listar(carpetas, extensiones):
+    """
+    Devuelve {tamaño: [rutas]} recorriendo las carpetas con os.scandir.
+    Los enlaces duros al mismo archivo cuentan una sola vez.
+    """
+    por_tamano = defaultdict(list)
+    vistos = set()
+    pendientes = list(carpetas)
+    while pendientes:
+        carpeta = pendientes.pop()
+        try:
+            with os.scandir(carpeta) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        if entrada.name != CARPETA_CUARENTENA:
+                            pendientes.append(entrada.path)
+                    elif entrada.is_file(follow_symlinks=False):
+                        if extensiones and not entrada.name.lower().endswith(extensiones):
+                            continue
+                        st = entrada.stat(follow_symlinks=False)
+                        if st.st_size == 0 or (st.st_dev, st.st_ino) in vistos:
+                            continue
+                        if st.st_ino:
+                            vistos.add((st.st_dev, st.st_ino))
+                        por_tamano[st.st_size].append(entrada.path)
+        except OSError as e:
+            logging.warning(f"No se pudo leer {carpeta}: {e}")
+    return por_tamano
+
+
+def _agrupar_por_hash(pool, rutas, limite=None):
+    """
+    Agrupa las rutas por hash y devuelve sólo los grupos con más de un archivo.
+    """
+    grupos = defaultdict(list)
+    for ruta, digest in zip(rutas, pool.map(lambda r: _hash_seguro(r, limite), rutas)):
+        if digest is not None:
+            grupos[digest].append(ruta)
+    return [g for g in grupos.values() if len(g) > 1]
+
+
+def _hash_seguro(ruta, limite):
+    try:
+        return _hash(ruta, limite)
+    except OSError as e:
+        logging.warning(f"No se pudo leer {ruta}: {e}")
+        return None
+
+
+def _orden_original(ruta):
+    """
+    El archivo que se conserva: el que no parece copia, el de ruta más corta y,
+    a igualdad, el primero alfabéticamente.
+    """
+    return (bool(PATRON_COPIA.search(ruta)), len(ruta), ruta)
+
+
+def buscar_duplicados(carpetas, extensiones=None, num_workers=None):
+    """
+    Busca archivos con contenido idéntico (recursivo). Devuelve una lista de grupos;
+    en cada grupo el primero es el que se conserva y el resto son duplicados.
+
+    Etapas: tamaño igual -> hash de los primeros 64 KB -> hash completo, y cada
+    etapa sólo procesa lo que sobrevivió a la anterior.
+    """
+    if isinstance(carpetas, str):
+        carpetas = [carpetas]
+    if extensiones:
+        extensiones = tuple(e.lower() for e in extensiones)
+    por_tamano = _listar(carpetas, extensiones)
+    candidatos = {tam: rutas for tam, rutas in por_tamano.items() if len(rutas) > 1}
+
+    grupos = []
+    with ThreadPoolExecutor(max_workers=num_workers or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        for tam, rutas in candidatos.items():
+            for grupo in _agrupar_por_hash(pool, rutas, TAM_PARCIAL):
+                # Si el archivo entra en el hash parcial, ya es el hash completo
+                grupos += [grupo] if tam <= TAM_PARCIAL else _agrupar_por_hash(pool, grupo)
+
+    grupos = [sorted(g, key=_orden_original) for g in grupos]
+    grupos.sort(key=lambda g: g[0])
+    logging.info(
+        f"Duplicados: {sum(len(r) for r in por_tamano.values())} archivos revisados, "
+        f"{sum(len(g) - 1 for g in grupos)} duplicados en {len(grupos)} grupos."
+    )
+    return grupos
+
+
+def reporte(grupos):
+    """
+    Texto legible con cada original y sus copias.
+    """
+    lineas = []
+    for grupo in grupos:
+        lineas.append(grupo[0])
+        lineas += [f"    = {ruta}" for ruta in grupo[1:]]
+    return "\n".join(lineas)
+
+
+def poner_en_cuarentena(grupos, carpeta_cuarentena):
+    """
+    Mueve los duplicados (no el original) a la carpeta de cuarentena y anota cada
+    movimiento en cuarentena.txt para poder deshacerlo. Devuelve los movidos.
+    """
+    os.makedirs(carpeta_cuarentena, exist_ok=True)
+    movidos = []
+    with open(os.path.join(carpeta_cuarentena, REGISTRO_CUARENTENA), "a", encoding="utf-8") as registro:
+        for grupo in grupos:
+            for ruta in grupo[1:]:
+                base, ext = os.path.splitext(os.path.basename(ruta))
+                destino = os.path.join(carpeta_cuarentena, base + ext)
+                c = 1
+                while os.path.exists(destino):
+                    destino = os.path.join(carpeta_cuarentena, f"{base}_{c}{ext}")
+                    c += 1
+                try:
+                    shutil.move(ruta, destino)
+                except OSError as e:
+                    logging.warning(f"No se pudo mover {ruta} a cuarentena: {e}")
+                    continue
+                registro.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} | {ruta} -> {destino} | original: {grupo[0]}\n")
+                movidos.append((ruta, destino))
+    return movidos
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import logging
+from datetime import date
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from .dependencias import fitz
+
+
+RUTA_CACHE_POR_DEFECTO = Path.home() / ".visor_pdf_cache" / "extraccion.sqlite"
+
+# Sólo se leen las primeras páginas: ahí está el encabezado de la factura
+PAGINAS_A_LEER = 2
+
+# -------------------- PATRONES --------------------
+# Fechas: 06-08-2019, 06/08/2019, 06.08.19, 2019-08-06
+PATRON_FECHA_DMA = re.compile(r"\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4}|\d{2})\b")
+PATRON_FECHA_AMD = re.compile(r"\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b")
+# Las fechas cerca de estas palabras tienen prioridad
+PATRON_CONTEXTO_FECHA = re.compile(r"fecha(?:\s+de)?(?:\s+emisi[oó]n)?", re.IGNORECASE)
+# Número de comprobante: punto de venta + número (0002-00000177, FA0005-00022300)
+PATRON_NUMERO = re.compile(r"(?<![\d-])(?:[A-Z]{1,2})?(\d{4,5})\s?-\s?(\d{8})(?![\d-])")
+# CUIT: 30-71254346-5 o 30712543465
+PATRON_CUIT = re.compile(r"(?<!\d)(20|23|24|27|30|33|34)-?(\d{8})-?(\d)(?!\d)")
+
+PESOS_CUIT = (5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+
+
+def _cuit_valido(digitos):
+    total = sum(int(d) * p for d, p in zip(digitos[:10], PESOS_CUIT))
+    verificador = 11 - total % 11
+    if verificador == 11:
+        verificador = 0
+    elif verificador == 10:
+        verificador = 9
+    return verificador == int(digitos[10])
+
+
+def _normalizar_fecha(dia, mes, anio):
+    """
+    Devuelve la fecha como 'dd-mm-aaaa' (el formato de los archivos renombrados) o None.
+    """
+    anio = int(anio)
+    if anio < 100:
+        anio += 2000
+    try:
+        fecha = date(anio, int(mes), int(dia))
+    except ValueError:
+        return None
+    if not 1990 <= fecha.year <= date.today().year + 1:
+        return None
+    return fecha.strftime("%d-%m-%Y")
+
+
+def extraer_de_texto(texto):
+    """
+    Busca fechas, números de comprobante y CUITs en un texto.
+    Las listas vienen sin repetidos y ordenadas por relevancia.
+    """
+    # Posiciones donde aparece "Fecha ..." para priorizar las fechas cercanas
+    contextos = [m.end() for m in PATRON_CONTEXTO_FECHA.finditer(texto)]
+
+    candidatas = []
+    for m in PATRON_FECHA_DMA.finditer(texto):
+        candidatas.append((m.start(), _normalizar_fecha(m.group(1), m.group(2), m.group(3))))
+    for m in PATRON_FECHA_AMD.finditer(texto):
+        candidatas.append((m.start(), _normalizar_fecha(m.group(3), m.group(2), m.group(1))))
+
+    def prioridad(candidata):
+        inicio = candidata[0]
+        cerca = any(0 <= inicio - fin <= 40 for fin in contextos)
+        return (not cerca, inicio)
+
+    fechas = []
+    for _, fecha in sorted(candidatas, key=prioridad):
+        if fecha and fecha not in fechas:
+            fechas.append(fecha)
+
+    numeros = []
+    for m in PATRON_NUMERO.finditer(texto):
+        numero = f"{m.group(1)}-{m.group(2)}"
+        if numero not in numeros:
+            numeros.append(numero)
+
+    cuits = []
+    for m in PATRON_CUIT.finditer(texto):
+        digitos = m.group(1) + m.group(2) + m.group(3)
+        if _cuit_valido(digitos) and digitos not in cuits:
+            cuits.append(digitos)
+
+    return {"fechas": fechas, "numeros": numeros, "cuits": cuits}
+
+
+def extraer_de_pdf(ruta_pdf, paginas=PAGINAS_A_LEER):
+    """
+    Extrae candidatos de la capa de texto de las primeras páginas de un PDF.
+    Se ejecuta en los procesos del pool, por eso es una función de módulo.
+    """
+    with fitz.open(ruta_pdf) as doc:
+        texto = "\n".join(doc[i].get_text() for i in range(min(paginas, len(doc))))
+    datos = extraer_de_texto(texto)
+    # El nombre del archivo también suele traer el número (p. ej. "0000-86763069.pdf")
+    for numero in extraer_de_texto(os.path.basename(ruta_pdf))["numeros"]:
+        if numero not in datos["numeros"]:
+            datos["numeros"].append(numero)
+    return datos
+
+
+def _extraer_seguro(ruta_pdf):
+    try:
+        return ruta_pdf, extraer_de_pdf(ruta_pdf)
+    except Exception as e:
+        return ruta_pdf, {"error": str(e)}
+
+
+class ExtractorFacturas:
+    """
+    Extrae fechas, números y CUITs de PDFs y guarda el resultado por huella
+    (tamaño + mtime) en SQLite, así sólo se procesa lo nuevo o modificado.
+    """
+
+    def __init__(self, ruta_cache=RUTA_CACHE_POR_DEFECTO, num_workers=None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        Path(ruta_cache).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(str(ruta_cache), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS extraccion ("
+            " ruta TEXT PRIMARY KEY, huella TEXT NOT NULL, datos TEXT NOT NULL)"
+        )
+        self._conexion.commit()
+
+    @staticmethod
+    def huella(ruta_pdf):
+        st = os.stat(ruta_pdf)
+        return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    def _leer(self, ruta_abs, huella):
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT datos FROM extraccion WHERE ruta = ? AND huella = ?", (ruta_abs, huella)
+            ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def _escribir(self, filas):
+        with self._lock:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO extraccion (ruta, huella, datos) VALUES (?, ?, ?)", filas
+            )
+            self._conexion.commit()
+
+    def sugerencias(self, ruta_pdf):
+        """
+        Resultado para un solo PDF: de la caché si está vigente, si no se extrae ahora.
+        """
+        ruta_abs = os.path.abspath(ruta_pdf)
+        huella = self.huella(ruta_abs)
+        datos = self._leer(ruta_abs, huella)
+        if datos is None:
+            _, datos = _extraer_seguro(ruta_abs)
+            self._escribir([(ruta_abs, huella, json.dumps(datos))])
+        return datos
+
+    def extraer_carpeta(self, rutas, lote=200):
+        """
+        Procesa muchos PDFs en paralelo. Devuelve un generador de (ruta, datos);
+        lo que ya está en caché sale primero y sin tocar el pool.
+        """
+        pendientes = []
+        for ruta in rutas:
+            ruta_abs = os.path.abspath(ruta)
+            try:
+                huella = self.huella(ruta_abs)
+            except OSError:
+                continue
+            datos = self._leer(ruta_abs, huella)
+            if datos is None:
+                pendientes.append((ruta_abs, huella))
+            else:
+                yield ruta_abs, datos
+
+        if not pendientes:
+            return
+
+        huellas = dict(pendientes)
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            filas = []
+            tam_bloque = max(1, min(32, len(pendientes) // (self.num_workers * 4)))
+            try:
+                for ruta_abs, datos in pool.map(_extraer_seguro, huellas, chunksize=tam_bloque):
+                    filas.append((ruta_abs, huellas[ruta_abs], json.dumps(datos)))
+                    if len(filas) >= lote:
+                        self._escribir(filas)
+                        filas = []
+                    yield ruta_abs, datos
+            finally:
+                # También si el que consume corta antes (por ejemplo, al cambiar de
+                # carpeta): lo ya extraído se guarda y lo que falta no se espera
+                if filas:
+                    self._escribir(filas)
+                pool.shutdown(cancel_futures=True)
+        logging.info(f"Extracción de datos: {len(pendientes)} PDFs procesados.")
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
@@ -0,0 +1,108 @@
+import io
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from .cache_miniaturas import CacheMiniaturas, CacheMemoria
+from .dependencias import Image
+
+
+PREVIEW_SIZE = 400
+DEFAULT_PREVIEW_DIR = Path.home() / ".image_metadata_cache" / "previews"
+DEFAULT_DISK_LIMIT = 256 * 1024 * 1024  # 256 MB
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024  # 64 MB
+
+
+def render_preview(image_path, size=PREVIEW_SIZE):
+    """
+    Devuelve los bytes PPM de la vista previa (como máximo size x size).
+    En los JPEG `draft` hace que el decodificador escale por DCT (1/2, 1/4, 1/8),
+    así una foto de 24 MP no se decodifica entera para mostrarla a 400 px.
+    """
+    with Image.open(image_path) as image:
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PPM")
+        return buffer.getvalue()
+
+
+class PreviewCache:
+    """
+    Vistas previas de las imágenes con caché en memoria y en disco.
+
+    Reutiliza las cachés de miniaturas del visor de PDFs: la entrada se invalida
+    sola si cambia el tamaño o la fecha del archivo. `prefetch` decodifica en
+    hilos (PIL libera el GIL al decodificar) lo que probablemente se vea después.
+    """
+
+    def __init__(self, directory=DEFAULT_PREVIEW_DIR, disk_limit=DEFAULT_DISK_LIMIT,
+                 memory_limit=DEFAULT_MEMORY_LIMIT, size=PREVIEW_SIZE, num_workers=2):
+        self.size = size
+        self.disk = CacheMiniaturas(directory, tope_bytes=disk_limit)
+        self.memory = CacheMemoria(tope_bytes=memory_limit)
+        self._pool = ThreadPoolExecutor(max_workers=num_workers)
+        self._prefetching = []
+
+    def _key(self, image_path):
+        """
+        Clave en memoria con la huella (tamaño + mtime), como en disco: una imagen
+        editada no encuentra la vista previa vieja. None si el archivo no existe.
+        """
+        try:
+            return (image_path, CacheMiniaturas.huella(image_path), self.size)
+        except OSError:
+            return None
+
+    def get(self, image_path):
+        """
+        Devuelve los bytes de la caché (memoria o disco) o None.
+        """
+        key = self._key(image_path)
+        if key is None:
+            return None
+        data = self.memory.obtener(key)
+        if data is None:
+            data = self.disk.obtener(image_path, 0, self.size)
+            if data is not None:
+                self.memory.guardar(key, data)
+        return data
+
+    def load(self, image_path):
+        """
+        Devuelve los bytes de la vista previa, generándola si no está en caché.
+        """
+        data = self.get(image_path)
+        if data is None:
+            key = self._key(image_path)
+            data = render_preview(image_path, self.size)
+            if key is not None:
+                self.memory.guardar(key, data)
+            self.disk.guardar(image_path, 0, data, self.size)
+        return data
+
+    def _load_quietly(self, image_path):
+        try:
+            self.load(image_path)
+        except Exception as e:
+            logging.warning(f"No se pudo generar la vista previa de {image_path}: {e}")
+
+    def prefetch(self, image_paths):
+        """
+        Genera en segundo plano las vistas previas que falten. Lo que quedaba
+        pendiente de una llamada anterior se cancela.
+        """
+        for future in self._prefetching:
+            future.cancel()
+        self._prefetching = [
+            self._pool.submit(self._load_quietly, image_path)
+            for image_path in image_paths
+            if self._key(image_path) not in self.memory
+        ]
+
+    def invalidate(self, image_path):
+        self.memory.invalidar(image_path)
+        self.disk.invalidar(image_path)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
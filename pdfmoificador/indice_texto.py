@@ -0,0 +1,191 @@
+import os
+import re
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from .dependencias import fitz
+
+
+NOMBRE_INDICE = ".indice_pdf.sqlite"
+# El rowid de cada página es id_archivo * PAGINAS_POR_ARCHIVO + page_index,
+# así se borran las páginas de un archivo por rango sin recorrer la tabla
+PAGINAS_POR_ARCHIVO = 100000
+
+PATRON_PALABRA = re.compile(r"\w+", re.UNICODE)
+
+
+def _texto_paginas(ruta_pdf):
+    """
+    Texto de cada página de un PDF. Se ejecuta en los procesos del pool.
+    Si no se pudo leer (por ejemplo, porque todavía se está escribiendo) devuelve
+    None en vez del texto, para no darlo por indexado.
+    """
+    try:
+        with fitz.open(ruta_pdf) as doc:
+            return ruta_pdf, [page.get_text() for page in doc]
+    except Exception as e:
+        logging.warning(f"No se pudo leer el texto de {ruta_pdf}: {e}")
+        return ruta_pdf, None
+
+
+class IndiceTexto:
+    """
+    Índice de texto completo (SQLite FTS5) de los PDFs de una carpeta.
+
+    La base se guarda dentro de la misma carpeta. Cada archivo se registra con su
+    huella (tamaño + mtime), así al actualizar sólo se reindexa lo nuevo o
+    modificado y se borra lo que ya no está.
+    """
+
+    def __init__(self, directorio, num_workers=None):
+        self.directorio = directorio
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(
+            os.path.join(directorio, NOMBRE_INDICE), check_same_thread=False
+        )
+        self._conexion.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS archivos (
+                id INTEGER PRIMARY KEY, nombre TEXT UNIQUE NOT NULL, huella TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS paginas USING fts5(
+                texto, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        self._conexion.commit()
+
+    @staticmethod
+    def huella(ruta_pdf):
+        st = os.stat(ruta_pdf)
+        return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    def actualizar(self, nombres_pdf, borrar_ausentes=True):
+        """
+        Sincroniza el índice con la lista de PDFs de la carpeta.
+        Con `borrar_ausentes=False` sólo (re)indexa los nombres dados, sin tocar
+        el resto (para cambios puntuales informados por el vigilante de carpeta).
+        Devuelve cuántos archivos se (re)indexaron. Los que no se pudieron leer
+        quedan sin huella y se reintentan en la próxima actualización.
+        """
+        with self._lock:
+            indexados = dict(self._conexion.execute("SELECT nombre, huella FROM archivos"))
+
+        actuales = {}
+        for nombre in nombres_pdf:
+            try:
+                actuales[nombre] = self.huella(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+
+        borrados = [n for n in indexados if n not in actuales] if borrar_ausentes else []
+        cambiados = [n for n, h in actuales.items() if indexados.get(n) != h]
+
+        with self._lock:
+            for nombre in borrados:
+                self._borrar(nombre)
+            self._conexion.commit()
+
+        if not cambiados:
+            return 0
+
+        rutas = [os.path.join(self.directorio, n) for n in cambiados]
+        indexados = 0
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            for ruta_pdf, textos in pool.map(_texto_paginas, rutas, chunksize=8):
+                nombre = os.path.basename(ruta_pdf)
+                with self._lock:
+                    self._borrar(nombre)
+                    if textos is None:
+                        # Sin fila en `archivos`: el texto viejo ya no vale y se reintenta
+                        self._conexion.commit()
+                        continue
+                    id_archivo = self._conexion.execute(
+                        "INSERT INTO archivos (nombre, huella) VALUES (?, ?)",
+                        (nombre, actuales[nombre])
+                    ).lastrowid
+                    base = id_archivo * PAGINAS_POR_ARCHIVO
+                    self._conexion.executemany(
+                        "INSERT INTO paginas (rowid, texto) VALUES (?, ?)",
+                        [(base + i, texto) for i, texto in enumerate(textos[:PAGINAS_POR_ARCHIVO])]
+                    )
+                    self._conexion.commit()
+                indexados += 1
+
+        logging.info(f"Índice de texto: {indexados} de {len(cambiados)} PDFs indexados, {len(borrados)} quitados.")
+        return indexados
+
+    def _borrar(self, nombre):
+        fila = self._conexion.execute("SELECT id FROM archivos WHERE nombre = ?", (nombre,)).fetchone()
+        if fila is None:
+            return
+        base = fila[0] * PAGINAS_POR_ARCHIVO
+        self._conexion.execute(
+            "DELETE FROM paginas WHERE rowid BETWEEN ? AND ?", (base, base + PAGINAS_POR_ARCHIVO - 1)
+        )
+        self._conexion.execute("DELETE FROM archivos WHERE id = ?", (fila[0],))
+
+    @staticmethod
+    def _consulta_fts(texto):
+        """
+        Convierte lo que escribe el usuario en una consulta FTS5 segura:
+        cada palabra es un prefijo y todas deben aparecer.
+        """
+        palabras = PATRON_PALABRA.findall(texto)
+        return " ".join(f'"{p}"*' for p in palabras)
+
+    def buscar(self, texto, limite=1000):
+        """
+        Devuelve [(nombre_pdf, page_index, fragmento), ...] ordenado por relevancia.
+        """
+        consulta = self._consulta_fts(texto)
+        if not consulta:
+            return []
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT a.nombre, p.rowid % ?, snippet(paginas, 0, '[', ']', '…', 8) "
+                "FROM paginas p JOIN archivos a ON a.id = p.rowid / ? "
+                "WHERE paginas MATCH ? ORDER BY rank LIMIT ?",
+                (PAGINAS_POR_ARCHIVO, PAGINAS_POR_ARCHIVO, consulta, limite)
+            ).fetchall()
+        return filas
+
+    def filtrar(self, nombres_pdf, texto):
+        """
+        Devuelve los nombres de la lista que tienen alguna página que coincide,
+        conservando el orden original.
+        """
+        consulta = self._consulta_fts(texto)
+        if not consulta:
+            return list(nombres_pdf)
+        with self._lock:
+            coincidencias = {
+                fila[0] for fila in self._conexion.execute(
+                    "SELECT DISTINCT a.nombre FROM paginas p JOIN archivos a ON a.id = p.rowid / ? "
+                    "WHERE paginas MATCH ?",
+                    (PAGINAS_POR_ARCHIVO, consulta)
+                )
+            }
+        return [n for n in nombres_pdf if n in coincidencias]
+
+    def renombrar(self, nombre_viejo, nombre_nuevo):
+        """
+        Mantiene el índice al renombrar un archivo dentro de la misma carpeta.
+        Si el nombre nuevo ya estaba indexado (renombre sobre un archivo existente),
+        su entrada vieja se descarta.
+        """
+        with self._lock:
+            self._borrar(nombre_nuevo)
+            self._conexion.execute("UPDATE archivos SET nombre = ? WHERE nombre = ?", (nombre_nuevo, nombre_viejo))
+            self._conexion.commit()
+
+    def quitar(self, nombre):
+        with self._lock:
+            self._borrar(nombre)
+            self._conexion.commit()
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+
+
+DEFAULT_CATALOG_PATH = Path.home() / ".image_metadata_cache" / "catalog.sqlite"
+
+
+class MetadataCatalog:
+    """
+    Catálogo persistente de la metadata de las imágenes (SQLite).
+
+    Cada fila guarda ruta, tamaño y mtime junto con issue_date, invoice_number y
+    reason_social. Al abrir una carpeta sólo se vuelven a leer con exifread los
+    archivos nuevos o modificados; el resto sale directo de la base.
+    """
+
+    def __init__(self, db_path=DEFAULT_CATALOG_PATH):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS images (
+                path TEXT PRIMARY KEY,
+                folder TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                issue_date TEXT,
+                invoice_number TEXT,
+                reason_social TEXT
+            );
+            CREATE INDEX IF NOT EXISTS images_folder ON images (folder);
+            """
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _to_metadata(path, issue_date, invoice_number, reason_social):
+        return {
+            "file_name": os.path.basename(path),
+            "file_path": path,
+            "issue_date": date.fromisoformat(issue_date) if issue_date else None,
+            "invoice_number": invoice_number,
+            "reason_social": reason_social,
+        }
+
+    @staticmethod
+    def _to_row(metadata, st):
+        def text(value):
+            return None if value is None else str(value)
+
+        issue_date = metadata["issue_date"]
+        key = os.path.abspath(metadata["file_path"])
+        return (
+            key,
+            os.path.dirname(key),
+            st.st_size,
+            st.st_mtime_ns,
+            issue_date.isoformat() if issue_date else None,
+            text(metadata["invoice_number"]),
+            text(metadata["reason_social"]),
+        )
+
+    def _write(self, rows):
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO images "
+                "(path, folder, size, mtime_ns, issue_date, invoice_number, reason_social) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+
+    def stale_paths(self, image_paths):
+        """
+        Separa las rutas en (metadata vigente del catálogo, rutas a leer de nuevo).
+        También borra del catálogo lo que ya no está en la carpeta.
+        """
+        # Las claves son rutas absolutas; la metadata conserva la ruta tal como vino
+        keys = {p: os.path.abspath(p) for p in image_paths}
+        folders = {os.path.dirname(k) for k in keys.values()}
+        cached = {}
+        with self._lock:
+            for folder in folders:
+                for row in self._connection.execute(
+                    "SELECT path, size, mtime_ns, issue_date, invoice_number, reason_social "
+                    "FROM images WHERE folder = ?", (folder,)
+                ):
+                    cached[row[0]] = row
+
+        fresh = []
+        stale = []
+        for path in image_paths:
+            row = cached.pop(keys[path], None)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if row and row[1] == st.st_size and row[2] == st.st_mtime_ns:
+                fresh.append(self._to_metadata(path, *row[3:]))
+            else:
+                stale.append(path)
+
+        # Lo que quedó en `cached` pertenece a la carpeta pero ya no existe
+        if cached:
+            with self._lock:
+                self._connection.executemany("DELETE FROM images WHERE path = ?", [(p,) for p in cached])
+                self._connection.commit()
+        return fresh, stale
+
+    def store(self, metadata_list):
+        """
+        Guarda (o reemplaza) la metadata recién extraída.
+        """
+        rows = []
+        for metadata in metadata_list:
+            try:
+                rows.append(self._to_row(metadata, os.stat(metadata["file_path"])))
+            except OSError:
+                continue
+        if rows:
+            self._write(rows)
+
+    def load(self, image_paths, extract):
+        """
+        Devuelve la metadata de todas las rutas, en el mismo orden, llamando a
+        `extract(path)` sólo para las que no están en el catálogo o cambiaron.
+        """
+        fresh, stale = self.stale_paths(image_paths)
+        extracted = [extract(path) for path in stale]
+        self.store(extracted)
+        by_path = {md["file_path"]: md for md in fresh + extracted}
+        return [by_path[p] for p in image_paths if p in by_path]
+
+    def rename(self, old_path, new_path):
+        with self._lock:
+            self._connection.execute(
+                "UPDATE OR REPLACE images SET path = ?, folder = ? WHERE path = ?",
+                (os.path.abspath(new_path), os.path.dirname(os.path.abspath(new_path)), os.path.abspath(old_path))
+            )
+            self._connection.commit()
+
+    def remove(self, path):
+        with self._lock:
+            self._connection.execute("DELETE FROM images WHERE path = ?", (os.path.abspath(path),))
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,155 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class MetadataIndex:
+    """
+    Índice en memoria para filtrar la metadata sin recorrer toda la lista.
+
+    `file_name` e `invoice_number` se indexan por trigramas (en minúsculas): una
+    búsqueda por subcadena intersecta los trigramas de la consulta y sólo verifica
+    los candidatos. Las fechas se guardan ordenadas y un rango se resuelve con bisect.
+    Cada entrada se identifica por el dict de metadata (id del objeto), así un
+    renombrado en el lugar se corrige con `reindex(metadata)`.
+
+    `build()` no indexa nada todavía: deja las entradas pendientes para que se
+    indexen de a poco con `index_pending()` sin congelar la interfaz. Si se busca
+    antes de terminar, `search()` completa lo que falta.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # id(metadata) -> (metadata, nombre, comprobante, fecha) tal como quedaron indexados
+        self._entries = {}
+        self._name_grams = defaultdict(set)
+        self._invoice_grams = defaultdict(set)
+        self._dates = []  # (fecha, id) ordenado
+        self._backlog = {}  # id(metadata) -> metadata todavía sin indexar
+
+    def __len__(self):
+        return len(self._entries) + len(self._backlog)
+
+    def build(self, metadata_list):
+        self.clear()
+        self._backlog = {id(metadata): metadata for metadata in metadata_list}
+
+    def index_pending(self, budget_ms=None):
+        """
+        Indexa entradas pendientes hasta agotar el presupuesto de tiempo (o todas si
+        no se indica). Devuelve True si todavía quedan.
+        """
+        limit = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        added = False
+        while self._backlog:
+            _, metadata = self._backlog.popitem()
+            self._add(metadata, self._dates.append)
+            added = True
+            if limit is not None and time.perf_counter() >= limit:
+                break
+        if added:
+            # Una sola ordenación por tanda en vez de insertar fecha por fecha
+            self._dates.sort()
+        return bool(self._backlog)
+
+    def add(self, metadata):
+        self._add(metadata, lambda item: insort(self._dates, item))
+
+    def _add(self, metadata, add_date):
+        key = id(metadata)
+        if key in self._entries:
+            return
+        name = metadata["file_name"].lower()
+        invoice = str(metadata["invoice_number"]).lower() if metadata["invoice_number"] else ""
+        issue_date = metadata["issue_date"]
+        self._entries[key] = (metadata, name, invoice, issue_date)
+        for gram in trigrams(name):
+            self._name_grams[gram].add(key)
+        for gram in trigrams(invoice):
+            self._invoice_grams[gram].add(key)
+        if issue_date:
+            add_date((issue_date, key))
+
+    def remove(self, metadata):
+        key = id(metadata)
+        if self._backlog.pop(key, None) is not None:
+            return
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, name, invoice, issue_date = entry
+        self._discard(self._name_grams, name, key)
+        self._discard(self._invoice_grams, invoice, key)
+        if issue_date:
+            i = bisect_left(self._dates, (issue_date, key))
+            if i < len(self._dates) and self._dates[i] == (issue_date, key):
+                del self._dates[i]
+
+    @staticmethod
+    def _discard(grams_index, text, key):
+        for gram in trigrams(text):
+            postings = grams_index.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del grams_index[gram]
+
+    def reindex(self, metadata):
+        """
+        Vuelve a indexar una entrada que cambió en el lugar (renombrado, EXIF releído).
+        """
+        self.remove(metadata)
+        self.add(metadata)
+
+    def _candidates(self, grams_index, query):
+        """
+        Claves que contienen todos los trigramas de la consulta, o None si la consulta
+        es demasiado corta para usar el índice.
+        """
+        if len(query) < 3:
+            return None
+        postings = sorted((grams_index.get(gram, ()) for gram in trigrams(query)), key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def search(self, name_query="", invoice_query="", start_date=None, end_date=None):
+        """
+        Devuelve la metadata que cumple todos los filtros dados, ordenada por ruta.
+        Los textos se buscan como subcadenas sin distinguir mayúsculas.
+        """
+        self.index_pending()
+        name_query = name_query.lower()
+        invoice_query = invoice_query.lower()
+
+        candidate_sets = []
+        if name_query:
+            candidate_sets.append(self._candidates(self._name_grams, name_query))
+        if invoice_query:
+            candidate_sets.append(self._candidates(self._invoice_grams, invoice_query))
+        if start_date and end_date:
+            lo = bisect_left(self._dates, (start_date,))
+            hi = bisect_right(self._dates, (end_date, float("inf")))
+            candidate_sets.append({key for _, key in self._dates[lo:hi]})
+
+        candidate_sets = sorted((c for c in candidate_sets if c is not None), key=len)
+        if candidate_sets:
+            keys = candidate_sets[0].intersection(*candidate_sets[1:])
+        else:
+            keys = self._entries.keys()
+
+        # Los trigramas sólo acotan: la subcadena se confirma sobre los candidatos
+        result = []
+        for key in keys:
+            metadata, name, invoice, _ = self._entries[key]
+            if name_query and name_query not in name:
+                continue
+            if invoice_query and invoice_query not in invoice:
+                continue
+            result.append(metadata)
+        result.sort(key=lambda md: md["file_path"])
+        return result
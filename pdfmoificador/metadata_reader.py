@@ -0,0 +1,49 @@
+import os
+from datetime import datetime
+from . import trazas
+from .dependencias import exifread
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".jfif")
+
+
+def read_metadata(image_path):
+    """
+    Lee del EXIF sólo las etiquetas que usa la aplicación.
+    Es una función de módulo para poder ejecutarse en los procesos del pool.
+    """
+    try:
+        with open(image_path, 'rb') as img_file:
+            # Sin makernotes ni miniatura embebida: es lo más lento y no se usa
+            tags = exifread.process_file(img_file, details=False, extract_thumbnail=False)
+            issue_date = tags.get("EXIF DateTimeOriginal")
+            invoice_number = tags.get("InvoiceNumber")
+            reason_social = tags.get("ReasonSocial")
+
+            if issue_date:
+                issue_date = datetime.strptime(issue_date.values, "%Y:%m:%d %H:%M:%S").date()
+
+            return {
+                "file_name": os.path.basename(image_path),
+                "file_path": image_path,
+                "issue_date": issue_date,
+                "invoice_number": invoice_number.values if invoice_number else None,
+                "reason_social": reason_social.values if reason_social else None,
+            }
+    except Exception:
+        return {
+            "file_name": os.path.basename(image_path),
+            "file_path": image_path,
+            "issue_date": None,
+            "invoice_number": None,
+            "reason_social": None,
+        }
+
+
+def read_metadata_batch(image_paths):
+    # Los tiempos de exifread viajan con el lote y se escriben en el log al llegar
+    batch = trazas.ConTiempos()
+    for image_path in image_paths:
+        with trazas.tramo("imagen.exif", batch.tiempos, archivo=image_path):
+            batch.append(read_metadata(image_path))
+    return batch
@@ -0,0 +1,216 @@
+import os
+import json
+import logging
+from collections import namedtuple, defaultdict
+
+
+MANIFIESTO = ".organizador.json"
+RESUMEN = "summary.txt"
+# Archivos propios del organizador que nunca se mueven
+ARCHIVOS_PROPIOS = {MANIFIESTO, RESUMEN}
+
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png", ".gif")
+
+Movimiento = namedtuple("Movimiento", ["origen", "destino"])
+# movimientos: rutas relativas a `raiz`; conteo: extensión -> cantidad de archivos al terminar;
+# archivos: ruta final relativa -> (tamaño, mtime_ns) de todo lo que queda organizado
+Plan = namedtuple("Plan", ["raiz", "movimientos", "conteo", "archivos", "carpetas_a_borrar"])
+
+
+def carpeta_para(extension):
+    """
+    Carpeta (relativa a la raíz) que le corresponde a una extensión en minúsculas.
+    Los archivos sin extensión quedan en la raíz.
+    """
+    if extension == ".pdf":
+        return "pdf"
+    if extension in EXTENSIONES_IMAGEN:
+        return "imagenes"
+    return extension[1:]
+
+
+def _destino_ideal(nombre):
+    return os.path.join(carpeta_para(os.path.splitext(nombre)[1].lower()), nombre)
+
+
+def leer_manifiesto(raiz):
+    try:
+        with open(os.path.join(raiz, MANIFIESTO), encoding="utf-8") as f:
+            datos = json.load(f)
+        return datos.get("archivos", {}), datos.get("carpetas", {})
+    except (OSError, ValueError):
+        return {}, {}
+
+
+def _escanear(raiz, manifiesto, carpetas_manifiesto):
+    """
+    Recorre el árbol con os.scandir una sola vez. Devuelve (archivos, carpetas):
+    archivos es [(ruta_rel, tamaño, mtime_ns)] y carpetas las subcarpetas encontradas.
+    Una carpeta del manifiesto cuyo mtime no cambió no se vuelve a listar: su
+    contenido se toma del manifiesto (nadie agregó, quitó ni renombró nada adentro).
+    """
+    archivos = []
+    carpetas = []
+    pendientes = [""]
+    while pendientes:
+        rel_carpeta = pendientes.pop()
+        ruta_carpeta = os.path.join(raiz, rel_carpeta)
+        if rel_carpeta:
+            carpetas.append(rel_carpeta)
+            try:
+                mtime = os.stat(ruta_carpeta).st_mtime_ns
+            except OSError:
+                continue
+            if carpetas_manifiesto.get(rel_carpeta) == mtime:
+                prefijo = rel_carpeta + os.sep
+                archivos += [
+                    (rel, *datos) for rel, datos in manifiesto.items()
+                    if rel.startswith(prefijo) and os.sep not in rel[len(prefijo):]
+                ]
+                continue
+        try:
+            with os.scandir(ruta_carpeta) as entradas:
+                for entrada in entradas:
+                    rel = os.path.join(rel_carpeta, entrada.name)
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendientes.append(rel)
+                    elif entrada.is_file(follow_symlinks=False):
+                        if not rel_carpeta and entrada.name in ARCHIVOS_PROPIOS:
+                            continue
+                        st = entrada.stat(follow_symlinks=False)
+                        archivos.append((rel, st.st_size, st.st_mtime_ns))
+        except OSError as e:
+            logging.warning(f"No se pudo leer {ruta_carpeta}: {e}")
+    return archivos, carpetas
+
+
+def planificar(raiz):
+    """
+    Calcula el destino final de cada archivo sin mover nada (sirve como simulación).
+
+    Lo que ya está en su carpeta se queda donde está. Para el resto, las colisiones
+    se resuelven siempre igual: se procesa en orden alfabético de ruta y a los
+    nombres repetidos se les agrega _1, _2, ... antes de la extensión.
+    """
+    manifiesto, carpetas_manifiesto = leer_manifiesto(raiz)
+    archivos, carpetas = _escanear(raiz, manifiesto, carpetas_manifiesto)
+    archivos.sort()
+
+    # Primero se reservan los nombres de lo que no se mueve
+    ocupados = set()
+    quedan = []
+    a_mover = []
+    for rel, tam, mtime in archivos:
+        if _destino_ideal(os.path.basename(rel)) == rel:
+            ocupados.add(os.path.normcase(rel))
+            quedan.append((rel, tam, mtime))
+        else:
+            a_mover.append((rel, tam, mtime))
+
+    movimientos = []
+    finales = {rel: [tam, mtime] for rel, tam, mtime in quedan}
+    for rel, tam, mtime in a_mover:
+        nombre = os.path.basename(rel)
+        base, ext = os.path.splitext(nombre)
+        carpeta = carpeta_para(ext.lower())
+        destino = os.path.join(carpeta, nombre)
+        c = 1
+        while os.path.normcase(destino) in ocupados:
+            destino = os.path.join(carpeta, f"{base}_{c}{ext}")
+            c += 1
+        ocupados.add(os.path.normcase(destino))
+        movimientos.append(Movimiento(rel, destino))
+        finales[destino] = [tam, mtime]
+
+    conteo = defaultdict(int)
+    for rel in finales:
+        conteo[os.path.splitext(rel)[1].lower()] += 1
+
+    # Las subcarpetas que no son de destino se vacían y se borran, como antes
+    destinos = {os.path.dirname(rel) for rel in finales}
+    carpetas_a_borrar = sorted(
+        (c for c in carpetas if not any(d == c or d.startswith(c + os.sep) for d in destinos)),
+        key=lambda c: c.count(os.sep), reverse=True
+    )
+    return Plan(raiz, movimientos, dict(conteo), finales, carpetas_a_borrar)
+
+
+def aplicar(plan):
+    """
+    Ejecuta los movimientos del plan, borra las carpetas vacías y guarda el
+    manifiesto y el resumen. Devuelve la lista de errores (origen, mensaje).
+    """
+    errores = []
+    archivos = dict(plan.archivos)
+
+    for carpeta in sorted({os.path.dirname(m.destino) for m in plan.movimientos} - {""}):
+        try:
+            os.makedirs(os.path.join(plan.raiz, carpeta), exist_ok=True)
+        except OSError as e:
+            # Los movimientos a esta carpeta van a fallar y quedar en los errores
+            logging.warning(f"No se pudo crear la carpeta {carpeta}: {e}")
+
+    for mov in plan.movimientos:
+        destino = os.path.join(plan.raiz, mov.destino)
+        try:
+            # El plan no reutiliza nombres, pero alguien pudo crear el archivo mientras tanto
+            if os.path.exists(destino):
+                raise FileExistsError(f"{mov.destino} ya existe")
+            os.rename(os.path.join(plan.raiz, mov.origen), destino)
+        except OSError as e:
+            errores.append((mov.origen, str(e)))
+            archivos.pop(mov.destino, None)
+            logging.warning(f"No se pudo mover {mov.origen} a {mov.destino}: {e}")
+
+    for carpeta in plan.carpetas_a_borrar:
+        try:
+            os.rmdir(os.path.join(plan.raiz, carpeta))
+        except OSError:
+            logging.info(f"No se pudo eliminar la carpeta {carpeta}, puede que no esté vacía.")
+
+    _guardar_manifiesto(plan.raiz, archivos)
+    escribir_resumen(plan.raiz, plan.conteo)
+    logging.info(f"Organizador: {len(plan.movimientos)} archivos movidos en {plan.raiz}, {len(errores)} errores.")
+    return errores
+
+
+def organizar(raiz, simular=False):
+    """
+    Planifica y, salvo que se pida simular, aplica. Devuelve (plan, errores).
+    """
+    plan = planificar(raiz)
+    errores = [] if simular else aplicar(plan)
+    return plan, errores
+
+
+def _guardar_manifiesto(raiz, archivos):
+    # mtime de cada carpeta de destino después de mover: si no cambia, no hay que volver a listarla
+    # (sólo si no tiene subcarpetas: un archivo nuevo adentro de una subcarpeta no cambia su mtime)
+    carpetas = {}
+    for carpeta in {os.path.dirname(rel) for rel in archivos} - {""}:
+        ruta_carpeta = os.path.join(raiz, carpeta)
+        try:
+            with os.scandir(ruta_carpeta) as entradas:
+                if any(e.is_dir(follow_symlinks=False) for e in entradas):
+                    continue
+            carpetas[carpeta] = os.stat(ruta_carpeta).st_mtime_ns
+        except OSError:
+            pass
+    ruta = os.path.join(raiz, MANIFIESTO)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "archivos": archivos, "carpetas": carpetas}, f)
+    os.replace(temporal, ruta)
+
+
+def formatear_conteo(conteo):
+    texto = "Conteo de archivos por extensión:\n"
+    for extension, count in conteo.items():
+        texto += f"{extension}: {count}\n"
+    texto += f"\nTotales: {sum(conteo.values())} archivos\n"
+    return texto
+
+
+def escribir_resumen(raiz, conteo):
+    with open(os.path.join(raiz, RESUMEN), "w") as f:
+        f.write(formatear_conteo(conteo))
@@ -0,0 +1,71 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .dependencias import fitz
+
+
+class Precargador:
+    """
+    Renderiza en segundo plano las páginas de paginación vecinas a la actual.
+
+    Las miniaturas quedan en la caché en memoria del motor (y en disco), así que al
+    pasar de página los futures se resuelven al instante. Al moverse, lo que ya no
+    es vecino se cancela para no competir con la página visible.
+    """
+
+    def __init__(self, motor, profundidad=1, max_paginas_por_pdf=20):
+        self.motor = motor
+        self.profundidad = profundidad
+        # De un PDF largo sólo se precargan las primeras páginas (las que se ven al llegar)
+        self.max_paginas_por_pdf = max_paginas_por_pdf
+        # Un solo hilo para abrir PDFs y consultar la caché; el render va al pool del motor
+        self._hilo = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        # ruta_pdf -> futures de su precarga
+        self._trabajos = {}
+
+    def actualizar(self, paginas_vecinas, pagina_actual=()):
+        """
+        Recibe las listas de rutas de las páginas vecinas, en orden de prioridad, y
+        las de la página que se muestra: su precarga no se cancela, porque son
+        justo las miniaturas que la vista está por pedir.
+        """
+        vecinas = [ruta for pagina in paginas_vecinas for ruta in pagina]
+        with self._lock:
+            for ruta in list(self._trabajos):
+                if ruta not in vecinas:
+                    futures = self._trabajos.pop(ruta)
+                    if ruta not in pagina_actual:
+                        for fut in futures:
+                            fut.cancel()
+            for ruta in vecinas:
+                if ruta not in self._trabajos:
+                    self._trabajos[ruta] = [self._hilo.submit(self._precargar, ruta)]
+
+    def _precargar(self, ruta_pdf):
+        try:
+            with fitz.open(ruta_pdf) as doc:
+                num_paginas = len(doc)
+        except Exception as e:
+            logging.warning(f"No se pudo precargar {ruta_pdf}: {e}")
+            return
+
+        futures = self.motor.renderizar(ruta_pdf, range(min(num_paginas, self.max_paginas_por_pdf)))
+        with self._lock:
+            if ruta_pdf in self._trabajos:
+                self._trabajos[ruta_pdf].extend(futures)
+                return
+        # Dejó de ser vecina mientras se abría
+        for fut in futures:
+            fut.cancel()
+
+    def cancelar_todo(self):
+        with self._lock:
+            for futures in self._trabajos.values():
+                for fut in futures:
+                    fut.cancel()
+            self._trabajos.clear()
+
+    def cerrar(self):
+        self.cancelar_todo()
+        self._hilo.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,256 @@
+import os
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from . import trazas
+from .dependencias import fitz
+
+
+ZOOM_MINIATURA = 0.2
+
+
+def renderizar_paginas(ruta_pdf, indices, zoom=ZOOM_MINIATURA):
+    """
+    Se ejecuta en un proceso del pool: abre el PDF una sola vez y devuelve
+    [(page_index, bytes_ppm), ...]. Si una página falla, sus bytes son None.
+    Los tiempos de abrir, rasterizar y codificar a PPM viajan en `tiempos`.
+    """
+    resultados = trazas.ConTiempos()
+    matriz = fitz.Matrix(zoom, zoom)
+    with trazas.tramo("render.abrir", resultados.tiempos, archivo=ruta_pdf):
+        doc = fitz.open(ruta_pdf)
+    with doc:
+        for page_index in indices:
+            try:
+                with trazas.tramo("render.rasterizar", resultados.tiempos, archivo=ruta_pdf, pagina=page_index):
+                    pix = doc[page_index].get_pixmap(matrix=matriz)
+                with trazas.tramo("render.ppm", resultados.tiempos, archivo=ruta_pdf, pagina=page_index):
+                    resultados.append((page_index, pix.tobytes("ppm")))
+            except Exception:
+                resultados.append((page_index, None))
+    return resultados
+
+
+def medidas_paginas(ruta_pdf):
+    """
+    Rectángulos de todas las páginas, sin renderizar nada.
+    """
+    with fitz.open(ruta_pdf) as doc:
+        return [page.rect for page in doc]
+
+
+def calentar_cache(rutas_pdf, cache, zoom=ZOOM_MINIATURA, num_workers=None):
+    """
+    Renderiza a la caché de disco las miniaturas que le faltan a cada PDF, un PDF
+    por tarea. Devuelve un generador de (ruta, paginas, en_cache, renderizadas, error)
+    en el orden en que terminan. Hay pocas tareas en vuelo por proceso, así no se
+    juntan en memoria las miniaturas de toda la carpeta.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    en_vuelo = {}
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        for ruta_pdf in rutas_pdf:
+            try:
+                with fitz.open(ruta_pdf) as doc:
+                    total = doc.page_count
+            except Exception as e:
+                yield ruta_pdf, 0, 0, 0, str(e)
+                continue
+            faltantes = [i for i in range(total) if not cache.contiene(ruta_pdf, i, zoom)]
+            if not faltantes:
+                yield ruta_pdf, total, total, 0, None
+                continue
+            en_vuelo[pool.submit(renderizar_paginas, ruta_pdf, faltantes, zoom)] = (ruta_pdf, total, faltantes)
+            if len(en_vuelo) >= num_workers * 2:
+                yield from _guardar_terminadas(en_vuelo, cache, zoom)
+        while en_vuelo:
+            yield from _guardar_terminadas(en_vuelo, cache, zoom)
+
+
+def _guardar_terminadas(en_vuelo, cache, zoom):
+    terminadas, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+    for fut in terminadas:
+        ruta_pdf, total, faltantes = en_vuelo.pop(fut)
+        try:
+            resultado = fut.result()
+        except Exception as e:
+            yield ruta_pdf, total, total - len(faltantes), 0, str(e)
+            continue
+        trazas.registrar_tiempos(resultado)
+        renderizadas = 0
+        for page_index, datos in resultado:
+            if datos is not None:
+                cache.guardar(ruta_pdf, page_index, datos, zoom)
+                renderizadas += 1
+        error = None
+        if renderizadas < len(faltantes):
+            error = f"No se pudieron renderizar {len(faltantes) - renderizadas} páginas."
+        yield ruta_pdf, total, total - len(faltantes), renderizadas, error
+
+
+class MotorRenderizado:
+    """
+    Reparte el renderizado de miniaturas entre varios procesos.
+
+    Las páginas que ya están en la caché se resuelven al instante; el resto se
+    agrupa en tareas de pocas páginas para que un PDF largo use todos los núcleos.
+    Una página que ya se está renderizando (por ejemplo, precargada) no se vuelve
+    a enviar: el pedido espera a la tarea en curso.
+    """
+
+    def __init__(self, cache=None, num_workers=None, memoria=None):
+        self.cache = cache
+        self.memoria = memoria
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._pool = None
+        # (ruta_pdf, page_index, zoom) -> future de la tarea que la está renderizando
+        self._lock = threading.Lock()
+        self._en_vuelo = {}
+
+    @property
+    def pool(self):
+        # El pool se crea recién al primer uso para no demorar el arranque
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.num_workers)
+        return self._pool
+
+    def renderizar(self, ruta_pdf, paginas, zoom=ZOOM_MINIATURA):
+        """
+        Encola las páginas indicadas de un PDF. Devuelve una lista de futures, cada
+        uno con una lista [(page_index, bytes_ppm), ...] y el atributo `paginas`
+        con los índices que cubre (para poder cancelarlo si salen de la vista).
+        """
+        futures = []
+        faltantes = []
+        compartidas = defaultdict(list)  # tarea en curso -> páginas de este pedido
+        for page_index in paginas:
+            datos = self.buscar(ruta_pdf, page_index, zoom)
+            if datos is not None:
+                fut = self._resuelto([(page_index, datos)])
+                fut.paginas = [page_index]
+                futures.append(fut)
+                continue
+            with self._lock:
+                en_curso = self._en_vuelo.get((ruta_pdf, page_index, zoom))
+            if en_curso is not None and not en_curso.cancelled():
+                compartidas[en_curso].append(page_index)
+            else:
+                faltantes.append(page_index)
+
+        for en_curso, paginas_compartidas in compartidas.items():
+            futures.append(self._esperar(ruta_pdf, en_curso, paginas_compartidas, zoom))
+        if faltantes:
+            tam_tarea = max(1, min(8, math.ceil(len(faltantes) / self.num_workers)))
+            for i in range(0, len(faltantes), tam_tarea):
+                futures.append(self._enviar(ruta_pdf, faltantes[i:i+tam_tarea], zoom))
+        return futures
+
+    def _enviar(self, ruta_pdf, tarea, zoom):
+        fut = self.pool.submit(renderizar_paginas, ruta_pdf, tarea, zoom)
+        fut.paginas = tarea
+        fut.enviado = time.perf_counter()
+        with self._lock:
+            for page_index in tarea:
+                self._en_vuelo[(ruta_pdf, page_index, zoom)] = fut
+        fut.add_done_callback(lambda f, rp=ruta_pdf: self._guardar_en_cache(rp, f, zoom))
+        return fut
+
+    def _esperar(self, ruta_pdf, en_curso, paginas, zoom):
+        """
+        Future propio para páginas que ya renderiza otra tarea: se resuelve con esas
+        páginas cuando la otra termina. Cancelarlo no cancela la otra tarea, y si la
+        cancelan a ella (la precarga, por ejemplo) las páginas se vuelven a enviar.
+        """
+        fut = Future()
+        fut.paginas = list(paginas)
+
+        def al_terminar(origen):
+            if origen.cancelled():
+                if fut.cancelled():
+                    return
+                try:
+                    nueva = self._enviar(ruta_pdf, fut.paginas, zoom)
+                except RuntimeError:
+                    # El pool ya se cerró
+                    fut.cancel()
+                    return
+                nueva.add_done_callback(al_terminar)
+                return
+            if not fut.set_running_or_notify_cancel():
+                return
+            if origen.exception() is not None:
+                fut.set_exception(origen.exception())
+            else:
+                fut.set_result([(p, datos) for p, datos in origen.result() if p in fut.paginas])
+
+        en_curso.add_done_callback(al_terminar)
+        return fut
+
+    def buscar(self, ruta_pdf, page_index, zoom=ZOOM_MINIATURA):
+        """
+        Busca una miniatura primero en memoria y después en disco.
+        Lo que se encuentra en disco se sube a memoria.
+        """
+        clave = (ruta_pdf, page_index, zoom)
+        if self.memoria is not None:
+            datos = self.memoria.obtener(clave)
+            if datos is not None:
+                return datos
+        datos = self.cache.obtener(ruta_pdf, page_index, zoom) if self.cache else None
+        if datos is not None and self.memoria is not None:
+            self.memoria.guardar(clave, datos)
+        return datos
+
+    @staticmethod
+    def _resuelto(resultado):
+        fut = Future()
+        fut.set_result(resultado)
+        return fut
+
+    def _guardar_en_cache(self, ruta_pdf, fut, zoom):
+        try:
+            if fut.cancelled() or fut.exception() is not None:
+                return
+            # La tarea completa, incluida la espera en la cola del pool
+            trazas.registrar({
+                "etapa": "render.tarea",
+                "ms": round((time.perf_counter() - fut.enviado) * 1000, 3),
+                "archivo": ruta_pdf,
+                "paginas": len(fut.paginas),
+            })
+            trazas.registrar_tiempos(fut.result())
+            for page_index, datos in fut.result():
+                if datos is None:
+                    continue
+                if self.memoria is not None:
+                    self.memoria.guardar((ruta_pdf, page_index, zoom), datos)
+                if self.cache:
+                    self.cache.guardar(ruta_pdf, page_index, datos, zoom)
+        finally:
+            # Recién con las miniaturas ya en caché deja de estar en vuelo
+            with self._lock:
+                for page_index in fut.paginas:
+                    if self._en_vuelo.get((ruta_pdf, page_index, zoom)) is fut:
+                        del self._en_vuelo[(ruta_pdf, page_index, zoom)]
+
+    def invalidar(self, ruta_pdf):
+        """
+        Olvida las miniaturas de un PDF en memoria y en disco. Lo que se esté
+        renderizando de la versión anterior ya no se comparte con pedidos nuevos.
+        """
+        with self._lock:
+            for clave in [c for c in self._en_vuelo if c[0] == ruta_pdf]:
+                del self._en_vuelo[clave]
+        if self.memoria is not None:
+            self.memoria.invalidar(ruta_pdf)
+        if self.cache:
+            self.cache.invalidar(ruta_pdf)
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logging.info("Pool de renderizado cerrado.")
@@ -0,0 +1,304 @@
+import os
+import re
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from collections import namedtuple
+
+
+DIRECTORIO_DIARIOS = Path.home() / ".visor_pdf_cache" / "renombres"
+# Un directorio por aplicación, así "Deshacer Último Lote" no toca lotes de otra
+DIRECTORIO_VISOR = DIRECTORIO_DIARIOS / "visor"
+DIRECTORIO_IMAGENES = DIRECTORIO_DIARIOS / "imagenes"
+DIRECTORIO_CLI = DIRECTORIO_DIARIOS / "cli"
+# Cada cuántos registros se fuerza el diario a disco mientras se aplica un lote
+REGISTROS_POR_FSYNC = 200
+
+# Caracteres que Windows no permite en nombres de archivo
+PATRON_NO_PERMITIDOS = re.compile(r'[<>:"/\\|?*]')
+# Prefijo que deja nombre_con_fecha con una fecha numérica (15-08-2023__, 2023_08_15__...)
+PATRON_CON_FECHA = re.compile(r"^\d{1,4}[-_.]\d{1,2}[-_.]\d{1,4}__")
+
+Renombre = namedtuple("Renombre", ["origen", "destino"])
+# hechos: índice -> destino real de lo que está renombrado ahora;
+# abierto: True si el lote quedó a medio aplicar o revertir (por ejemplo, por un corte)
+Estado = namedtuple("Estado", ["ruta", "lote", "creado", "renombres", "hechos", "abierto"])
+
+
+def nombre_con_fecha(ruta, fecha):
+    """
+    'factura.pdf' con la fecha '15/08/2023' -> '15_08_2023__factura.pdf'.
+    """
+    return f"{_prefijo_fecha(fecha)}{os.path.basename(ruta)}"
+
+
+def _prefijo_fecha(fecha):
+    return f"{PATRON_NO_PERMITIDOS.sub('_', fecha.strip())}__"
+
+
+def ya_renombrado(ruta, fecha=None):
+    """
+    True si el nombre ya empieza con una fecha puesta por nombre_con_fecha (o con
+    el prefijo de `fecha`, si se indica), para no anteponerla dos veces.
+    """
+    nombre = os.path.basename(ruta)
+    if fecha is not None and nombre.startswith(_prefijo_fecha(fecha)):
+        return True
+    return PATRON_CON_FECHA.match(nombre) is not None
+
+
+def _nombre_libre(destino, ocupados):
+    """
+    Agrega _1, _2, ... antes de la extensión hasta dar con un nombre libre.
+    """
+    carpeta, nombre = os.path.split(destino)
+    base, ext = os.path.splitext(nombre)
+    c = 1
+    while os.path.normcase(destino) in ocupados or os.path.exists(destino):
+        destino = os.path.join(carpeta, f"{base}_{c}{ext}")
+        c += 1
+    return destino
+
+
+def resolver_colisiones(pares):
+    """
+    Convierte [(origen, destino), ...] en Renombres con rutas absolutas y destinos
+    únicos: si el destino ya existe o lo pidió otro renombre del lote, se le agrega
+    _1, _2, ... Los pares que no cambian nada se descartan.
+    """
+    renombres = []
+    ocupados = set()
+    for origen, destino in pares:
+        origen = os.path.abspath(origen)
+        destino = os.path.abspath(destino)
+        if origen == destino:
+            continue
+        # Cambiar sólo mayúsculas en un sistema que no las distingue no es colisión
+        if os.path.normcase(origen) != os.path.normcase(destino):
+            destino = _nombre_libre(destino, ocupados)
+        ocupados.add(os.path.normcase(destino))
+        renombres.append(Renombre(origen, destino))
+    return renombres
+
+
+class _Diario:
+    """
+    Diario JSONL de sólo agregado. Cada línea es un registro; una última línea
+    cortada por un corte de luz se ignora al leer.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        # Si la última línea quedó cortada, los registros nuevos empiezan en otra línea
+        cortada = False
+        if self.ruta.exists() and self.ruta.stat().st_size:
+            with open(self.ruta, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                cortada = f.read(1) != b"\n"
+        self._archivo = open(self.ruta, "a", encoding="utf-8")
+        if cortada:
+            self._archivo.write("\n")
+        self._sin_sincronizar = 0
+
+    def escribir(self, registro, sincronizar=False):
+        self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+        self._sin_sincronizar += 1
+        if sincronizar or self._sin_sincronizar >= REGISTROS_POR_FSYNC:
+            self.sincronizar()
+
+    def sincronizar(self):
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._sin_sincronizar = 0
+
+    def cerrar(self):
+        self.sincronizar()
+        self._archivo.close()
+
+
+def _secuencia(ruta):
+    """
+    Número de secuencia de un diario ('000042.jsonl' -> 42), o None si no lo tiene.
+    """
+    nombre = Path(ruta).stem
+    return int(nombre) if nombre.isdigit() else None
+
+
+def _reservar_diario(directorio):
+    """
+    Crea el diario con el siguiente número de secuencia del directorio. La creación
+    exclusiva evita que dos procesos se queden con el mismo número.
+    """
+    Path(directorio).mkdir(parents=True, exist_ok=True)
+    numeros = [_secuencia(p) for p in Path(directorio).glob("*.jsonl")]
+    siguiente = max((n for n in numeros if n is not None), default=0) + 1
+    while True:
+        ruta = Path(directorio) / f"{siguiente:06d}.jsonl"
+        try:
+            open(ruta, "x").close()
+            return ruta
+        except FileExistsError:
+            siguiente += 1
+
+
+def crear_lote(pares, directorio):
+    """
+    Planifica el lote (con las colisiones resueltas) y lo escribe en un diario nuevo,
+    forzado a disco antes de tocar ningún archivo. Devuelve la ruta del diario.
+    """
+    renombres = resolver_colisiones(pares)
+    ruta = _reservar_diario(directorio)
+    lote = f"{ruta.stem}-{datetime.now():%Y%m%d-%H%M%S}"
+    diario = _Diario(ruta)
+    diario.escribir({"tipo": "lote", "lote": lote, "creado": datetime.now().isoformat(timespec="seconds"),
+                     "total": len(renombres)})
+    for i, r in enumerate(renombres):
+        diario.escribir({"tipo": "plan", "i": i, "origen": r.origen, "destino": r.destino})
+    diario.cerrar()
+    logging.info(f"Lote de renombres {lote}: {len(renombres)} archivos planificados en {ruta}")
+    return ruta
+
+
+def leer_lote(ruta):
+    """
+    Reconstruye el estado de un lote a partir de su diario.
+    """
+    lote = creado = None
+    renombres = []
+    intentos = {}
+    hechos = {}
+    abierto = True
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                logging.warning(f"Línea incompleta en el diario {ruta}, se ignora.")
+                continue
+            tipo = registro.get("tipo")
+            if tipo == "lote":
+                lote, creado = registro["lote"], registro["creado"]
+            elif tipo == "plan":
+                renombres.append(Renombre(registro["origen"], registro["destino"]))
+            elif tipo == "intento":
+                intentos[registro["i"]] = registro["destino"]
+            elif tipo == "hecho":
+                hechos[registro["i"]] = registro["destino"]
+                intentos.pop(registro["i"], None)
+            elif tipo == "deshecho":
+                hechos.pop(registro["i"], None)
+            elif tipo in ("aplicando", "revirtiendo"):
+                abierto = True
+            elif tipo in ("fin", "revertido"):
+                abierto = False
+
+    # Un intento sin confirmar: el archivo pudo moverse justo antes del corte. Los
+    # intentos no se fuerzan a disco uno por uno, así que sin intento se mira el
+    # destino planificado (si se usó otro, el intento sí se forzó antes de renombrar)
+    for i, renombre in enumerate(renombres):
+        destino = intentos.get(i, renombre.destino)
+        if i not in hechos and not os.path.exists(renombre.origen) and os.path.exists(destino):
+            hechos[i] = destino
+    return Estado(str(ruta), lote, creado, renombres, hechos, abierto)
+
+
+def aplicar_lote(ruta, al_avanzar=None):
+    """
+    Aplica (o continúa aplicando) los renombres pendientes del lote.
+    Antes de cada renombre se anota el intento y después la confirmación, así un
+    lote cortado a la mitad se puede retomar o revertir. Devuelve (hechos, errores):
+    hechos es [(origen, destino_real)] de esta pasada y errores [(origen, mensaje)].
+    `al_avanzar(hechos, total)` se llama cada tanto para mostrar el progreso.
+    """
+    estado = leer_lote(ruta)
+    total = len(estado.renombres)
+    hechos = []
+    errores = []
+    ocupados = set()
+    diario = _Diario(ruta)
+    try:
+        diario.escribir({"tipo": "aplicando"}, sincronizar=True)
+        for i, r in enumerate(estado.renombres):
+            if i in estado.hechos:
+                continue
+            # Alguien pudo crear el destino después de planificar el lote
+            destino = r.destino
+            if os.path.exists(destino) and os.path.normcase(destino) != os.path.normcase(r.origen):
+                destino = _nombre_libre(destino, ocupados)
+            ocupados.add(os.path.normcase(destino))
+            diario.escribir({"tipo": "intento", "i": i, "destino": destino}, sincronizar=destino != r.destino)
+            try:
+                os.rename(r.origen, destino)
+            except OSError as e:
+                errores.append((r.origen, str(e)))
+                diario.escribir({"tipo": "error", "i": i, "mensaje": str(e)})
+                logging.warning(f"No se pudo renombrar {r.origen} a {destino}: {e}")
+                continue
+            diario.escribir({"tipo": "hecho", "i": i, "destino": destino})
+            hechos.append((r.origen, destino))
+            if al_avanzar and len(hechos) % 100 == 0:
+                al_avanzar(len(hechos), total)
+        # Con errores también se cierra: lo que falló se puede reintentar aplicando de nuevo
+        diario.escribir({"tipo": "fin", "errores": len(errores)}, sincronizar=True)
+    finally:
+        diario.cerrar()
+    logging.info(f"Lote {estado.lote}: {len(hechos)} renombrados, {len(errores)} errores.")
+    return hechos, errores
+
+
+def revertir_lote(ruta):
+    """
+    Deshace, en orden inverso, todos los renombres del lote que se llegaron a hacer.
+    Devuelve (revertidos, errores) con el mismo formato que `aplicar_lote`.
+    """
+    estado = leer_lote(ruta)
+    revertidos = []
+    errores = []
+    diario = _Diario(ruta)
+    try:
+        diario.escribir({"tipo": "revirtiendo"}, sincronizar=True)
+        for i in sorted(estado.hechos, reverse=True):
+            origen, destino = estado.renombres[i].origen, estado.hechos[i]
+            try:
+                if os.path.exists(origen) and os.path.normcase(origen) != os.path.normcase(destino):
+                    raise FileExistsError(f"{origen} ya existe")
+                os.rename(destino, origen)
+            except OSError as e:
+                errores.append((destino, str(e)))
+                logging.warning(f"No se pudo revertir {destino} a {origen}: {e}")
+                continue
+            diario.escribir({"tipo": "deshecho", "i": i})
+            revertidos.append((destino, origen))
+        diario.escribir({"tipo": "revertido", "errores": len(errores)}, sincronizar=True)
+    finally:
+        diario.cerrar()
+    logging.info(f"Lote {estado.lote}: {len(revertidos)} renombres revertidos, {len(errores)} errores.")
+    return revertidos, errores
+
+
+def lotes(directorio):
+    """
+    Rutas de los diarios, del más nuevo al más viejo (por número de secuencia).
+    """
+    if not os.path.isdir(directorio):
+        return []
+    rutas = [str(p) for p in Path(directorio).glob("*.jsonl") if _secuencia(p) is not None]
+    return sorted(rutas, key=_secuencia, reverse=True)
+
+
+def lotes_pendientes(directorio):
+    """
+    Lotes que quedaron a medio aplicar (por ejemplo, por un cierre inesperado).
+    """
+    pendientes = []
+    for ruta in lotes(directorio):
+        try:
+            estado = leer_lote(ruta)
+        except OSError as e:
+            logging.warning(f"No se pudo leer el diario {ruta}: {e}")
+            continue
+        if estado.abierto:
+            pendientes.append(estado)
+    return pendientes
@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import math
+import argparse
+from collections import defaultdict
+from .trazas import PREFIJO
+
+
+# Límites superiores (ms) de los casilleros del histograma; el último es "o más"
+LIMITES_HISTOGRAMA = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+ANCHO_BARRA = 40
+
+
+def archivos_de_log(ruta):
+    """
+    El log y sus copias rotadas (ruta.N ... ruta.1, ruta), del más viejo al más nuevo.
+    """
+    rotados = []
+    n = 1
+    while os.path.exists(f"{ruta}.{n}"):
+        rotados.append(f"{ruta}.{n}")
+        n += 1
+    return list(reversed(rotados)) + ([ruta] if os.path.exists(ruta) else [])
+
+
+def leer_trazas(rutas):
+    """
+    Devuelve los registros de traza de los logs; las demás líneas se ignoran.
+    """
+    registros = []
+    for ruta in rutas:
+        with open(ruta, encoding="utf-8", errors="replace") as f:
+            for linea in f:
+                i = linea.find(PREFIJO)
+                if i < 0:
+                    continue
+                try:
+                    registro = json.loads(linea[i + len(PREFIJO):])
+                except ValueError:
+                    continue
+                if "etapa" in registro and "ms" in registro:
+                    registros.append(registro)
+    return registros
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def _casillero(ms):
+    for i, limite in enumerate(LIMITES_HISTOGRAMA):
+        if ms < limite:
+            return i
+    return len(LIMITES_HISTOGRAMA)
+
+
+def agregar(registros, top=10):
+    """
+    Por etapa: cantidad, percentiles, histograma y los archivos más lentos.
+    """
+    por_etapa = defaultdict(list)
+    for registro in registros:
+        por_etapa[registro["etapa"]].append(registro)
+
+    resumen = {}
+    for etapa, lista in sorted(por_etapa.items()):
+        tiempos = sorted(r["ms"] for r in lista)
+        histograma = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+        for ms in tiempos:
+            histograma[_casillero(ms)] += 1
+
+        # Peor registro de cada archivo
+        peores = {}
+        for r in lista:
+            archivo = r.get("archivo")
+            if archivo is not None and (archivo not in peores or r["ms"] > peores[archivo]["ms"]):
+                peores[archivo] = r
+        lentos = sorted(peores.values(), key=lambda r: r["ms"], reverse=True)[:top]
+
+        resumen[etapa] = {
+            "n": len(tiempos),
+            "total_ms": round(sum(tiempos), 3),
+            "p50_ms": _percentil(tiempos, 50),
+            "p90_ms": _percentil(tiempos, 90),
+            "p99_ms": _percentil(tiempos, 99),
+            "max_ms": tiempos[-1],
+            "errores": sum(1 for r in lista if r.get("error")),
+            "histograma": histograma,
+            "mas_lentos": lentos,
+        }
+    return resumen
+
+
+def archivos_mas_lentos(registros, top=10):
+    """
+    Archivos que más tiempo sumaron entre todas las etapas.
+    """
+    totales = defaultdict(float)
+    for registro in registros:
+        if registro.get("archivo") is not None:
+            totales[registro["archivo"]] += registro["ms"]
+    return sorted(totales.items(), key=lambda par: par[1], reverse=True)[:top]
+
+
+def _etiqueta_casillero(i):
+    if i == 0:
+        return f"< {LIMITES_HISTOGRAMA[0]} ms"
+    if i == len(LIMITES_HISTOGRAMA):
+        return f">= {LIMITES_HISTOGRAMA[-1]} ms"
+    return f"{LIMITES_HISTOGRAMA[i - 1]}-{LIMITES_HISTOGRAMA[i]} ms"
+
+
+def formatear(resumen, lentos_global):
+    lineas = []
+    for etapa, datos in resumen.items():
+        lineas.append(
+            f"== {etapa}: {datos['n']} registros, total {datos['total_ms']:.0f} ms, "
+            f"p50 {datos['p50_ms']:.1f} / p90 {datos['p90_ms']:.1f} / p99 {datos['p99_ms']:.1f} / "
+            f"máx {datos['max_ms']:.1f} ms" + (f", {datos['errores']} errores" if datos["errores"] else "")
+        )
+        mayor = max(datos["histograma"]) or 1
+        for i, cantidad in enumerate(datos["histograma"]):
+            if cantidad:
+                barra = "#" * max(1, round(cantidad / mayor * ANCHO_BARRA))
+                lineas.append(f"   {_etiqueta_casillero(i):>12} | {barra} {cantidad}")
+        for r in datos["mas_lentos"]:
+            pagina = f" pág {r['pagina'] + 1}" if isinstance(r.get("pagina"), int) else ""
+            lineas.append(f"   {r['ms']:>10.1f} ms  {os.path.basename(str(r['archivo']))}{pagina}")
+        lineas.append("")
+    if lentos_global:
+        lineas.append("== Archivos más lentos (todas las etapas)")
+        for archivo, ms in lentos_global:
+            lineas.append(f"   {ms:>10.1f} ms  {archivo}")
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume las trazas de tiempos de los logs.")
+    parser.add_argument("logs", nargs="*", default=["visor_pdf.log"],
+                        help="logs a leer (se incluyen sus copias rotadas)")
+    parser.add_argument("--etapa", action="append", help="sólo estas etapas (se puede repetir)")
+    parser.add_argument("--top", type=int, default=10, help="cuántos archivos lentos mostrar")
+    parser.add_argument("--json", action="store_true", help="salida en JSON")
+    args = parser.parse_args(argv)
+
+    rutas = [r for log in args.logs for r in archivos_de_log(log)]
+    if not rutas:
+        print("No se encontraron logs.", file=sys.stderr)
+        return 1
+    registros = leer_trazas(rutas)
+    if args.etapa:
+        registros = [r for r in registros if r["etapa"] in args.etapa]
+
+    resumen = agregar(registros, args.top)
+    lentos_global = archivos_mas_lentos(registros, args.top)
+    if args.json:
+        print(json.dumps({"etapas": resumen, "archivos_mas_lentos": lentos_global}, indent=2, ensure_ascii=False))
+    else:
+        print(formatear(resumen, lentos_global))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
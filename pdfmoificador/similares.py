@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from .dependencias import fitz, Image
+
+
+RUTA_CACHE_POR_DEFECTO = Path.home() / ".visor_pdf_cache" / "hashes_perceptuales.sqlite"
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png", ".jfif", ".gif", ".bmp", ".tif", ".tiff")
+# La primera página se renderiza a baja resolución: para el hash alcanza con ~150 px
+ZOOM_PDF = 0.25
+# Distancia de Hamming máxima (de 64 bits) para considerar dos archivos parecidos
+DISTANCIA_POR_DEFECTO = 8
+
+
+def dhash(imagen, lado=8):
+    """
+    Hash de diferencias: la imagen en grises reducida a (lado+1) x lado y un bit
+    por cada par de píxeles vecinos (1 si el de la izquierda es más claro).
+    Resiste recompresión, cambios de resolución y pequeñas diferencias de brillo.
+    """
+    gris = imagen.convert("L").resize((lado + 1, lado), Image.BILINEAR)
+    pixeles = list(gris.getdata())
+    valor = 0
+    for fila in range(lado):
+        for col in range(lado):
+            izquierda = pixeles[fila * (lado + 1) + col]
+            derecha = pixeles[fila * (lado + 1) + col + 1]
+            valor = (valor << 1) | (izquierda > derecha)
+    return valor
+
+
+def hash_archivo(ruta):
+    """
+    dHash de una imagen o de la primera página de un PDF.
+    Se ejecuta en los procesos del pool.
+    """
+    if ruta.lower().endswith(".pdf"):
+        with fitz.open(ruta) as doc:
+            pix = doc[0].get_pixmap(matrix=fitz.Matrix(ZOOM_PDF, ZOOM_PDF), colorspace=fitz.csGRAY, alpha=False)
+            imagen = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    else:
+        with Image.open(ruta) as original:
+            # En los JPEG, draft decodifica directamente a una escala chica
+            original.draft("L", (64, 64))
+            imagen = original.convert("L")
+    return dhash(imagen)
+
+
+def _hash_seguro(ruta):
+    try:
+        return ruta, hash_archivo(ruta)
+    except Exception:
+        return ruta, None
+
+
+def distancia(a, b):
+    return (a ^ b).bit_count()
+
+
+def _mascaras(bits, max_cambios):
+    """
+    Todas las máscaras de `bits` bits con hasta `max_cambios` bits en 1.
+    """
+    mascaras = [0]
+    for _ in range(max_cambios):
+        mascaras = sorted({m | (1 << i) for m in mascaras for i in range(bits)} | set(mascaras))
+    return mascaras
+
+
+class IndiceHamming:
+    """
+    Búsqueda por distancia de Hamming con índices por partes (multi-index hashing).
+
+    El hash de 64 bits se corta en 4 partes de 16 bits, cada una con su tabla.
+    Si dos hashes están a distancia <= r, por el principio del palomar alguna parte
+    difiere en a lo sumo r // 4 bits; basta probar esas variantes de cada parte
+    (137 por parte para r = 8) y verificar sólo los candidatos que aparecen.
+    Con hashes de facturas, que se parecen mucho entre sí, un árbol BK termina
+    recorriendo casi todos los nodos; esto no depende de la distribución.
+    Los items deben ser hashables (se usan para no verificar dos veces el mismo).
+    """
+
+    PARTES = 4
+    BITS_PARTE = 16
+
+    def __init__(self, radio=DISTANCIA_POR_DEFECTO):
+        self.radio = radio
+        self._tablas = [{} for _ in range(self.PARTES)]
+        self._mascaras = _mascaras(self.BITS_PARTE, radio // self.PARTES)
+        self.tamano = 0
+
+    def _partes(self, valor):
+        tope = (1 << self.BITS_PARTE) - 1
+        return [(valor >> (i * self.BITS_PARTE)) & tope for i in range(self.PARTES)]
+
+    def agregar(self, valor, item):
+        self.tamano += 1
+        for tabla, parte in zip(self._tablas, self._partes(valor)):
+            tabla.setdefault(parte, []).append((valor, item))
+
+    def buscar(self, valor):
+        """
+        Devuelve [(distancia, item), ...] de todo lo que está a distancia <= radio.
+        """
+        vistos = set()
+        encontrados = []
+        for tabla, parte in zip(self._tablas, self._partes(valor)):
+            for mascara in self._mascaras:
+                for otro, item in tabla.get(parte ^ mascara, ()):
+                    if item in vistos:
+                        continue
+                    vistos.add(item)
+                    d = distancia(valor, otro)
+                    if d <= self.radio:
+                        encontrados.append((d, item))
+        return encontrados
+
+
+class IndicePerceptual:
+    """
+    Hashes perceptuales de imágenes y PDFs, guardados por huella (tamaño + mtime)
+    en SQLite para no volver a calcular lo que no cambió.
+    """
+
+    def __init__(self, ruta_cache=RUTA_CACHE_POR_DEFECTO, num_workers=None):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        Path(ruta_cache).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(str(ruta_cache), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS dhash ("
+            " ruta TEXT PRIMARY KEY, huella TEXT NOT NULL, valor INTEGER NOT NULL)"
+        )
+        self._conexion.commit()
+
+    @staticmethod
+    def huella(ruta):
+        st = os.stat(ruta)
+        return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    def hashes(self, rutas):
+        """
+        Devuelve {ruta: hash}; lo que no está en caché se calcula en paralelo.
+        Los archivos ilegibles quedan afuera.
+        """
+        resultado = {}
+        pendientes = {}
+        with self._lock:
+            for ruta in rutas:
+                ruta_abs = os.path.abspath(ruta)
+                try:
+                    huella = self.huella(ruta_abs)
+                except OSError:
+                    continue
+                fila = self._conexion.execute(
+                    "SELECT valor FROM dhash WHERE ruta = ? AND huella = ?", (ruta_abs, huella)
+                ).fetchone()
+                if fila:
+                    # SQLite guarda enteros con signo de 64 bits
+                    resultado[ruta] = fila[0] & 0xFFFFFFFFFFFFFFFF
+                else:
+                    pendientes[ruta_abs] = (ruta, huella)
+
+        if pendientes:
+            filas = []
+            with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+                tam_bloque = max(1, min(32, len(pendientes) // (self.num_workers * 4)))
+                for ruta_abs, valor in pool.map(_hash_seguro, pendientes, chunksize=tam_bloque):
+                    if valor is None:
+                        logging.warning(f"No se pudo calcular el hash perceptual de {ruta_abs}")
+                        continue
+                    ruta, huella = pendientes[ruta_abs]
+                    resultado[ruta] = valor
+                    filas.append((ruta_abs, huella, valor - (1 << 64) if valor >= 1 << 63 else valor))
+            with self._lock:
+                self._conexion.executemany(
+                    "INSERT OR REPLACE INTO dhash (ruta, huella, valor) VALUES (?, ?, ?)", filas
+                )
+                self._conexion.commit()
+            logging.info(f"Hashes perceptuales: {len(filas)} calculados, {len(resultado) - len(filas)} de la caché.")
+        return resultado
+
+    def agrupar(self, rutas, radio=DISTANCIA_POR_DEFECTO):
+        """
+        Agrupa los archivos probablemente iguales (distancia <= radio). Cada archivo
+        se busca una vez en el índice y los vecinos se unen con union-find, así
+        los grupos son transitivos. Devuelve listas de rutas, de más de un elemento.
+        """
+        # Los hashes idénticos se buscan una sola vez
+        por_valor = {}
+        for ruta, valor in self.hashes(rutas).items():
+            por_valor.setdefault(valor, []).append(ruta)
+        indice = IndiceHamming(radio)
+        for valor in por_valor:
+            indice.agregar(valor, valor)
+
+        padre = {valor: valor for valor in por_valor}
+
+        def buscar_raiz(valor):
+            while padre[valor] != valor:
+                padre[valor] = padre[padre[valor]]
+                valor = padre[valor]
+            return valor
+
+        for valor in por_valor:
+            for _, otro in indice.buscar(valor):
+                a, b = buscar_raiz(valor), buscar_raiz(otro)
+                if a != b:
+                    padre[b] = a
+
+        grupos = {}
+        for valor, rutas_valor in por_valor.items():
+            grupos.setdefault(buscar_raiz(valor), []).extend(rutas_valor)
+        return sorted((sorted(g) for g in grupos.values() if len(g) > 1), key=lambda g: g[0])
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+
+def listar_archivos(carpeta, extensiones=EXTENSIONES_IMAGEN + (".pdf",)):
+    """
+    Imágenes y PDFs de la carpeta (sin subcarpetas).
+    """
+    with os.scandir(carpeta) as entradas:
+        return sorted(
+            e.path for e in entradas
+            if e.is_file() and e.name.lower().endswith(extensiones)
+        )
@@ -0,0 +1,78 @@
+import json
+import time
+import logging
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+
+# Las trazas son líneas del log con este prefijo seguido de un objeto JSON
+PREFIJO = "TRAZA "
+FORMATO_LOG = '%(asctime)s - %(levelname)s - %(message)s'
+
+logger = logging.getLogger("trazas")
+
+
+def configurar_log(ruta, max_bytes=5 * 1024 * 1024, copias=5, nivel=logging.INFO):
+    """
+    Configura el log de la aplicación con rotación (ruta, ruta.1, ... ruta.N).
+    """
+    manejador = RotatingFileHandler(ruta, maxBytes=max_bytes, backupCount=copias, encoding="utf-8")
+    manejador.setFormatter(logging.Formatter(FORMATO_LOG))
+    logging.basicConfig(level=nivel, handlers=[manejador])
+
+
+def activas():
+    return logger.isEnabledFor(logging.INFO)
+
+
+def registrar(registro):
+    """
+    Escribe un registro ({"etapa": ..., "ms": ..., ...}) en el log.
+    """
+    if activas():
+        logger.info(PREFIJO + json.dumps(registro, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def tramo(etapa, destino=None, **datos):
+    """
+    Mide el bloque y registra {"etapa", "ms", **datos} (y "error" si lanzó una excepción).
+    Dentro del bloque se pueden agregar datos al dict que entrega el `with`.
+
+    En los procesos del pool el log no llega al archivo: ahí se pasa una lista como
+    `destino`, el registro se agrega a ella y viaja con el resultado (ver ConTiempos).
+    """
+    inicio = time.perf_counter()
+    error = None
+    try:
+        yield datos
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        registro = {"etapa": etapa, "ms": round((time.perf_counter() - inicio) * 1000, 3), **datos}
+        if error:
+            registro["error"] = error
+        if destino is not None:
+            destino.append(registro)
+        else:
+            registrar(registro)
+
+
+class ConTiempos(list):
+    """
+    Lista de resultados que además lleva los registros medidos en el proceso que
+    la generó. Se comporta como una lista común para quien no mira `tiempos`.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.tiempos = []
+
+
+def registrar_tiempos(resultado, **datos):
+    """
+    Pasa al log los registros que trajo un resultado del pool, agregándoles `datos`.
+    """
+    for registro in getattr(resultado, "tiempos", ()):
+        registrar({**registro, **datos})
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+
+
+RUTA_POR_DEFECTO = Path.home() / ".visor_pdf_cache" / "validaciones.sqlite"
+# Segundos que se esperan para juntar cambios antes de escribirlos
+INTERVALO_GUARDADO = 1.0
+
+
+class AlmacenValidaciones:
+    """
+    Estado de validación por página (check + observación), independiente de los
+    widgets: sobrevive a la paginación y a los reinicios.
+
+    Los cambios se juntan en memoria (el último de cada página gana) y un temporizador
+    los escribe en SQLite fuera del hilo de Tk, en una sola transacción y sólo las
+    filas que cambiaron. Las lecturas ven también lo que todavía no se escribió.
+    """
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, intervalo=INTERVALO_GUARDADO):
+        self.intervalo = intervalo
+        Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+        # _lock protege los pendientes (lo toma el hilo de Tk al marcar, nunca espera
+        # a SQLite); _lock_db, la conexión, y ordena las escrituras
+        self._lock = threading.Lock()
+        self._lock_db = threading.Lock()
+        self._conexion = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS validacion ("
+            " ruta TEXT NOT NULL, pagina INTEGER NOT NULL, validado INTEGER NOT NULL,"
+            " observacion TEXT NOT NULL, actualizado TEXT NOT NULL,"
+            " PRIMARY KEY (ruta, pagina))"
+        )
+        self._conexion.commit()
+        # (ruta_abs, pagina) -> (validado, observacion) sin escribir todavía
+        self._pendientes = {}
+        self._temporizador = None
+
+    def marcar(self, ruta_pdf, pagina, validado, observacion):
+        """
+        Registra el estado de una página; se guarda solo al rato.
+        """
+        with self._lock:
+            self._pendientes[(os.path.abspath(ruta_pdf), pagina)] = (bool(validado), observacion)
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo, self.guardar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def guardar(self):
+        """
+        Escribe los cambios pendientes. Lo llama el temporizador; llamarlo a mano
+        fuerza el guardado.
+        """
+        with self._lock_db:
+            with self._lock:
+                self._temporizador = None
+                pendientes, self._pendientes = self._pendientes, {}
+            if not pendientes:
+                return
+            ahora = datetime.now().isoformat(timespec="seconds")
+            try:
+                with self._conexion:
+                    self._conexion.executemany(
+                        "INSERT OR REPLACE INTO validacion (ruta, pagina, validado, observacion, actualizado)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        [(ruta, pagina, int(v), obs, ahora) for (ruta, pagina), (v, obs) in pendientes.items()]
+                    )
+            except sqlite3.Error as e:
+                # Se reintentan en el próximo guardado, sin pisar cambios más nuevos
+                with self._lock:
+                    pendientes.update(self._pendientes)
+                    self._pendientes = pendientes
+                logging.warning(f"No se pudieron guardar {len(pendientes)} validaciones: {e}")
+
+    def obtener(self, ruta_pdf):
+        """
+        Devuelve {pagina: (validado, observacion)} de lo guardado para un PDF.
+        """
+        ruta_abs = os.path.abspath(ruta_pdf)
+        with self._lock_db:
+            filas = self._conexion.execute(
+                "SELECT pagina, validado, observacion FROM validacion WHERE ruta = ?", (ruta_abs,)
+            ).fetchall()
+            estado = {pagina: (bool(v), obs) for pagina, v, obs in filas}
+            with self._lock:
+                for (ruta, pagina), valores in self._pendientes.items():
+                    if ruta == ruta_abs:
+                        estado[pagina] = valores
+        return estado
+
+    def renombrar(self, origen, destino):
+        """
+        Lleva las validaciones de un PDF a su nuevo nombre.
+        """
+        origen, destino = os.path.abspath(origen), os.path.abspath(destino)
+        with self._lock_db:
+            with self._lock:
+                for clave in [c for c in self._pendientes if c[0] == origen]:
+                    self._pendientes[(destino, clave[1])] = self._pendientes.pop(clave)
+            with self._conexion:
+                self._conexion.execute("DELETE FROM validacion WHERE ruta = ?", (destino,))
+                self._conexion.execute("UPDATE validacion SET ruta = ? WHERE ruta = ?", (destino, origen))
+
+    def exportar(self, ruta_txt, rutas_pdf):
+        """
+        Escribe un resumen legible de las validaciones de esos PDFs (todas sus
+        páginas, no sólo las de la página que se está viendo). Devuelve cuántas líneas.
+        """
+        self.guardar()
+        lineas = 0
+        with open(ruta_txt, "w", encoding="utf-8") as f:
+            for ruta_pdf in rutas_pdf:
+                for pagina, (validado, observacion) in sorted(self.obtener(ruta_pdf).items()):
+                    check_str = "OK" if validado else "NO"
+                    f.write(f"{os.path.basename(ruta_pdf)} | Página {pagina+1} | Val={check_str} | Obs={observacion}\n")
+                    lineas += 1
+        return lineas
+
+    def cerrar(self):
+        with self._lock:
+            temporizador = self._temporizador
+        if temporizador is not None:
+            temporizador.cancel()
+        self.guardar()
+        with self._lock_db:
+            self._conexion.close()
@@ -0,0 +1,218 @@
+import os
+import sys
+import struct
+import ctypes
+import ctypes.util
+import logging
+from collections import namedtuple
+
+
+# tipo: "agregado", "eliminado", "renombrado" o "modificado".
+# `nombre_nuevo` sólo se usa en los renombrados.
+EventoCarpeta = namedtuple("EventoCarpeta", ["tipo", "nombre", "nombre_nuevo"])
+
+# Constantes de inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+ENCABEZADO_EVENTO = struct.Struct("iIII")
+
+
+def _cargar_inotify():
+    """
+    Devuelve la libc con inotify o None si no está disponible (Windows, macOS).
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class VigilanteCarpeta:
+    """
+    Informa los cambios de una carpeta (sin subcarpetas) como eventos, para que las
+    listas en memoria y las cachés se corrijan en el lugar en vez de releer todo.
+
+    En Linux usa inotify. En otros sistemas compara instantáneas de `os.scandir`
+    (inodo, tamaño, mtime); un archivo con el mismo inodo, tamaño y mtime y otro
+    nombre se informa como renombrado. `sondear()` no bloquea: se llama periódicamente con `after()`.
+    """
+
+    def __init__(self, directorio, extensiones):
+        self.directorio = directorio
+        self.extensiones = tuple(e.lower() for e in extensiones)
+        self._fd = None
+        # Modo sondeo: nombre -> (inodo, tamaño, mtime_ns)
+        self._instantanea = self._escanear()
+
+        libc = _cargar_inotify()
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            # Los archivos nuevos se informan al cerrarse (IN_CLOSE_WRITE), no al crearse,
+            # para no leerlos a medio escribir
+            mascara = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+            if fd >= 0 and libc.inotify_add_watch(fd, os.fsencode(directorio), mascara) >= 0:
+                self._fd = fd
+            elif fd >= 0:
+                os.close(fd)
+
+        modo = "inotify" if self._fd is not None else "sondeo"
+        logging.info(f"Vigilando {directorio} ({modo}).")
+
+    def nombres(self):
+        """
+        Nombres de los archivos conocidos en este momento (sin orden).
+        """
+        return list(self._instantanea)
+
+    def _interesa(self, nombre):
+        return nombre.lower().endswith(self.extensiones)
+
+    def _escanear(self):
+        instantanea = {}
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if entrada.is_file() and self._interesa(entrada.name):
+                    st = entrada.stat()
+                    if not st.st_ino:
+                        # En Windows DirEntry.stat() no trae el inodo; os.stat sí
+                        try:
+                            st = os.stat(entrada.path)
+                        except OSError:
+                            continue
+                    instantanea[entrada.name] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        return instantanea
+
+    def sondear(self):
+        """
+        Devuelve la lista de eventos desde la última llamada.
+        """
+        if self._fd is not None:
+            return self._sondear_inotify()
+        return self._sondear_instantanea()
+
+    # -------------------- SONDEO POR INSTANTÁNEAS --------------------
+    def _sondear_instantanea(self):
+        anterior = self._instantanea
+        try:
+            actual = self._escanear()
+        except OSError as e:
+            logging.warning(f"No se pudo leer {self.directorio}: {e}")
+            return []
+        self._instantanea = actual
+        return self._diferencias(anterior, actual)
+
+    @staticmethod
+    def _diferencias(anterior, actual):
+        eventos = []
+        quitados = {n: d for n, d in anterior.items() if n not in actual}
+        agregados = {n: d for n, d in actual.items() if n not in anterior}
+
+        # Mismo inodo, tamaño y mtime con otro nombre => renombrado. Sin inodo (0)
+        # no se puede saber: se informa como eliminado más agregado
+        por_inodo = {d: n for n, d in quitados.items() if d is not None and d[0]}
+        for nombre, datos in list(agregados.items()):
+            viejo = por_inodo.pop(datos, None) if datos is not None and datos[0] else None
+            if viejo is not None:
+                eventos.append(EventoCarpeta("renombrado", viejo, nombre))
+                del quitados[viejo]
+                del agregados[nombre]
+
+        eventos += [EventoCarpeta("eliminado", n, None) for n in quitados]
+        eventos += [EventoCarpeta("agregado", n, None) for n in agregados]
+        eventos += [
+            EventoCarpeta("modificado", n, None)
+            for n, d in actual.items() if anterior.get(n) is not None and anterior[n] != d
+        ]
+        return eventos
+
+    # -------------------- INOTIFY --------------------
+    def _sondear_inotify(self):
+        eventos = []
+        movidos = {}  # cookie -> nombre de origen
+        desbordado = False
+        while True:
+            try:
+                datos = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            desplazamiento = 0
+            while desplazamiento < len(datos):
+                _, mascara, cookie, largo = ENCABEZADO_EVENTO.unpack_from(datos, desplazamiento)
+                desplazamiento += ENCABEZADO_EVENTO.size
+                nombre = os.fsdecode(datos[desplazamiento:desplazamiento + largo].rstrip(b"\0"))
+                desplazamiento += largo
+
+                if mascara & IN_Q_OVERFLOW:
+                    desbordado = True
+                    continue
+                if mascara & IN_ISDIR:
+                    continue
+                if mascara & IN_MOVED_FROM:
+                    movidos[cookie] = nombre
+                elif mascara & IN_MOVED_TO:
+                    eventos.append(self._evento_movido(movidos.pop(cookie, None), nombre))
+                elif mascara & IN_DELETE:
+                    eventos.append(EventoCarpeta("eliminado", nombre, None))
+                elif mascara & IN_CLOSE_WRITE:
+                    eventos.append(EventoCarpeta("modificado", nombre, None))
+
+        # Lo que se movió fuera de la carpeta
+        eventos += [EventoCarpeta("eliminado", n, None) for n in movidos.values()]
+        eventos = self._aplicar(eventos)
+
+        if desbordado:
+            # Se perdieron eventos: reconstruir comparando con un escaneo completo
+            logging.warning(f"Cola de inotify desbordada en {self.directorio}; se reescanea.")
+            anterior = self._instantanea
+            self._instantanea = self._escanear()
+            eventos += self._diferencias(anterior, self._instantanea)
+        return eventos
+
+    def _evento_movido(self, origen, destino):
+        if origen is None:
+            return EventoCarpeta("agregado", destino, None)
+        return EventoCarpeta("renombrado", origen, destino)
+
+    def _aplicar(self, eventos):
+        """
+        Filtra por extensión y mantiene la instantánea al día con los eventos de inotify.
+        Un renombrado que cambia la extensión se traduce a agregado o eliminado.
+        """
+        resultado = []
+        for evento in eventos:
+            if evento.tipo == "renombrado":
+                viejo, nuevo = self._interesa(evento.nombre), self._interesa(evento.nombre_nuevo)
+                if viejo and nuevo:
+                    self._instantanea[evento.nombre_nuevo] = self._instantanea.pop(evento.nombre, None)
+                    resultado.append(evento)
+                elif viejo:
+                    self._instantanea.pop(evento.nombre, None)
+                    resultado.append(EventoCarpeta("eliminado", evento.nombre, None))
+                elif nuevo:
+                    self._instantanea[evento.nombre_nuevo] = None
+                    resultado.append(EventoCarpeta("agregado", evento.nombre_nuevo, None))
+                continue
+
+            if not self._interesa(evento.nombre):
+                continue
+            if evento.tipo == "eliminado":
+                self._instantanea.pop(evento.nombre, None)
+            elif evento.tipo == "modificado" and evento.nombre not in self._instantanea:
+                # Archivo nuevo que terminó de escribirse
+                self._instantanea[evento.nombre] = None
+                evento = EventoCarpeta("agregado", evento.nombre, None)
+            resultado.append(evento)
+        return resultado
+
+    def cerrar(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,89 @@
+import time
+import queue
+import logging
+
+
+class PlanificadorRender:
+    """
+    Lleva los resultados del pool de renderizado al hilo de Tk.
+
+    Cada trabajo queda asociado a la generación vigente al momento de enviarlo.
+    Al cambiar de página se abre una generación nueva: lo que todavía no empezó
+    se cancela y lo que termina tarde se descarta sin tocar la interfaz.
+    Los resultados llegan por una cola que se vacía con `after()`.
+    """
+
+    def __init__(self, widget, intervalo_ms=30, presupuesto_ms=15):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self.presupuesto_ms = presupuesto_ms
+
+        self.generacion = 0
+        self._cola = queue.Queue()
+        self._pendientes = set()
+
+        # Estadísticas acumuladas
+        self.completados = 0   # Entregados a la interfaz
+        self.cancelados = 0    # Cancelados antes de empezar
+        self.descartados = 0   # Terminados, pero de una generación vieja
+
+        self.widget.after(self.intervalo_ms, self._drenar)
+
+    def nueva_generacion(self):
+        """
+        Invalida todo lo enviado hasta ahora y devuelve el nuevo token.
+        """
+        self.generacion += 1
+        for fut in list(self._pendientes):
+            fut.cancel()
+        self._pendientes.clear()
+        return self.generacion
+
+    def enviar(self, futures, callback, *args):
+        """
+        Registra futures de la generación actual. Cuando cada uno termina se llama
+        `callback(resultado, *args)` desde el hilo de Tk.
+        """
+        generacion = self.generacion
+        for fut in futures:
+            self._pendientes.add(fut)
+            fut.add_done_callback(
+                lambda f, g=generacion: self._cola.put((g, f, callback, args))
+            )
+
+    def _drenar(self):
+        """
+        Entrega resultados de la cola sin pasarse del presupuesto de tiempo por tick.
+        """
+        limite = time.perf_counter() + self.presupuesto_ms / 1000
+        while time.perf_counter() < limite:
+            try:
+                generacion, fut, callback, args = self._cola.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pendientes.discard(fut)
+            if fut.cancelled():
+                self.cancelados += 1
+                continue
+            if generacion != self.generacion:
+                self.descartados += 1
+                continue
+            try:
+                resultado = fut.result()
+            except Exception as e:
+                logging.warning(f"Falló un trabajo de renderizado: {e}")
+                continue
+            self.completados += 1
+            callback(resultado, *args)
+
+        self.widget.after(self.intervalo_ms, self._drenar)
+
+    def estadisticas(self):
+        return {
+            "generacion": self.generacion,
+            "completados": self.completados,
+            "cancelados": self.cancelados,
+            "descartados": self.descartados,
+            "pendientes": len(self._pendientes),
+        }
@@ -0,0 +1,90 @@
+import os
+import json
+import tempfile
+import unittest
+
+from pdfmoificador import organizador
+
+
+class TestOrganizador(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.raiz = self._tmp.name
+        for rel in ("a.pdf", "foto.JPG", "notas.txt", os.path.join("viejo", "a.pdf"), os.path.join("viejo", "b.pdf")):
+            self._crear(rel)
+
+    def _crear(self, rel):
+        ruta = os.path.join(self.raiz, rel)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(rel)
+
+    def _arbol(self):
+        return sorted(
+            os.path.relpath(os.path.join(carpeta, nombre), self.raiz)
+            for carpeta, _, nombres in os.walk(self.raiz) for nombre in nombres
+            if nombre not in organizador.ARCHIVOS_PROPIOS
+        )
+
+    def test_simular_no_mueve_nada(self):
+        antes = self._arbol()
+        plan, errores = organizador.organizar(self.raiz, simular=True)
+        self.assertEqual(errores, [])
+        self.assertEqual(len(plan.movimientos), 5)
+        self.assertEqual(self._arbol(), antes)
+        self.assertFalse(os.path.exists(os.path.join(self.raiz, organizador.MANIFIESTO)))
+
+    def test_primera_pasada(self):
+        plan, errores = organizador.organizar(self.raiz)
+        self.assertEqual(errores, [])
+        self.assertEqual(self._arbol(), sorted([
+            os.path.join("pdf", "a.pdf"), os.path.join("pdf", "a_1.pdf"), os.path.join("pdf", "b.pdf"),
+            os.path.join("imagenes", "foto.JPG"), os.path.join("txt", "notas.txt"),
+        ]))
+        # La colisión se resuelve en orden alfabético de ruta: el de la raíz conserva el nombre
+        with open(os.path.join(self.raiz, "pdf", "a.pdf"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "a.pdf")
+        self.assertFalse(os.path.exists(os.path.join(self.raiz, "viejo")))
+        self.assertEqual(plan.conteo, {".pdf": 3, ".jpg": 1, ".txt": 1})
+        with open(os.path.join(self.raiz, organizador.MANIFIESTO), encoding="utf-8") as f:
+            self.assertEqual(sorted(json.load(f)["archivos"]), self._arbol())
+
+    def test_segunda_pasada_no_mueve_nada(self):
+        organizador.organizar(self.raiz)
+        antes = self._arbol()
+        plan, errores = organizador.organizar(self.raiz)
+        self.assertEqual((plan.movimientos, errores), ([], []))
+        self.assertEqual(self._arbol(), antes)
+        self.assertEqual(plan.conteo, {".pdf": 3, ".jpg": 1, ".txt": 1})
+
+    def test_segunda_pasada_solo_mueve_lo_nuevo(self):
+        organizador.organizar(self.raiz)
+        self._crear("a.pdf")
+        self._crear(os.path.join("otra", "c.png"))
+
+        plan, errores = organizador.organizar(self.raiz)
+        self.assertEqual(errores, [])
+        self.assertEqual(sorted(plan.movimientos), [
+            organizador.Movimiento("a.pdf", os.path.join("pdf", "a_2.pdf")),
+            organizador.Movimiento(os.path.join("otra", "c.png"), os.path.join("imagenes", "c.png")),
+        ])
+        self.assertEqual(plan.conteo, {".pdf": 4, ".jpg": 1, ".txt": 1, ".png": 1})
+
+    def test_archivo_nuevo_dentro_de_una_carpeta_organizada(self):
+        organizador.organizar(self.raiz)
+        self._crear(os.path.join("pdf", "d.pdf"))
+        # Que el mtime de la carpeta cambie aunque el sistema de archivos tenga poca resolución
+        carpeta = os.path.join(self.raiz, "pdf")
+        mtime = os.stat(carpeta).st_mtime_ns + 10**9
+        os.utime(carpeta, ns=(mtime, mtime))
+
+        plan, errores = organizador.organizar(self.raiz)
+        self.assertEqual((plan.movimientos, errores), ([], []))
+        self.assertIn(os.path.join("pdf", "d.pdf"), plan.archivos)
+        self.assertEqual(plan.conteo[".pdf"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
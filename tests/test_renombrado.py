@@ -0,0 +1,143 @@
+import os
+import json
+import tempfile
+import unittest
+
+from pdfmoificador import renombrado
+
+
+class TestDiarioRenombres(unittest.TestCase):
+    """
+    Lotes cortados a mitad de camino (corte de luz, cierre inesperado): el diario
+    tiene que alcanzar para retomarlos o revertirlos.
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.carpeta = os.path.join(self._tmp.name, "archivos")
+        self.diarios = os.path.join(self._tmp.name, "diarios")
+        os.mkdir(self.carpeta)
+        self.origenes = []
+        for i in range(3):
+            ruta = os.path.join(self.carpeta, f"doc{i}.pdf")
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(str(i))
+            self.origenes.append(ruta)
+        pares = [(r, os.path.join(self.carpeta, renombrado.nombre_con_fecha(r, "01-02-2023"))) for r in self.origenes]
+        self.ruta_lote = renombrado.crear_lote(pares, self.diarios)
+        self.renombres = renombrado.leer_lote(self.ruta_lote).renombres
+
+    def _anotar(self, *registros, cola=""):
+        with open(self.ruta_lote, "a", encoding="utf-8") as f:
+            for registro in registros:
+                f.write(json.dumps(registro) + "\n")
+            f.write(cola)
+
+    def _renombrar_a_mano(self, i):
+        os.rename(self.renombres[i].origen, self.renombres[i].destino)
+
+    def _contenidos(self):
+        return sorted(os.listdir(self.carpeta))
+
+    def test_aplicar_y_revertir(self):
+        hechos, errores = renombrado.aplicar_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(hechos, [tuple(r) for r in self.renombres])
+        self.assertFalse(renombrado.leer_lote(self.ruta_lote).abierto)
+        self.assertEqual(renombrado.lotes_pendientes(self.diarios), [])
+
+        revertidos, errores = renombrado.revertir_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(len(revertidos), 3)
+        self.assertEqual(self._contenidos(), ["doc0.pdf", "doc1.pdf", "doc2.pdf"])
+        self.assertEqual(renombrado.leer_lote(self.ruta_lote).hechos, {})
+
+    def test_ultima_linea_cortada(self):
+        # El primero se confirmó; el segundo se movió pero su "hecho" quedó a medias
+        self._renombrar_a_mano(0)
+        self._renombrar_a_mano(1)
+        self._anotar(
+            {"tipo": "aplicando"},
+            {"tipo": "intento", "i": 0, "destino": self.renombres[0].destino},
+            {"tipo": "hecho", "i": 0, "destino": self.renombres[0].destino},
+            {"tipo": "intento", "i": 1, "destino": self.renombres[1].destino},
+            cola='{"tipo": "hecho", "i": 1, "dest',
+        )
+
+        estado = renombrado.leer_lote(self.ruta_lote)
+        self.assertTrue(estado.abierto)
+        self.assertEqual(estado.hechos, {0: self.renombres[0].destino, 1: self.renombres[1].destino})
+        self.assertEqual([e.ruta for e in renombrado.lotes_pendientes(self.diarios)], [estado.ruta])
+
+        # Al retomar sólo falta el tercero, y el diario sigue siendo legible
+        hechos, errores = renombrado.aplicar_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(hechos, [tuple(self.renombres[2])])
+        estado = renombrado.leer_lote(self.ruta_lote)
+        self.assertFalse(estado.abierto)
+        self.assertEqual(sorted(estado.hechos), [0, 1, 2])
+
+        revertidos, errores = renombrado.revertir_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(len(revertidos), 3)
+        self.assertEqual(self._contenidos(), ["doc0.pdf", "doc1.pdf", "doc2.pdf"])
+
+    def test_intento_sin_hecho_con_archivo_movido(self):
+        self._renombrar_a_mano(0)
+        self._anotar({"tipo": "aplicando"}, {"tipo": "intento", "i": 0, "destino": self.renombres[0].destino})
+
+        self.assertEqual(renombrado.leer_lote(self.ruta_lote).hechos, {0: self.renombres[0].destino})
+        revertidos, errores = renombrado.revertir_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(revertidos, [(self.renombres[0].destino, self.renombres[0].origen)])
+        self.assertEqual(self._contenidos(), ["doc0.pdf", "doc1.pdf", "doc2.pdf"])
+        self.assertEqual(renombrado.lotes_pendientes(self.diarios), [])
+
+    def test_intento_sin_hecho_con_archivo_sin_mover(self):
+        # El corte llegó antes del os.rename: al retomar se renombra normalmente
+        self._anotar({"tipo": "aplicando"}, {"tipo": "intento", "i": 0, "destino": self.renombres[0].destino})
+
+        self.assertEqual(renombrado.leer_lote(self.ruta_lote).hechos, {})
+        hechos, errores = renombrado.aplicar_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual(hechos, [tuple(r) for r in self.renombres])
+
+    def test_intento_con_destino_alternativo(self):
+        # Alguien ocupó el destino planificado: el intento anotó el nombre alternativo
+        alternativo = os.path.join(self.carpeta, "01-02-2023__doc0_1.pdf")
+        os.rename(self.renombres[0].origen, alternativo)
+        self._anotar({"tipo": "aplicando"}, {"tipo": "intento", "i": 0, "destino": alternativo})
+
+        self.assertEqual(renombrado.leer_lote(self.ruta_lote).hechos, {0: alternativo})
+        hechos, errores = renombrado.aplicar_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertEqual([origen for origen, _ in hechos], self.origenes[1:])
+
+        revertidos, errores = renombrado.revertir_lote(self.ruta_lote)
+        self.assertEqual(errores, [])
+        self.assertIn((alternativo, self.origenes[0]), revertidos)
+        self.assertEqual(self._contenidos(), ["doc0.pdf", "doc1.pdf", "doc2.pdf"])
+
+
+class TestNombres(unittest.TestCase):
+
+    def test_colisiones_dentro_del_lote(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            destino = os.path.join(carpeta, "igual.pdf")
+            renombres = renombrado.resolver_colisiones([
+                (os.path.join(carpeta, "a.pdf"), destino),
+                (os.path.join(carpeta, "b.pdf"), destino),
+            ])
+        self.assertEqual([os.path.basename(r.destino) for r in renombres], ["igual.pdf", "igual_1.pdf"])
+
+    def test_ya_renombrado(self):
+        nombre = renombrado.nombre_con_fecha("/x/factura.pdf", "15/08/2023")
+        self.assertEqual(nombre, "15_08_2023__factura.pdf")
+        self.assertTrue(renombrado.ya_renombrado(nombre))
+        self.assertTrue(renombrado.ya_renombrado("ago 2023__factura.pdf", "ago 2023"))
+        self.assertFalse(renombrado.ya_renombrado("factura.pdf", "15/08/2023"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+import math
+import tkinter as tk
+from collections import OrderedDict
+from pdfmoificador.dependencias import Image, ImageTk
+
+
+TILE_SIZE = 256
+DEFAULT_TILE_BUDGET = 96 * 1024 * 1024  # 96 MB de teselas en Tk
+
+
+class ImagePyramid:
+    """
+    Pirámide de resoluciones de una imagen, generada a demanda.
+
+    El nivel 0 es la imagen original y cada nivel siguiente mide la mitad. Sólo
+    se mantiene decodificado el nivel en uso: para los niveles reducidos de un
+    JPEG se usa `draft`, así abrir la imagen ajustada a la ventana no requiere
+    decodificar la resolución completa.
+    """
+
+    def __init__(self, image_path, tile_size=TILE_SIZE):
+        self.image_path = image_path
+        self.tile_size = tile_size
+        with Image.open(image_path) as image:
+            self.width, self.height = image.size
+        # Último nivel: el que entra entero en una tesela
+        self.max_level = max(0, math.ceil(math.log2(max(self.width, self.height) / tile_size)))
+        self._level = None
+        self._level_image = None
+
+    def level_size(self, level):
+        factor = 2 ** level
+        return max(1, math.ceil(self.width / factor)), max(1, math.ceil(self.height / factor))
+
+    def fit_level(self, width, height):
+        """
+        Nivel más detallado que entra completo en width x height.
+        """
+        for level in range(self.max_level + 1):
+            level_width, level_height = self.level_size(level)
+            if level_width <= width and level_height <= height:
+                return level
+        return self.max_level
+
+    def grid_size(self, level):
+        level_width, level_height = self.level_size(level)
+        return math.ceil(level_width / self.tile_size), math.ceil(level_height / self.tile_size)
+
+    def _image_for_level(self, level):
+        if self._level == level:
+            return self._level_image
+        size = self.level_size(level)
+        if self._level is not None and self._level == level - 1:
+            # Bajar un nivel desde el que ya está decodificado
+            image = self._level_image.resize(size, Image.BOX)
+        else:
+            with Image.open(self.image_path) as source:
+                if level > 0:
+                    source.draft("RGB", size)
+                image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+            if image.size != size:
+                image = image.resize(size, Image.BOX)
+        self._level, self._level_image = level, image
+        return image
+
+    def tile(self, level, column, row):
+        """
+        Devuelve la tesela (imagen PIL) de la columna y fila indicadas.
+        """
+        image = self._image_for_level(level)
+        x0, y0 = column * self.tile_size, row * self.tile_size
+        return image.crop((x0, y0, min(x0 + self.tile_size, image.width), min(y0 + self.tile_size, image.height)))
+
+
+class TiledImageViewer(tk.Frame):
+    """
+    Visor con zoom que sólo dibuja las teselas que intersectan la parte visible
+    del canvas. Las teselas ya convertidas a PhotoImage se guardan en un LRU
+    limitado por bytes; las que salen de la vista se quitan del canvas y, si se
+    supera el presupuesto, también de memoria.
+
+    Rueda: desplazamiento vertical (Shift: horizontal). Ctrl + rueda o las teclas
+    + y - cambian de nivel manteniendo fijo el punto bajo el mouse.
+    """
+
+    def __init__(self, master, image_path, tile_budget=DEFAULT_TILE_BUDGET, **kwargs):
+        super().__init__(master, **kwargs)
+        self.pyramid = ImagePyramid(image_path)
+        self.tile_budget = tile_budget
+        self.level = None
+
+        self.canvas = tk.Canvas(self, bg="black", highlightthickness=0)
+        x_scroll = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self._xview)
+        y_scroll = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        self.canvas.config(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # (nivel, columna, fila) -> PhotoImage, el más viejo primero
+        self._tiles = OrderedDict()
+        self._tile_bytes = 0
+        # (columna, fila) -> id del item en el canvas, sólo del nivel actual
+        self._items = {}
+        self._redraw_pending = False
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self._on_shift_mousewheel)
+        self.canvas.bind("<Control-MouseWheel>", self._on_zoom_wheel)
+        # X11 no genera <MouseWheel>
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_units(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_units(1))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.zoom(-1, e.x, e.y))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.zoom(1, e.x, e.y))
+        self.canvas.bind("<plus>", lambda e: self.zoom(-1))
+        self.canvas.bind("<minus>", lambda e: self.zoom(1))
+        self.canvas.focus_set()
+
+    # -------------------- NIVEL --------------------
+    def _on_configure(self, event):
+        if self.level is None:
+            # Arrancar con la imagen ajustada a la ventana
+            self._set_level(self.pyramid.fit_level(event.width, event.height))
+        self.redraw()
+
+    def _set_level(self, level):
+        self.level = level
+        for item in self._items.values():
+            self.canvas.delete(item)
+        self._items.clear()
+        width, height = self.pyramid.level_size(level)
+        self.canvas.config(scrollregion=(0, 0, width, height))
+
+    def zoom(self, step, x=None, y=None):
+        """
+        Cambia de nivel (step -1 acerca, +1 aleja) manteniendo el punto (x, y)
+        de la ventana sobre el mismo lugar de la imagen.
+        """
+        if self.level is None:
+            return
+        new_level = min(max(self.level + step, 0), self.pyramid.max_level)
+        if new_level == self.level:
+            return
+        if x is None:
+            x, y = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        old_width, old_height = self.pyramid.level_size(self.level)
+        # Posición relativa en la imagen del punto bajo el mouse
+        fx = self.canvas.canvasx(x) / old_width
+        fy = self.canvas.canvasy(y) / old_height
+
+        self._set_level(new_level)
+        width, height = self.pyramid.level_size(new_level)
+        self.canvas.xview_moveto((fx * width - x) / width)
+        self.canvas.yview_moveto((fy * height - y) / height)
+        self.redraw()
+
+    # -------------------- DESPLAZAMIENTO --------------------
+    def _xview(self, *args):
+        self.canvas.xview(*args)
+        self.redraw()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def _scroll_units(self, units, horizontal=False):
+        if horizontal:
+            self.canvas.xview_scroll(units, "units")
+        else:
+            self.canvas.yview_scroll(units, "units")
+        self.redraw()
+
+    def _on_mousewheel(self, event):
+        self._scroll_units(int(-1*(event.delta/120)))
+
+    def _on_shift_mousewheel(self, event):
+        self._scroll_units(int(-1*(event.delta/120)), horizontal=True)
+
+    def _on_zoom_wheel(self, event):
+        self.zoom(-1 if event.delta > 0 else 1, event.x, event.y)
+
+    # -------------------- TESELAS --------------------
+    def redraw(self):
+        # Agrupar varios eventos de scroll en un solo redibujado
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _visible_tiles(self):
+        tile_size = self.pyramid.tile_size
+        columns, rows = self.pyramid.grid_size(self.level)
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        x1, y1 = x0 + self.canvas.winfo_width(), y0 + self.canvas.winfo_height()
+        first_column, last_column = max(0, int(x0 // tile_size)), min(columns - 1, int(x1 // tile_size))
+        first_row, last_row = max(0, int(y0 // tile_size)), min(rows - 1, int(y1 // tile_size))
+        return {
+            (column, row)
+            for column in range(first_column, last_column + 1)
+            for row in range(first_row, last_row + 1)
+        }
+
+    def _redraw(self):
+        self._redraw_pending = False
+        if self.level is None:
+            return
+        visible = self._visible_tiles()
+
+        # Lo que salió de la vista deja el canvas (la PhotoImage queda en el LRU)
+        for position in [p for p in self._items if p not in visible]:
+            self.canvas.delete(self._items.pop(position))
+
+        tile_size = self.pyramid.tile_size
+        for column, row in sorted(visible - self._items.keys(), key=lambda p: (p[1], p[0])):
+            photo = self._get_tile(self.level, column, row)
+            self._items[(column, row)] = self.canvas.create_image(
+                column * tile_size, row * tile_size, anchor=tk.NW, image=photo
+            )
+        self._evict(visible)
+
+    def _get_tile(self, level, column, row):
+        key = (level, column, row)
+        photo = self._tiles.get(key)
+        if photo is not None:
+            self._tiles.move_to_end(key)
+            return photo
+        photo = ImageTk.PhotoImage(self.pyramid.tile(level, column, row))
+        self._tiles[key] = photo
+        # Tk guarda las imágenes a 4 bytes por píxel
+        self._tile_bytes += photo.width() * photo.height() * 4
+        return photo
+
+    def _evict(self, visible):
+        """
+        Libera las teselas menos usadas hasta volver al presupuesto, sin tocar las visibles.
+        """
+        for key in list(self._tiles):
+            if self._tile_bytes <= self.tile_budget:
+                break
+            if key[0] == self.level and (key[1], key[2]) in visible:
+                continue
+            photo = self._tiles.pop(key)
+            self._tile_bytes -= photo.width() * photo.height() * 4
@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-import fitz  # PyMuPDF
-import asyncio
-import threading
-from pathlib import Path
 import logging
-import re
+import math
+import time
+from pdfmoificador import duplicados, renombrado, trazas
+from pdfmoificador.dependencias import fitz
+from pdfmoificador.cache_miniaturas import CacheMiniaturas, CacheMemoria
+from pdfmoificador.renderizado import MotorRenderizado, ZOOM_MINIATURA, medidas_paginas
+from pdfmoificador.precarga import Precargador
+from pdfmoificador.extraccion import ExtractorFacturas
+from pdfmoificador.indice_texto import IndiceTexto
+from pdfmoificador.vigilante_carpeta import VigilanteCarpeta, EventoCarpeta
+from pdfmoificador.division import MODO_RANGOS, MODO_CADA, MODO_POR_PAGINA, parsear_rangos, planificar, dividir_seguro
+from pdfmoificador.validaciones import AlmacenValidaciones
+from planificador import PlanificadorRender
+from lista_virtual import ListaVirtual
+from vista_detalle import VistaPaginaZoom
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from bisect import bisect_left, insort
+import threading
+from collections import defaultdict
+
+# Alto en píxeles de las filas de la lista de miniaturas
+ALTO_TITULO = 30
+ALTO_MINIMO_FILA = 40
+MARGEN_FILA = 16
+
 
 class ValidadorMasivoPDF(tk.Tk):
     def __init__(self):
@@ -14,27 +34,92 @@ class ValidadorMasivoPDF(tk.Tk):
         self.title("Validador Masivo de Facturas (PDF) con Paginación, Extracción y Eliminación tras Renombrar")
         self.geometry("1200x700")
 
-        # Lista completa de PDFs en la carpeta
+        # Lista completa de PDFs en la carpeta y la que se muestra (filtrada por búsqueda)
+        self.todos_los_pdf = []
         self.archivos_pdf = []
         self.directorio_actual = None
+        # Índice de texto completo de la carpeta actual
+        self.indice_texto = None
+        self.busqueda_activa = False
+        # Cambios en la carpeta (agregados, borrados, renombrados) sin releerla entera
+        self.vigilante = None
+        self.intervalo_vigilancia_ms = 1000
+        # Archivos que produjo la propia aplicación y no deben volver a la lista
+        self.ignorar_archivos = set()
+        # Renombres encolados desde la vista detallada: [(ruta_pdf, nuevo_nombre), ...]
+        self.cola_renombres = []
+        # Los lotes de renombres se aplican de a uno; el resto espera: [(operacion, ruta, texto)]
+        self.lote_en_curso = False
+        self.lotes_en_espera = []
 
         # Paginación
         self.pdfs_per_page = 3  # Cuántos PDFs se muestran por “página”
         self.current_page = 0   # Índice de la página actual
 
-        # Estructura para datos de cada página (miniaturas, checks, etc.)
-        # Formato: [{'ruta_pdf':..., 'pdf_name':..., 'pag_index':..., 'check_var':..., 'entry_widget':...}, ...]
+        # Estructura para datos de cada página (checks, observaciones, etc.)
+        # Formato: [{'ruta_pdf':..., 'pdf_name':..., 'pag_index':..., 'validado':..., 'observacion':...}, ...]
+        # Los widgets de la lista se reciclan, así que el estado vive acá y no en ellos.
         self.datos_paginas = []
-
-        # Configurar logging
-        logging.basicConfig(
-            filename='visor_pdf.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        # Checks y observaciones de todas las páginas vistas; se guardan solos en segundo plano
+        self.validaciones = AlmacenValidaciones()
+
+        # Miniaturas ya convertidas de la página actual: (ruta_pdf, pag_index) -> PhotoImage
+        self.imagenes = {}
+        self.miniaturas_fallidas = set()
+        # (ruta_pdf, pag_index) -> índice del item en la lista virtual
+        self.indice_items = {}
+        # Sólo se renderiza lo visible: claves ya pedidas y futures en curso
+        self.solicitadas = set()
+        self.trabajos_visibles = {}  # future -> ruta_pdf
+        # Por encima de este número de miniaturas se liberan las que quedan lejos de la vista
+        self.max_imagenes = 120
+        self.margen_imagenes = 20  # Items a cada lado de la vista que no se liberan
+        # ruta_pdf -> {"hechas": set de páginas, "total": n}
+        self.progreso = {}
+
+        # Caché en disco de miniaturas (evita re-renderizar al paginar)
+        self.cache_miniaturas = CacheMiniaturas(tope_bytes=512 * 1024 * 1024)
+
+        # Renderizado en paralelo (None = un proceso por núcleo)
+        self.num_workers = None
+        # Memoria para miniaturas precargadas de las páginas vecinas
+        self.tope_memoria_miniaturas = 64 * 1024 * 1024
+        self.motor_render = MotorRenderizado(
+            self.cache_miniaturas,
+            num_workers=self.num_workers,
+            memoria=CacheMemoria(self.tope_memoria_miniaturas)
         )
+        # Entrega los resultados al hilo de Tk y descarta los de páginas ya abandonadas
+        self.planificador = PlanificadorRender(self)
+        # Precarga de páginas vecinas (profundidad = cuántas hacia adelante y hacia atrás)
+        self.precargador = Precargador(self.motor_render, profundidad=1)
+
+        # Sugerencias de fecha / número / CUIT sacadas del texto de cada PDF
+        self.extractor = ExtractorFacturas(num_workers=self.num_workers)
+
+        # Configurar logging (con rotación; las trazas de tiempos van en el mismo log)
+        trazas.configurar_log('visor_pdf.log')
         
         # Construir la interfaz principal
         self.configurar_interfaz()
+        self.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.after(self.intervalo_vigilancia_ms, self.revisar_carpeta)
+        # Lotes de renombres que quedaron a medio aplicar en una sesión anterior
+        self.after_idle(self.revisar_lotes_pendientes)
+
+    def cerrar(self):
+        """
+        Libera el pool de procesos antes de cerrar la ventana.
+        """
+        self.precargador.cerrar()
+        self.motor_render.cerrar()
+        self.extractor.cerrar()
+        self.validaciones.cerrar()
+        if self.indice_texto:
+            self.indice_texto.cerrar()
+        if self.vigilante:
+            self.vigilante.cerrar()
+        self.destroy()
 
     def configurar_interfaz(self):
         """
@@ -60,26 +145,56 @@ class ValidadorMasivoPDF(tk.Tk):
         )
         self.boton_guardar.pack(side=tk.LEFT, padx=5)
 
-        # Área con scroll para miniaturas
-        self.frame_scroll = ttk.Frame(self)
-        self.frame_scroll.pack(fill=tk.BOTH, expand=True)
-
-        self.canvas_scroll = tk.Canvas(self.frame_scroll)
-        self.scrollbar_y = ttk.Scrollbar(self.frame_scroll, orient=tk.VERTICAL, command=self.canvas_scroll.yview)
-        self.canvas_scroll.configure(yscrollcommand=self.scrollbar_y.set)
-        
-        self.canvas_scroll.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
+        # Botón: Dividir en lote todos los PDFs listados
+        self.boton_dividir = ttk.Button(
+            self.frame_superior,
+            text="Dividir PDFs",
+            command=self.dividir_carpeta
+        )
+        self.boton_dividir.pack(side=tk.LEFT, padx=5)
 
-        # Frame contenedor interno para los PDFs y sus páginas
-        self.frame_contenedor = ttk.Frame(self.canvas_scroll)
-        self.canvas_scroll.create_window((0, 0), window=self.frame_contenedor, anchor=tk.NW)
+        # Botón: Buscar PDFs duplicados (mismo contenido) en la carpeta y sus subcarpetas
+        self.boton_duplicados = ttk.Button(
+            self.frame_superior,
+            text="Buscar Duplicados",
+            command=self.buscar_duplicados
+        )
+        self.boton_duplicados.pack(side=tk.LEFT, padx=5)
 
-        # Ajustar la región de scroll cuando cambie el tamaño
-        self.frame_contenedor.bind(
-            "<Configure>", 
-            lambda e: self.canvas_scroll.configure(scrollregion=self.canvas_scroll.bbox("all"))
+        # Botones: Aplicar de una vez los renombres encolados y deshacer el último lote
+        self.boton_cola = ttk.Button(
+            self.frame_superior,
+            text="Aplicar Renombres (0)",
+            command=self.aplicar_cola_renombres
+        )
+        self.boton_cola.pack(side=tk.LEFT, padx=5)
+        self.boton_deshacer = ttk.Button(
+            self.frame_superior,
+            text="Deshacer Último Lote",
+            command=self.deshacer_ultimo_lote
+        )
+        self.boton_deshacer.pack(side=tk.LEFT, padx=5)
+
+        # Búsqueda de texto dentro de los PDFs
+        self.boton_limpiar_busqueda = ttk.Button(self.frame_superior, text="Limpiar", command=self.limpiar_busqueda)
+        self.boton_limpiar_busqueda.pack(side=tk.RIGHT, padx=5)
+        self.boton_buscar = ttk.Button(self.frame_superior, text="Buscar", command=self.buscar_texto)
+        self.boton_buscar.pack(side=tk.RIGHT, padx=5)
+        self.entry_busqueda = ttk.Entry(self.frame_superior, width=30)
+        self.entry_busqueda.pack(side=tk.RIGHT, padx=5)
+        self.entry_busqueda.bind("<Return>", lambda e: self.buscar_texto())
+        self.label_busqueda = ttk.Label(self.frame_superior, text="")
+        self.label_busqueda.pack(side=tk.RIGHT, padx=5)
+
+        # Área con scroll para miniaturas: sólo existen widgets para las filas visibles
+        self.lista_paginas = ListaVirtual(
+            self,
+            crear_fila=self.crear_fila,
+            vincular_fila=self.vincular_fila,
+            al_cambiar_rango=self.solicitar_visibles
         )
+        self.lista_paginas.pack(fill=tk.BOTH, expand=True)
+        self.canvas_scroll = self.lista_paginas.canvas
 
         # Frame inferior (paginación)
         self.frame_inferior = ttk.Frame(self)
@@ -94,6 +209,19 @@ class ValidadorMasivoPDF(tk.Tk):
         self.boton_siguiente = ttk.Button(self.frame_inferior, text="Siguiente >>", command=self.pag_siguiente)
         self.boton_siguiente.pack(side=tk.LEFT, padx=5)
 
+        # Progreso de renderizado del PDF actual
+        self.label_progreso = ttk.Label(self.frame_inferior, text="")
+        self.label_progreso.pack(side=tk.RIGHT, padx=5)
+        self.barra_progreso = ttk.Progressbar(self.frame_inferior, length=200, mode="determinate")
+        self.barra_progreso.pack(side=tk.RIGHT, padx=5)
+
+    def actualizar_progreso(self, pdf_name, hechas, total):
+        """
+        Muestra cuántas páginas del PDF ya se renderizaron.
+        """
+        self.barra_progreso.config(maximum=max(total, 1), value=hechas)
+        self.label_progreso.config(text=f"{pdf_name}: {hechas}/{total}")
+
     # -------------------- PAGINACIÓN --------------------
     def pag_anterior(self):
         if self.current_page > 0:
@@ -110,93 +238,254 @@ class ValidadorMasivoPDF(tk.Tk):
         """
         Limpia el contenedor y muestra sólo los PDFs de la "página" actual.
         """
+        inicio = time.perf_counter()
         # Borrar contenido actual
-        for widget in self.frame_contenedor.winfo_children():
-            widget.destroy()
         self.datos_paginas.clear()
+        self.imagenes.clear()
+        self.miniaturas_fallidas.clear()
+        self.indice_items.clear()
+        self.solicitadas.clear()
+        self.trabajos_visibles.clear()
+        self.progreso.clear()
 
-        start_index = self.current_page * self.pdfs_per_page
-        end_index = start_index + self.pdfs_per_page
-        pdfs_en_esta_pagina = self.archivos_pdf[start_index:end_index]
+        pdfs_en_esta_pagina = self.pdfs_de_pagina(self.current_page)
 
         # Actualizar etiqueta de paginación
         max_page = (len(self.archivos_pdf) - 1) // self.pdfs_per_page
         self.label_paginacion.config(text=f"Página {self.current_page+1} / {max_page+1}")
 
-        # Cargar las miniaturas en un hilo aparte
-        threading.Thread(
-            target=lambda: asyncio.run(self.cargar_miniaturas_pagina(pdfs_en_esta_pagina))
-        ).start()
+        # Los trabajos de la página anterior quedan obsoletos
+        self.planificador.nueva_generacion()
+        logging.info(f"Renderizado: {self.planificador.estadisticas()}")
+
+        self.cargar_miniaturas_pagina(pdfs_en_esta_pagina)
+        # Hasta que Tk termina de acomodar los widgets (la geometría se calcula en idle)
+        pagina = self.current_page
+        self.after_idle(lambda: trazas.registrar({
+            "etapa": "visor.pagina",
+            "ms": round((time.perf_counter() - inicio) * 1000, 3),
+            "pagina": pagina,
+            "pdfs": len(pdfs_en_esta_pagina),
+        }))
+
+        # Mientras se revisa esta página, preparar las vecinas (primero las siguientes)
+        profundidad = self.precargador.profundidad
+        vecinas = [self.current_page + d for d in range(1, profundidad + 1)]
+        vecinas += [self.current_page - d for d in range(1, profundidad + 1)]
+        self.precargador.actualizar(
+            [
+                [os.path.join(self.directorio_actual, pdf) for pdf in self.pdfs_de_pagina(n)]
+                for n in vecinas if 0 <= n <= max_page
+            ],
+            pagina_actual=[os.path.join(self.directorio_actual, pdf) for pdf in pdfs_en_esta_pagina],
+        )
+
+    def pdfs_de_pagina(self, numero_pagina):
+        """
+        Nombres de los PDFs que corresponden a una página de paginación.
+        """
+        start_index = numero_pagina * self.pdfs_per_page
+        return self.archivos_pdf[start_index:start_index + self.pdfs_per_page]
 
-    async def cargar_miniaturas_pagina(self, lista_pdfs):
+    def cargar_miniaturas_pagina(self, lista_pdfs):
         """
-        Genera miniaturas SOLO para los PDFs en la lista.
+        Arma los items de los PDFs en la lista con marcadores del tamaño de cada página.
+        Las miniaturas se piden recién cuando sus filas entran en la vista.
         """
+        items = []
+        alturas = []
         for pdf_name in lista_pdfs:
             ruta_pdf = os.path.join(self.directorio_actual, pdf_name)
             try:
-                doc = fitz.open(ruta_pdf)
+                with trazas.tramo("visor.abrir", archivo=ruta_pdf):
+                    rects = medidas_paginas(ruta_pdf)
             except Exception as e:
                 logging.error(f"No se pudo abrir {pdf_name}: {e}")
                 continue
 
-            # LabelFrame para agrupar las páginas de este PDF
-            frame_pdf_title = ttk.LabelFrame(self.frame_contenedor, text=pdf_name)
-            frame_pdf_title.pack(fill=tk.X, padx=5, pady=5)
-
-            for page_index in range(len(doc)):
-                try:
-                    page = doc[page_index]
-                    thumb_matrix = fitz.Matrix(0.2, 0.2)  # Zoom miniatura
-                    pix = page.get_pixmap(matrix=thumb_matrix)
-                    img = tk.PhotoImage(data=pix.tobytes("ppm"))
-                except Exception as e:
-                    logging.warning(f"No se pudo generar miniatura: {pdf_name}, página {page_index+1}")
-                    img = None
-
-                frame_pagina = ttk.Frame(frame_pdf_title)
-                frame_pagina.pack(fill=tk.X, padx=5, pady=5)
-
-                var_check = tk.BooleanVar(value=False)
-                chk = ttk.Checkbutton(frame_pagina, variable=var_check)
-                chk.pack(side=tk.LEFT, padx=5)
-
-                if img:
-                    lbl_img = tk.Label(frame_pagina, image=img, cursor="hand2")
-                    lbl_img.image = img  # Mantener referencia
-                    lbl_img.pack(side=tk.LEFT, padx=5)
-                    # Clic => ver vista detallada
-                    lbl_img.bind(
-                        "<Button-1>",
-                        lambda e, rp=ruta_pdf, pi=page_index: self.abrir_vista_detallada(rp, pi)
-                    )
-                else:
-                    # Si no hay miniatura
-                    lbl_img = tk.Label(frame_pagina, text=f"[Página {page_index+1}]", fg="red", cursor="hand2")
-                    lbl_img.pack(side=tk.LEFT, padx=5)
-                    lbl_img.bind(
-                        "<Button-1>",
-                        lambda e, rp=ruta_pdf, pi=page_index: self.abrir_vista_detallada(rp, pi)
-                    )
-
-                ttk.Label(frame_pagina, text=f"Pág {page_index+1}").pack(side=tk.LEFT, padx=5)
+            # Título para agrupar las páginas de este PDF
+            items.append({"tipo": "titulo", "pdf_name": pdf_name})
+            alturas.append(ALTO_TITULO)
 
-                entry_val = ttk.Entry(frame_pagina, width=60)
-                entry_val.insert(0, f"Observación pág {page_index+1}")
-                entry_val.pack(side=tk.LEFT, padx=5)
+            # Lo que ya se validó antes (en otra página de paginación o en otra sesión)
+            guardadas = self.validaciones.obtener(ruta_pdf)
 
-                # Guardar info en datos_paginas
-                self.datos_paginas.append({
+            for page_index, rect in enumerate(rects):
+                validado, observacion = guardadas.get(page_index, (False, f"Observación pág {page_index+1}"))
+                info = {
+                    "tipo": "pagina",
                     "ruta_pdf": ruta_pdf,
                     "pdf_name": pdf_name,
                     "pag_index": page_index,
-                    "check_var": var_check,
-                    "entry_widget": entry_val,
-                })
-            doc.close()
-            await asyncio.sleep(0)  # ceder el control al loop
+                    "validado": validado,
+                    "observacion": observacion,
+                    # Tamaño que tendrá la miniatura, para reservar el lugar
+                    "ancho": math.ceil(rect.width * ZOOM_MINIATURA),
+                    "alto": math.ceil(rect.height * ZOOM_MINIATURA),
+                }
+                self.indice_items[(ruta_pdf, page_index)] = len(items)
+                items.append(info)
+                alturas.append(max(info["alto"], ALTO_MINIMO_FILA) + MARGEN_FILA)
+                # Guardar info en datos_paginas
+                self.datos_paginas.append(info)
 
-        logging.info("Miniaturas de la página actual cargadas.")
+            self.progreso[ruta_pdf] = {"hechas": set(), "total": len(rects)}
+
+        self.lista_paginas.establecer_items(items, alturas)
+
+    def solicitar_visibles(self, desde, hasta):
+        """
+        Pide las miniaturas de los items a la vista, cancela lo que ya salió de ella
+        y libera imágenes lejanas si se superó el máximo.
+        """
+        items = self.lista_paginas.items
+        visibles = {
+            (item["ruta_pdf"], item["pag_index"])
+            for item in items[desde:hasta] if item["tipo"] == "pagina"
+        }
+
+        # Cancelar trabajos que todavía no empezaron y ya no se ven
+        for fut, ruta_pdf in list(self.trabajos_visibles.items()):
+            if fut.done():
+                del self.trabajos_visibles[fut]
+            elif all((ruta_pdf, p) not in visibles for p in fut.paginas) and fut.cancel():
+                del self.trabajos_visibles[fut]
+                self.solicitadas.difference_update((ruta_pdf, p) for p in fut.paginas)
+
+        # Pedir lo que falta, agrupado por PDF
+        faltantes = defaultdict(list)
+        for clave in visibles:
+            if clave not in self.imagenes and clave not in self.solicitadas and clave not in self.miniaturas_fallidas:
+                faltantes[clave[0]].append(clave[1])
+        for ruta_pdf, paginas in faltantes.items():
+            paginas.sort()
+            self.solicitadas.update((ruta_pdf, p) for p in paginas)
+            futures = self.motor_render.renderizar(ruta_pdf, paginas)
+            for fut in futures:
+                self.trabajos_visibles[fut] = ruta_pdf
+            self.planificador.enviar(futures, self.colocar_miniaturas, os.path.basename(ruta_pdf), ruta_pdf)
+
+        self.liberar_imagenes(desde, hasta)
+
+    def liberar_imagenes(self, desde, hasta):
+        """
+        Suelta las PhotoImage de filas lejanas a la vista cuando hay demasiadas.
+        Si se vuelve a ellas, salen de la caché en memoria del motor.
+        """
+        if len(self.imagenes) <= self.max_imagenes:
+            return
+        desde -= self.margen_imagenes
+        hasta += self.margen_imagenes
+        for clave in list(self.imagenes):
+            if not desde <= self.indice_items[clave] < hasta:
+                del self.imagenes[clave]
+
+    def crear_fila(self, padre, tipo):
+        """
+        Crea una fila reutilizable de la lista virtual ("titulo" o "pagina").
+        """
+        fila = ttk.Frame(padre)
+        fila.item = None
+        if tipo == "titulo":
+            fila.lbl_titulo = ttk.Label(fila, font=("TkDefaultFont", 10, "bold"))
+            fila.lbl_titulo.pack(side=tk.LEFT, padx=5, pady=5)
+            return fila
+
+        fila.var_check = tk.BooleanVar(value=False)
+        chk = ttk.Checkbutton(fila, variable=fila.var_check)
+        chk.pack(side=tk.LEFT, padx=5)
+
+        # Marco de tamaño fijo: el marcador ocupa lo mismo que ocupará la miniatura
+        fila.marco_img = tk.Frame(fila)
+        fila.marco_img.pack_propagate(False)
+        fila.marco_img.pack(side=tk.LEFT, padx=5)
+        fila.lbl_img = tk.Label(fila.marco_img, cursor="hand2", relief=tk.GROOVE)
+        fila.lbl_img.pack(fill=tk.BOTH, expand=True)
+        # Clic => ver vista detallada de la página vinculada en ese momento
+        fila.lbl_img.bind(
+            "<Button-1>",
+            lambda e, f=fila: self.abrir_vista_detallada(f.item["ruta_pdf"], f.item["pag_index"])
+        )
+
+        fila.lbl_pagina = ttk.Label(fila)
+        fila.lbl_pagina.pack(side=tk.LEFT, padx=5)
+
+        fila.var_obs = tk.StringVar()
+        entry_val = ttk.Entry(fila, width=60, textvariable=fila.var_obs)
+        entry_val.pack(side=tk.LEFT, padx=5)
+
+        # Los cambios del usuario van directo al item vinculado y al almacén
+        fila.var_check.trace_add("write", lambda *a, f=fila: self.editar_fila(f))
+        fila.var_obs.trace_add("write", lambda *a, f=fila: self.editar_fila(f))
+        return fila
+
+    def editar_fila(self, fila):
+        """
+        Pasa lo que cambió en la fila a su item. Al vincular una fila las variables
+        toman los valores del item, así que eso no cuenta como cambio.
+        """
+        item = fila.item
+        if item is None or item["tipo"] != "pagina":
+            return
+        validado, observacion = fila.var_check.get(), fila.var_obs.get()
+        if (validado, observacion) == (item["validado"], item["observacion"]):
+            return
+        item.update(validado=validado, observacion=observacion)
+        self.validaciones.marcar(item["ruta_pdf"], item["pag_index"], validado, observacion)
+
+    def vincular_fila(self, fila, item):
+        """
+        Muestra en una fila reciclada los datos de un item.
+        """
+        if item["tipo"] == "titulo":
+            fila.item = item
+            fila.lbl_titulo.config(text=item["pdf_name"])
+            return
+
+        clave = (item["ruta_pdf"], item["pag_index"])
+        # Sin item vinculado mientras se cargan las variables, para que no se mezclen
+        # los valores del item anterior con los del nuevo
+        fila.item = None
+        fila.var_check.set(item["validado"])
+        fila.var_obs.set(item["observacion"])
+        fila.item = item
+        fila.lbl_pagina.config(text=f"Pág {item['pag_index']+1}")
+        fila.marco_img.config(width=max(item["ancho"], 1), height=max(item["alto"], 1))
+
+        img = self.imagenes.get(clave)
+        if img:
+            fila.lbl_img.config(image=img, text="")
+        else:
+            # Marcador hasta que llegue la miniatura (en rojo si no se pudo generar)
+            color = "red" if clave in self.miniaturas_fallidas else "black"
+            fila.lbl_img.config(image="", text=f"[Página {item['pag_index']+1}]", fg=color)
+
+    def colocar_miniaturas(self, resultado, pdf_name, ruta_pdf):
+        """
+        Recibe [(page_index, bytes_ppm), ...] en el hilo de Tk y actualiza las filas visibles.
+        """
+        progreso = self.progreso[ruta_pdf]
+        for page_index, datos_ppm in resultado:
+            clave = (ruta_pdf, page_index)
+            self.solicitadas.discard(clave)
+            progreso["hechas"].add(page_index)
+            try:
+                with trazas.tramo("visor.convertir", archivo=ruta_pdf, pagina=page_index):
+                    img = tk.PhotoImage(data=datos_ppm) if datos_ppm else None
+            except Exception:
+                img = None
+
+            if img:
+                self.imagenes[clave] = img  # Mantener referencia
+            else:
+                self.miniaturas_fallidas.add(clave)
+                logging.warning(f"No se pudo generar miniatura: {pdf_name}, página {page_index+1}")
+            with trazas.tramo("visor.mostrar", archivo=ruta_pdf, pagina=page_index):
+                self.lista_paginas.actualizar_item(self.indice_items[clave])
+
+        self.actualizar_progreso(pdf_name, len(progreso["hechas"]), progreso["total"])
+        if len(progreso["hechas"]) == progreso["total"]:
+            logging.info(f"Miniaturas cargadas: {pdf_name}")
 
     def cargar_directorio(self):
         """
@@ -207,11 +496,15 @@ class ValidadorMasivoPDF(tk.Tk):
             return
         
         self.directorio_actual = directorio
-        self.archivos_pdf = [
-            f for f in os.listdir(directorio)
-            if f.lower().endswith(".pdf")
-        ]
-        self.archivos_pdf.sort()
+        if self.vigilante:
+            self.vigilante.cerrar()
+        self.vigilante = VigilanteCarpeta(directorio, [".pdf"])
+        self.ignorar_archivos.clear()
+        self.todos_los_pdf = sorted(self.vigilante.nombres())
+        self.archivos_pdf = list(self.todos_los_pdf)
+        self.entry_busqueda.delete(0, tk.END)
+        self.label_busqueda.config(text="")
+        self.busqueda_activa = False
 
         if not self.archivos_pdf:
             messagebox.showinfo("Sin PDFs", "No se encontraron PDFs en la carpeta.")
@@ -220,13 +513,183 @@ class ValidadorMasivoPDF(tk.Tk):
         self.current_page = 0
         self.mostrar_pagina_actual()
 
+        if self.indice_texto:
+            self.indice_texto.cerrar()
+        try:
+            self.indice_texto = IndiceTexto(directorio, num_workers=self.num_workers)
+        except Exception as e:
+            logging.warning(f"No se pudo crear el índice de texto en {directorio}: {e}")
+            self.indice_texto = None
+
+        # Indexar texto y extraer datos de toda la carpeta en segundo plano, para que
+        # la búsqueda y las sugerencias de la vista detallada estén listas
+        threading.Thread(
+            target=self.preparar_carpeta,
+            args=(directorio, list(self.todos_los_pdf), self.indice_texto),
+            daemon=True
+        ).start()
+
+    def preparar_carpeta(self, directorio, nombres_pdf, indice_texto):
+        """
+        Actualiza el índice de texto y llena la caché de extracción.
+        Se corta si el usuario cambia de carpeta.
+        """
+        if indice_texto:
+            try:
+                indice_texto.actualizar(nombres_pdf)
+            except Exception as e:
+                logging.warning(f"Falló la indexación de {directorio}: {e}")
+
+        rutas = [os.path.join(directorio, f) for f in nombres_pdf]
+        for _ in self.extractor.extraer_carpeta(rutas):
+            if self.directorio_actual != directorio:
+                break
+
+    # -------------------- VIGILANCIA DE LA CARPETA --------------------
+    def revisar_carpeta(self):
+        """
+        Consulta periódicamente el vigilante y aplica los cambios a las listas.
+        """
+        try:
+            if self.vigilante:
+                eventos = [
+                    ev for ev in self.vigilante.sondear()
+                    if ev.nombre not in self.ignorar_archivos and ev.nombre_nuevo not in self.ignorar_archivos
+                ]
+                if eventos:
+                    self.aplicar_cambios_carpeta(eventos)
+        except Exception as e:
+            logging.error(f"Error al aplicar los cambios de la carpeta: {e}")
+        finally:
+            # Un error no puede dejar la carpeta sin vigilar por el resto de la sesión
+            self.after(self.intervalo_vigilancia_ms, self.revisar_carpeta)
+
+    @staticmethod
+    def _quitar_ordenado(lista, nombre):
+        i = bisect_left(lista, nombre)
+        if i < len(lista) and lista[i] == nombre:
+            del lista[i]
+            return True
+        return False
+
+    def aplicar_cambios_carpeta(self, eventos):
+        """
+        Corrige en el lugar las listas, las cachés y el índice según los eventos,
+        y sólo redibuja si cambió la página que se está viendo.
+        """
+        # Con una búsqueda activa, los archivos nuevos no se suman a la lista filtrada
+        filtrando = self.busqueda_activa
+        pagina_antes = self.pdfs_de_pagina(self.current_page)
+        tocados = set()
+        a_indexar = []
+
+        for ev in eventos:
+            if ev.tipo == "agregado":
+                if self._quitar_ordenado(self.todos_los_pdf, ev.nombre):
+                    # Ya estaba: se trata como modificado
+                    self.motor_render.invalidar(os.path.join(self.directorio_actual, ev.nombre))
+                insort(self.todos_los_pdf, ev.nombre)
+                if not filtrando:
+                    self._quitar_ordenado(self.archivos_pdf, ev.nombre)
+                    insort(self.archivos_pdf, ev.nombre)
+                a_indexar.append(ev.nombre)
+
+            elif ev.tipo == "eliminado":
+                self._quitar_ordenado(self.todos_los_pdf, ev.nombre)
+                self._quitar_ordenado(self.archivos_pdf, ev.nombre)
+                self.motor_render.invalidar(os.path.join(self.directorio_actual, ev.nombre))
+                if self.indice_texto:
+                    self.indice_texto.quitar(ev.nombre)
+
+            elif ev.tipo == "renombrado":
+                estaba = self._quitar_ordenado(self.todos_los_pdf, ev.nombre)
+                # Si el destino ya existía, el renombre lo reemplazó
+                if self._quitar_ordenado(self.todos_los_pdf, ev.nombre_nuevo):
+                    self._quitar_ordenado(self.archivos_pdf, ev.nombre_nuevo)
+                    self.motor_render.invalidar(os.path.join(self.directorio_actual, ev.nombre_nuevo))
+                insort(self.todos_los_pdf, ev.nombre_nuevo)
+                if self._quitar_ordenado(self.archivos_pdf, ev.nombre) or not filtrando:
+                    insort(self.archivos_pdf, ev.nombre_nuevo)
+                self.motor_render.invalidar(os.path.join(self.directorio_actual, ev.nombre))
+                if estaba and self.indice_texto:
+                    self.indice_texto.renombrar(ev.nombre, ev.nombre_nuevo)
+                elif not estaba:
+                    a_indexar.append(ev.nombre_nuevo)
+
+            elif ev.tipo == "modificado":
+                self.motor_render.invalidar(os.path.join(self.directorio_actual, ev.nombre))
+                tocados.add(ev.nombre)
+                a_indexar.append(ev.nombre)
+
+        logging.info(f"Cambios en la carpeta: {len(eventos)} eventos.")
+
+        max_page = max(0, (len(self.archivos_pdf) - 1) // self.pdfs_per_page)
+        self.current_page = min(self.current_page, max_page)
+        pagina_despues = self.pdfs_de_pagina(self.current_page)
+        if pagina_despues != pagina_antes or tocados.intersection(pagina_despues):
+            self.mostrar_pagina_actual()
+        else:
+            self.label_paginacion.config(text=f"Página {self.current_page+1} / {max_page+1}")
+
+        if a_indexar:
+            threading.Thread(
+                target=self.preparar_archivos,
+                args=(self.directorio_actual, a_indexar, self.indice_texto),
+                daemon=True
+            ).start()
+
+    def preparar_archivos(self, directorio, nombres_pdf, indice_texto):
+        """
+        Indexa y extrae datos sólo de los archivos nuevos o modificados.
+        """
+        if indice_texto:
+            try:
+                indice_texto.actualizar(nombres_pdf, borrar_ausentes=False)
+            except Exception as e:
+                logging.warning(f"Falló la indexación de {nombres_pdf}: {e}")
+        for _ in self.extractor.extraer_carpeta(os.path.join(directorio, f) for f in nombres_pdf):
+            pass
+
+    # -------------------- BÚSQUEDA --------------------
+    def buscar_texto(self):
+        """
+        Filtra la lista de PDFs a los que contienen el texto buscado.
+        """
+        texto = self.entry_busqueda.get().strip()
+        if not texto:
+            self.limpiar_busqueda()
+            return
+        if not self.indice_texto:
+            messagebox.showwarning("Búsqueda", "No hay un índice de texto para esta carpeta.")
+            return
+
+        self.archivos_pdf = self.indice_texto.filtrar(self.todos_los_pdf, texto)
+        self.busqueda_activa = True
+        self.label_busqueda.config(text=f"{len(self.archivos_pdf)} de {len(self.todos_los_pdf)} PDFs")
+        self.current_page = 0
+        if self.archivos_pdf:
+            self.mostrar_pagina_actual()
+        else:
+            self.lista_paginas.establecer_items([], [])
+            self.label_paginacion.config(text="Página 0 / 0")
+
+    def limpiar_busqueda(self):
+        self.entry_busqueda.delete(0, tk.END)
+        self.label_busqueda.config(text="")
+        self.archivos_pdf = list(self.todos_los_pdf)
+        self.busqueda_activa = False
+        self.current_page = 0
+        if self.archivos_pdf:
+            self.mostrar_pagina_actual()
+
     def abrir_vista_detallada(self, ruta_pdf, page_index):
         """
         Abre una ventana con zoom y scroll, ofreciendo renombrado y extracción de páginas.
         """
         try:
-            doc = fitz.open(ruta_pdf)
-            page = doc[page_index]
+            with trazas.tramo("detalle.abrir", archivo=ruta_pdf, pagina=page_index):
+                doc = fitz.open(ruta_pdf)
+                page = doc[page_index]
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir la página:\n{e}")
             return
@@ -235,63 +698,85 @@ class ValidadorMasivoPDF(tk.Tk):
         vent_detail.title(f"Vista detallada: {os.path.basename(ruta_pdf)} - Página {page_index+1}")
         vent_detail.geometry("900x700")
 
-        frame_princ = ttk.Frame(vent_detail)
-        frame_princ.pack(fill=tk.BOTH, expand=True)
-
-        canvas_detalle = tk.Canvas(frame_princ, bg="white")
-        canvas_detalle.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
-
-        scrollbar_det_y = ttk.Scrollbar(frame_princ, orient=tk.VERTICAL, command=canvas_detalle.yview)
-        scrollbar_det_y.pack(side=tk.RIGHT, fill=tk.Y)
-
-        scrollbar_det_x = ttk.Scrollbar(vent_detail, orient=tk.HORIZONTAL, command=canvas_detalle.xview)
-        scrollbar_det_x.pack(side=tk.BOTTOM, fill=tk.X)
-
-        canvas_detalle.configure(
-            xscrollcommand=scrollbar_det_x.set,
-            yscrollcommand=scrollbar_det_y.set,
-            scrollregion=(0,0,0,0)
-        )
-
-        detail_matrix = fitz.Matrix(1.5, 1.5)  # Zoom de 150%
-        pix = page.get_pixmap(matrix=detail_matrix)
-        img = tk.PhotoImage(data=pix.tobytes("ppm"))
+        # El frame inferior se empaqueta primero para que no lo tape la vista al achicar la ventana
+        frame_inferior = ttk.Frame(vent_detail)
+        frame_inferior.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=5)
 
-        canvas_detalle.create_image(0, 0, anchor=tk.NW, image=img)
-        canvas_detalle.image = img
-        canvas_detalle.config(scrollregion=(0, 0, img.width(), img.height()))
+        # Sólo se renderiza lo visible, por teselas, al zoom actual (Ctrl + rueda o +/-)
+        vista = VistaPaginaZoom(vent_detail, page)
+        vista.pack(fill=tk.BOTH, expand=True)
 
-        def _on_mousewheel(event):
-            canvas_detalle.yview_scroll(int(-1*(event.delta/120)), "units")
+        def cerrar_detalle():
+            vista.cerrar()
+            doc.close()
+            vent_detail.destroy()
 
-        canvas_detalle.bind_all("<MouseWheel>", _on_mousewheel)
+        vent_detail.protocol("WM_DELETE_WINDOW", cerrar_detalle)
 
-        frame_inferior = ttk.Frame(vent_detail)
-        frame_inferior.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=5)
+        # Zoom
+        ttk.Button(frame_inferior, text="-", width=3, command=lambda: vista.cambiar_zoom(-1)).pack(side=tk.LEFT)
+        label_zoom = ttk.Label(frame_inferior, text=f"{vista.zoom:.0%}", width=6, anchor=tk.CENTER)
+        label_zoom.pack(side=tk.LEFT)
+        ttk.Button(frame_inferior, text="+", width=3, command=lambda: vista.cambiar_zoom(1)).pack(side=tk.LEFT, padx=(0,10))
+        vista.al_cambiar_zoom = lambda zoom: label_zoom.config(text=f"{zoom:.0%}")
 
         # Renombrar con fecha
         ttk.Label(frame_inferior, text="Fecha (ej. 2023-08-15):").pack(side=tk.LEFT, padx=(0,5))
         entry_fecha = ttk.Entry(frame_inferior, width=20)
         entry_fecha.pack(side=tk.LEFT, padx=5)
 
-        def renombrar_con_fecha():
+        # Prellenar con lo que se encontró en el texto del PDF
+        try:
+            sugerencias = self.extractor.sugerencias(ruta_pdf)
+        except Exception as e:
+            logging.warning(f"No se pudieron extraer datos de {ruta_pdf}: {e}")
+            sugerencias = {}
+        if sugerencias.get("fechas"):
+            entry_fecha.insert(0, sugerencias["fechas"][0])
+        detalles = []
+        if sugerencias.get("numeros"):
+            detalles.append(f"Nro: {sugerencias['numeros'][0]}")
+        if sugerencias.get("cuits"):
+            detalles.append(f"CUIT: {sugerencias['cuits'][0]}")
+        if detalles:
+            ttk.Label(frame_inferior, text=" | ".join(detalles)).pack(side=tk.RIGHT, padx=5)
+
+        def leer_fecha():
             fecha = entry_fecha.get().strip()
             if not fecha:
                 messagebox.showwarning("Advertencia", "Ingrese la fecha.")
-                return
-            # Reemplazar caracteres no permitidos en Windows
-            fecha = re.sub(r'[<>:"/\\|?*]', '_', fecha)
+                return None
+            return fecha
 
+        def renombrar_con_fecha():
+            fecha = leer_fecha()
+            if not fecha:
+                return
+            vista.cerrar()
             doc.close()
             self.renombrar_pdf(ruta_pdf, fecha)
             vent_detail.destroy()
 
+        def encolar_con_fecha():
+            fecha = leer_fecha()
+            if not fecha:
+                return
+            self.encolar_renombre(ruta_pdf, fecha)
+            cerrar_detalle()
+
         ttk.Button(
             frame_inferior,
             text="Renombrar PDF con fecha",
             command=renombrar_con_fecha
         ).pack(side=tk.LEFT, padx=5)
 
+        # Encolar: se renombra después, junto con los demás, con "Aplicar Renombres"
+        ttk.Button(
+            frame_inferior,
+            text="Encolar",
+            command=encolar_con_fecha
+        ).pack(side=tk.LEFT, padx=5)
+
         # Extraer páginas
         ttk.Button(
             frame_inferior,
@@ -301,127 +786,365 @@ class ValidadorMasivoPDF(tk.Tk):
 
     def extraer_paginas(self, doc_original, ruta_pdf):
         """
-        Abre un cuadro para ingresar el rango de páginas a extraer y genera un nuevo PDF.
+        Abre el cuadro de división para el PDF de la vista detallada.
         """
-        vent_extract = tk.Toplevel(self)
-        vent_extract.title("Extraer páginas")
-        vent_extract.geometry("300x150")
+        self.dialogo_division([ruta_pdf], len(doc_original))
 
-        ttk.Label(vent_extract, text="Rango de páginas (ej. '1-3' o '5'):").pack(pady=5)
-        entry_rango = ttk.Entry(vent_extract, width=15)
-        entry_rango.pack(pady=5)
+    def dividir_carpeta(self):
+        """
+        Abre el cuadro de división para todos los PDFs listados (respeta la búsqueda activa).
+        """
+        if not self.archivos_pdf:
+            messagebox.showinfo("Info", "No hay PDFs cargados.")
+            return
+        rutas = [os.path.join(self.directorio_actual, f) for f in self.archivos_pdf]
+        self.dialogo_division(rutas)
+
+    def dialogo_division(self, rutas_pdf, total_paginas=None):
+        """
+        Pide cómo dividir (rangos '1-3,5,8-', cada N páginas o una por página) y la
+        carpeta de destino. Con `total_paginas` el rango se valida antes de empezar.
+        """
+        vent_extract = tk.Toplevel(self)
+        vent_extract.title("Extraer páginas" if len(rutas_pdf) == 1 else f"Dividir {len(rutas_pdf)} PDFs")
+        vent_extract.geometry("340x220")
+
+        modo = tk.StringVar(value=MODO_RANGOS)
+        ttk.Radiobutton(vent_extract, text="Páginas (ej. '1-3,5,8-'):", variable=modo, value=MODO_RANGOS).pack(anchor=tk.W, padx=10, pady=(10,0))
+        entry_rango = ttk.Entry(vent_extract, width=20)
+        entry_rango.pack(anchor=tk.W, padx=30)
+        ttk.Radiobutton(vent_extract, text="Un archivo cada N páginas:", variable=modo, value=MODO_CADA).pack(anchor=tk.W, padx=10, pady=(5,0))
+        entry_cada = ttk.Entry(vent_extract, width=6)
+        entry_cada.pack(anchor=tk.W, padx=30)
+        ttk.Radiobutton(vent_extract, text="Un archivo por página", variable=modo, value=MODO_POR_PAGINA).pack(anchor=tk.W, padx=10, pady=5)
 
         def hacer_extraccion():
-            rango_texto = entry_rango.get().strip()
-            if not rango_texto:
-                messagebox.showerror("Error", "Debe especificar un rango de páginas.")
-                return
+            valor = {MODO_RANGOS: entry_rango.get().strip(), MODO_CADA: entry_cada.get().strip()}.get(modo.get())
+            # En lote sólo se puede validar el formato; los límites se revisan en cada PDF
             try:
-                if '-' in rango_texto:
-                    start_str, end_str = rango_texto.split('-')
-                    start_page = int(start_str) - 1
-                    end_page = int(end_str) - 1
-                    pages_list = list(range(start_page, end_page+1))
-                else:
-                    single_page = int(rango_texto) - 1
-                    pages_list = [single_page]
-            except ValueError:
-                messagebox.showerror("Error", "Formato inválido. Use '1-3' o '5'.")
+                if total_paginas is not None:
+                    planificar(total_paginas, modo.get(), valor)
+                elif modo.get() == MODO_RANGOS:
+                    parsear_rangos(valor, float("inf"))
+                elif modo.get() == MODO_CADA:
+                    planificar(1, MODO_CADA, valor)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
 
-            for p in pages_list:
-                if p < 0 or p >= len(doc_original):
-                    messagebox.showerror("Error", f"La página {p+1} está fuera de rango.")
-                    return
-            
             carpeta_destino = filedialog.askdirectory(title="Seleccionar carpeta de destino")
             if not carpeta_destino:
                 return
-            
-            splitted_doc = fitz.open()
-            for p in pages_list:
-                splitted_doc.insert_pdf(doc_original, from_page=p, to_page=p)
-            
-            base_original = os.path.splitext(os.path.basename(ruta_pdf))[0]
-            sub_name = f"{base_original}_pag_{rango_texto.replace('-', '_')}.pdf"
-            path_final = Path(carpeta_destino) / sub_name
-            c = 1
-            while path_final.exists():
-                path_final = Path(carpeta_destino) / f"{base_original}_pag_{rango_texto.replace('-', '_')}_{c}.pdf"
-                c += 1
-            
-            try:
-                splitted_doc.save(path_final)
-                splitted_doc.close()
-                messagebox.showinfo("Éxito", f"Se guardó la extracción en: {path_final.name}")
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo guardar el PDF:\n{str(e)}")
-
             vent_extract.destroy()
 
+            if len(rutas_pdf) == 1:
+                _, generadas, error = dividir_seguro(rutas_pdf[0], carpeta_destino, modo.get(), valor)
+                if error:
+                    messagebox.showerror("Error", f"No se pudo guardar el PDF:\n{error}")
+                elif len(generadas) == 1:
+                    messagebox.showinfo("Éxito", f"Se guardó la extracción en: {os.path.basename(generadas[0])}")
+                else:
+                    messagebox.showinfo("Éxito", f"Se generaron {len(generadas)} archivos en {carpeta_destino}")
+                return
+
+            # Muchos PDFs: en un pool de procesos, consultando el avance con after()
+            pool = ProcessPoolExecutor(max_workers=self.num_workers)
+            futures = [
+                pool.submit(dividir_seguro, ruta, carpeta_destino, modo.get(), valor)
+                for ruta in rutas_pdf
+            ]
+            self.seguir_division(pool, futures)
+
         ttk.Button(vent_extract, text="Extraer", command=hacer_extraccion).pack(pady=5)
 
+    def seguir_division(self, pool, futures):
+        """
+        Muestra el avance de una división en lote y el resumen al terminar.
+        """
+        hechos = sum(1 for fut in futures if fut.done())
+        self.actualizar_progreso("División", hechos, len(futures))
+        if hechos < len(futures):
+            self.after(200, self.seguir_division, pool, futures)
+            return
+        pool.shutdown(wait=False)
+
+        resultados = [fut.result() for fut in futures]
+        generadas = sum(len(r[1]) for r in resultados)
+        errores = [f"{os.path.basename(ruta)}: {error}" for ruta, _, error in resultados if error]
+        logging.info(f"División en lote: {generadas} archivos de {len(futures)} PDFs, {len(errores)} errores.")
+        mensaje = f"Se generaron {generadas} archivos a partir de {len(futures)} PDFs."
+        if errores:
+            mensaje += "\n\nNo se pudieron dividir:\n" + "\n".join(errores[:10])
+            if len(errores) > 10:
+                mensaje += f"\n... y {len(errores) - 10} más"
+        messagebox.showinfo("División", mensaje)
+
+    def buscar_duplicados(self):
+        """
+        Busca PDFs idénticos en segundo plano y ofrece moverlos a cuarentena.
+        """
+        if not self.directorio_actual:
+            messagebox.showinfo("Info", "Primero seleccione una carpeta.")
+            return
+        self.boton_duplicados.config(state=tk.DISABLED)
+        self.label_progreso.config(text="Buscando duplicados...")
+        pool = ThreadPoolExecutor(max_workers=1)
+        fut = pool.submit(duplicados.buscar_duplicados, self.directorio_actual, (".pdf",), self.num_workers)
+        pool.shutdown(wait=False)
+        self.after(200, self.mostrar_duplicados, fut, self.directorio_actual)
+
+    def mostrar_duplicados(self, fut, directorio):
+        if not fut.done():
+            self.after(200, self.mostrar_duplicados, fut, directorio)
+            return
+        self.boton_duplicados.config(state=tk.NORMAL)
+        self.label_progreso.config(text="")
+        try:
+            grupos = fut.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo buscar duplicados:\n{e}")
+            return
+        if not grupos:
+            messagebox.showinfo("Duplicados", "No se encontraron PDFs duplicados.")
+            return
+
+        cantidad = sum(len(g) - 1 for g in grupos)
+        texto = duplicados.reporte(grupos)
+        lineas = texto.splitlines()
+        if len(lineas) > 20:
+            texto = "\n".join(lineas[:20]) + f"\n... ({len(lineas) - 20} líneas más en el log)"
+        logging.info(f"Duplicados en {directorio}:\n{duplicados.reporte(grupos)}")
+
+        carpeta_cuarentena = os.path.join(directorio, duplicados.CARPETA_CUARENTENA)
+        if messagebox.askyesno(
+            "Duplicados",
+            f"Se encontraron {cantidad} duplicados en {len(grupos)} grupos:\n\n{texto}\n\n"
+            f"¿Mover los duplicados a '{duplicados.CARPETA_CUARENTENA}'?"
+        ):
+            movidos = duplicados.poner_en_cuarentena(grupos, carpeta_cuarentena)
+            messagebox.showinfo("Duplicados", f"Se movieron {len(movidos)} archivos a {carpeta_cuarentena}")
+
     def renombrar_pdf(self, ruta_pdf, fecha):
         """
         Renombra el PDF y luego lo quita de la lista para que no vuelva a aparecer.
+        También pasa por el diario de renombres, así se puede deshacer.
         """
-        dir_original = os.path.dirname(ruta_pdf)
-        nombre_original = os.path.basename(ruta_pdf)
-        base_name, ext = os.path.splitext(nombre_original)
+        if self.avisar_ya_renombrado(ruta_pdf, fecha):
+            return
+        carpeta_destino = filedialog.askdirectory(title="Seleccionar carpeta de destino para renombrar")
+        if not carpeta_destino:
+            return
+        self.aplicar_renombres([(ruta_pdf, renombrado.nombre_con_fecha(ruta_pdf, fecha))], carpeta_destino)
 
-        nuevo_nombre = f"{fecha}__{base_name}{ext}"
+    def encolar_renombre(self, ruta_pdf, fecha):
+        """
+        Agrega el PDF a la cola (reemplaza un renombre anterior del mismo archivo).
+        """
+        if self.avisar_ya_renombrado(ruta_pdf, fecha):
+            return
+        self.cola_renombres = [(r, n) for r, n in self.cola_renombres if r != ruta_pdf]
+        self.cola_renombres.append((ruta_pdf, renombrado.nombre_con_fecha(ruta_pdf, fecha)))
+        self.boton_cola.config(text=f"Aplicar Renombres ({len(self.cola_renombres)})")
 
+    def avisar_ya_renombrado(self, ruta_pdf, fecha):
+        """
+        Avisa y devuelve True si el nombre ya tiene la fecha antepuesta.
+        """
+        if not renombrado.ya_renombrado(ruta_pdf, fecha):
+            return False
+        messagebox.showinfo("Info", f"{os.path.basename(ruta_pdf)} ya tiene la fecha en el nombre.")
+        return True
+
+    def aplicar_cola_renombres(self):
+        if not self.cola_renombres:
+            messagebox.showinfo("Info", "No hay renombres en la cola.")
+            return
         carpeta_destino = filedialog.askdirectory(title="Seleccionar carpeta de destino para renombrar")
         if not carpeta_destino:
             return
+        cola, self.cola_renombres = self.cola_renombres, []
+        self.boton_cola.config(text="Aplicar Renombres (0)")
+        self.aplicar_renombres(cola, carpeta_destino)
 
-        ruta_nueva = Path(carpeta_destino) / nuevo_nombre
-
-        # Evitar colisiones
-        contador = 1
-        while ruta_nueva.exists():
-            ruta_nueva = Path(carpeta_destino) / f"{fecha}__{base_name}_{contador}{ext}"
-            contador += 1
+    def aplicar_renombres(self, pares, carpeta_destino):
+        """
+        Escribe el lote en el diario y lo aplica en segundo plano; la vista se
+        actualiza una sola vez al terminar.
+        """
+        pares = [(ruta, os.path.join(carpeta_destino, nombre)) for ruta, nombre in pares]
+        try:
+            ruta_diario = renombrado.crear_lote(pares, renombrado.DIRECTORIO_VISOR)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo crear el diario de renombres:\n{e}")
+            return
+        self.ejecutar_lote(renombrado.aplicar_lote, ruta_diario, "Renombrando...")
 
+    def ejecutar_lote(self, operacion, ruta_diario, texto):
+        """
+        Aplica o revierte un lote en un hilo aparte; `terminar_lote` actualiza la
+        vista y las validaciones al terminar. Los lotes que llegan mientras otro
+        está en curso esperan su turno.
+        """
+        if self.lote_en_curso:
+            self.lotes_en_espera.append((operacion, ruta_diario, texto))
+            return
+        self.lote_en_curso = True
+        if operacion is renombrado.aplicar_lote:
+            # Que el vigilante no los vuelva a agregar si el destino es la misma carpeta
+            for renombre in renombrado.leer_lote(ruta_diario).renombres:
+                self.ignorar_archivos.update((os.path.basename(renombre.origen), os.path.basename(renombre.destino)))
+        self.boton_cola.config(state=tk.DISABLED)
+        self.boton_deshacer.config(state=tk.DISABLED)
+        self.label_progreso.config(text=texto)
+        pool = ThreadPoolExecutor(max_workers=1)
+        fut = pool.submit(operacion, ruta_diario)
+        pool.shutdown(wait=False)
+        self.after(100, self.terminar_lote, fut, operacion)
+
+    def terminar_lote(self, fut, operacion):
+        if not fut.done():
+            self.after(100, self.terminar_lote, fut, operacion)
+            return
         try:
-            os.rename(ruta_pdf, ruta_nueva)
-            messagebox.showinfo("Éxito", f"Archivo renombrado a: {ruta_nueva.name}")
-            logging.info(f"Renombrado: {ruta_pdf} -> {ruta_nueva}")
-
-            # --- Eliminar de la vista ---
-            # 1) Quitar de self.archivos_pdf
-            if nombre_original in self.archivos_pdf:
-                self.archivos_pdf.remove(nombre_original)
-
-            # 2) Eliminar las entradas en datos_paginas que apunten a la ruta original
-            self.datos_paginas = [
-                info for info in self.datos_paginas
-                if info["ruta_pdf"] != ruta_pdf
-            ]
+            self.mostrar_resultado_lote(fut, operacion)
+        finally:
+            self.lote_en_curso = False
+            if self.lotes_en_espera:
+                self.ejecutar_lote(*self.lotes_en_espera.pop(0))
+
+    def mostrar_resultado_lote(self, fut, operacion):
+        self.boton_cola.config(state=tk.NORMAL)
+        self.boton_deshacer.config(state=tk.NORMAL)
+        self.label_progreso.config(text="")
+        try:
+            hechos, errores = fut.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo completar el lote de renombres:\n{e}")
+            return
 
-            # 3) Refrescar la interfaz
+        # Las validaciones siguen al archivo (al renombrar y al revertir)
+        for anterior, nueva in hechos:
+            self.validaciones.renombrar(anterior, nueva)
+
+        if operacion is renombrado.revertir_lote:
+            # Los originales vuelven: se dejan de ignorar los dos nombres y se suman a
+            # la vista acá, sin esperar al vigilante (pudo sondear durante la reversión)
+            for destino, origen in hechos:
+                self.ignorar_archivos.discard(os.path.basename(destino))
+                self.ignorar_archivos.discard(os.path.basename(origen))
+            self.agregar_a_la_vista([origen for _, origen in hechos])
+            mensaje = f"Se revirtieron {len(hechos)} renombres."
+        else:
+            self.quitar_de_la_vista([origen for origen, _ in hechos])
+            if len(hechos) == 1:
+                mensaje = f"Archivo renombrado a: {os.path.basename(hechos[0][1])}"
+            else:
+                mensaje = f"Se renombraron {len(hechos)} archivos."
+
+        if errores:
+            mensaje += "\n\nNo se pudieron procesar:\n" + "\n".join(
+                f"{os.path.basename(ruta)}: {error}" for ruta, error in errores[:10]
+            )
+            if len(errores) > 10:
+                mensaje += f"\n... y {len(errores) - 10} más"
+            messagebox.showwarning("Renombres", mensaje)
+        else:
+            messagebox.showinfo("Éxito", mensaje)
+
+    def quitar_de_la_vista(self, rutas):
+        """
+        Quita los PDFs renombrados de las listas, el índice y la página actual.
+        """
+        if not rutas:
+            return
+        rutas = set(rutas)
+        for ruta_pdf in rutas:
+            self.motor_render.invalidar(ruta_pdf)
+            if self.directorio_actual and os.path.abspath(os.path.dirname(ruta_pdf)) == os.path.abspath(self.directorio_actual):
+                nombre = os.path.basename(ruta_pdf)
+                self._quitar_ordenado(self.archivos_pdf, nombre)
+                self._quitar_ordenado(self.todos_los_pdf, nombre)
+                if self.indice_texto:
+                    self.indice_texto.quitar(nombre)
+
+        self.datos_paginas = [
+            info for info in self.datos_paginas
+            if os.path.abspath(info["ruta_pdf"]) not in rutas
+        ]
+
+        max_page = max(0, (len(self.archivos_pdf) - 1) // self.pdfs_per_page)
+        self.current_page = min(self.current_page, max_page)
+        if self.archivos_pdf:
             self.mostrar_pagina_actual()
+        else:
+            self.lista_paginas.establecer_items([], [])
+            self.label_paginacion.config(text="Página 0 / 0")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo renombrar:\n{e}")
+    def agregar_a_la_vista(self, rutas):
+        """
+        Suma a las listas los PDFs que aparecieron en la carpeta actual.
+        """
+        if not self.directorio_actual:
+            return
+        carpeta = os.path.abspath(self.directorio_actual)
+        eventos = [
+            EventoCarpeta("agregado", os.path.basename(ruta), None) for ruta in rutas
+            if os.path.abspath(os.path.dirname(ruta)) == carpeta and ruta.lower().endswith(".pdf")
+        ]
+        if eventos:
+            self.aplicar_cambios_carpeta(eventos)
+
+    def deshacer_ultimo_lote(self):
+        lotes = renombrado.lotes(renombrado.DIRECTORIO_VISOR)
+        if not lotes:
+            messagebox.showinfo("Info", "No hay lotes de renombres para deshacer.")
+            return
+        estado = renombrado.leer_lote(lotes[0])
+        if not estado.hechos:
+            messagebox.showinfo("Info", "El último lote no tiene renombres aplicados.")
+            return
+        if messagebox.askyesno(
+            "Deshacer",
+            f"¿Revertir los {len(estado.hechos)} renombres del lote del {estado.creado}?"
+        ):
+            self.ejecutar_lote(renombrado.revertir_lote, lotes[0], "Revirtiendo...")
+
+    def revisar_lotes_pendientes(self):
+        """
+        Ofrece continuar o revertir los lotes que se cortaron (por ejemplo, al cerrarse
+        la aplicación o apagarse la máquina en medio de un renombre masivo).
+        """
+        for estado in renombrado.lotes_pendientes(renombrado.DIRECTORIO_VISOR):
+            respuesta = messagebox.askyesnocancel(
+                "Renombres pendientes",
+                f"El lote del {estado.creado} quedó incompleto: {len(estado.hechos)} de "
+                f"{len(estado.renombres)} archivos renombrados.\n\n"
+                "Sí: continuar   No: revertir   Cancelar: decidir más tarde"
+            )
+            if respuesta is None:
+                continue
+            if respuesta:
+                self.ejecutar_lote(renombrado.aplicar_lote, estado.ruta, "Renombrando...")
+            else:
+                self.ejecutar_lote(renombrado.revertir_lote, estado.ruta, "Revirtiendo...")
 
     def guardar_validaciones(self):
         """
-        Guarda info de checks y observaciones en 'validaciones.txt'.
+        Las validaciones se guardan solas; esto fuerza el guardado y exporta las de
+        todos los PDFs de la carpeta a 'validaciones.txt'.
         """
-        if not self.datos_paginas:
+        if not self.directorio_actual:
             messagebox.showinfo("Info", "No hay datos de páginas para guardar.")
             return
 
-        with open("validaciones.txt", "w", encoding="utf-8") as f:
-            for info in self.datos_paginas:
-                check_str = "OK" if info["check_var"].get() else "NO"
-                txt_obs = info["entry_widget"].get()
-                linea = f"{info['pdf_name']} | Página {info['pag_index']+1} | Val={check_str} | Obs={txt_obs}\n"
-                f.write(linea)
-        
-        messagebox.showinfo("Validaciones", "Se guardaron las validaciones en 'validaciones.txt'.")
+        rutas = [os.path.join(self.directorio_actual, f) for f in self.todos_los_pdf]
+        try:
+            lineas = self.validaciones.exportar("validaciones.txt", rutas)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo escribir 'validaciones.txt':\n{e}")
+            return
 
+        messagebox.showinfo("Validaciones", f"Se guardaron {lineas} validaciones en 'validaciones.txt'.")
 
 if __name__ == "__main__":
     app = ValidadorMasivoPDF()
@@ -0,0 +1,262 @@
+import time
+import math
+import logging
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from pdfmoificador import trazas
+from pdfmoificador.dependencias import fitz
+
+
+NIVELES_ZOOM = (0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0)
+ZOOM_INICIAL = 1.5
+TAM_TESELA = 512
+# La pasada rápida se renderiza a esta fracción del zoom y se amplía
+FACTOR_BAJA_RESOLUCION = 0.25
+TOPE_TESELAS = 128 * 1024 * 1024  # 128 MB de teselas nítidas
+
+
+def clip_tesela(rect_pagina, zoom, columna, fila):
+    """
+    Rectángulo de la tesela (columna, fila) al zoom dado, en coordenadas de la
+    página (sin zoom). Las teselas del borde se recortan al tamaño de la página.
+    """
+    x0, y0 = columna * TAM_TESELA / zoom, fila * TAM_TESELA / zoom
+    return fitz.Rect(
+        rect_pagina.x0 + x0,
+        rect_pagina.y0 + y0,
+        rect_pagina.x0 + min(x0 + TAM_TESELA / zoom, rect_pagina.width),
+        rect_pagina.y0 + min(y0 + TAM_TESELA / zoom, rect_pagina.height),
+    )
+
+
+class VistaPaginaZoom(ttk.Frame):
+    """
+    Muestra una página de PDF con zoom renderizando sólo lo visible.
+
+    La página se divide en teselas de TAM_TESELA píxeles al zoom actual y cada una
+    se renderiza con `clip` desde la display list de la página (que se arma una sola
+    vez). Primero se muestra una versión borrosa, barata, y las nítidas se
+    renderizan de a poco con `after()` sin pasarse de `presupuesto_ms` por tick.
+    Las nítidas se guardan por nivel de zoom en un LRU limitado por bytes.
+    """
+
+    def __init__(self, master, page, zoom=ZOOM_INICIAL, presupuesto_ms=30, tope_bytes=TOPE_TESELAS, **kwargs):
+        super().__init__(master, **kwargs)
+        with trazas.tramo("detalle.displaylist", archivo=page.parent.name, pagina=page.number):
+            self.lista_pagina = page.get_displaylist()
+        self.archivo = page.parent.name
+        self.rect_pagina = page.rect
+        self.zoom = zoom
+        self.presupuesto_ms = presupuesto_ms
+        self.tope_bytes = tope_bytes
+        self.al_cambiar_zoom = None
+
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=0)
+        scroll_y = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._yview)
+        scroll_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self._xview)
+        self.canvas.configure(xscrollcommand=scroll_x.set, yscrollcommand=scroll_y.set)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # (zoom, columna, fila) -> PhotoImage nítida, la menos usada primero
+        self._nitidas = OrderedDict()
+        self._bytes_nitidas = 0
+        # (columna, fila) -> (id del item, PhotoImage, es_nitida) del zoom actual
+        self._items = {}
+        self._pendientes = []  # Teselas visibles que todavía están borrosas
+        self._trabajo = None
+        self._refresco_pendiente = False
+
+        # La rueda se asocia sólo a este canvas (no con bind_all, que afecta a toda la aplicación)
+        self.canvas.bind("<Configure>", lambda e: self.refrescar())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self._on_shift_mousewheel)
+        self.canvas.bind("<Control-MouseWheel>", self._on_zoom_rueda)
+        self.canvas.bind("<Button-4>", lambda e: self._desplazar(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._desplazar(1))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.cambiar_zoom(1, e.x, e.y))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.cambiar_zoom(-1, e.x, e.y))
+        self.canvas.bind("<plus>", lambda e: self.cambiar_zoom(1))
+        self.canvas.bind("<minus>", lambda e: self.cambiar_zoom(-1))
+        self.canvas.focus_set()
+        self.bind("<Destroy>", lambda e: self.cerrar() if e.widget is self else None)
+
+        self._configurar_region()
+
+    # -------------------- ZOOM --------------------
+    def _tamano(self):
+        return (
+            math.ceil(self.rect_pagina.width * self.zoom),
+            math.ceil(self.rect_pagina.height * self.zoom),
+        )
+
+    def _configurar_region(self):
+        for item, _, _ in self._items.values():
+            self.canvas.delete(item)
+        self._items.clear()
+        self._pendientes = []
+        ancho, alto = self._tamano()
+        self.canvas.configure(scrollregion=(0, 0, ancho, alto))
+
+    def cambiar_zoom(self, paso, x=None, y=None):
+        """
+        Pasa al nivel de zoom siguiente (paso 1) o anterior (paso -1) dejando
+        el punto (x, y) de la ventana sobre el mismo lugar de la página.
+        """
+        if self.lista_pagina is None:
+            return
+        actual = min(range(len(NIVELES_ZOOM)), key=lambda i: abs(NIVELES_ZOOM[i] - self.zoom))
+        nuevo = min(max(actual + paso, 0), len(NIVELES_ZOOM) - 1)
+        if NIVELES_ZOOM[nuevo] == self.zoom:
+            return
+        if x is None:
+            x, y = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        ancho, alto = self._tamano()
+        fx = self.canvas.canvasx(x) / ancho
+        fy = self.canvas.canvasy(y) / alto
+
+        self.zoom = NIVELES_ZOOM[nuevo]
+        self._configurar_region()
+        ancho, alto = self._tamano()
+        self.canvas.xview_moveto((fx * ancho - x) / ancho)
+        self.canvas.yview_moveto((fy * alto - y) / alto)
+        self.refrescar()
+        if self.al_cambiar_zoom:
+            self.al_cambiar_zoom(self.zoom)
+
+    # -------------------- DESPLAZAMIENTO --------------------
+    def _xview(self, *args):
+        self.canvas.xview(*args)
+        self.refrescar()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.refrescar()
+
+    def _desplazar(self, unidades, horizontal=False):
+        if horizontal:
+            self.canvas.xview_scroll(unidades, "units")
+        else:
+            self.canvas.yview_scroll(unidades, "units")
+        self.refrescar()
+
+    def _on_mousewheel(self, event):
+        self._desplazar(int(-1*(event.delta/120)))
+
+    def _on_shift_mousewheel(self, event):
+        self._desplazar(int(-1*(event.delta/120)), horizontal=True)
+
+    def _on_zoom_rueda(self, event):
+        self.cambiar_zoom(1 if event.delta > 0 else -1, event.x, event.y)
+
+    # -------------------- TESELAS --------------------
+    def refrescar(self):
+        # Agrupar varios eventos de scroll en un solo refresco
+        if not self._refresco_pendiente:
+            self._refresco_pendiente = True
+            self.after_idle(self._refrescar)
+
+    def _teselas_visibles(self):
+        ancho, alto = self._tamano()
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        x1 = min(x0 + self.canvas.winfo_width(), ancho - 1)
+        y1 = min(y0 + self.canvas.winfo_height(), alto - 1)
+        columnas = range(max(0, int(x0 // TAM_TESELA)), int(x1 // TAM_TESELA) + 1)
+        filas = range(max(0, int(y0 // TAM_TESELA)), int(y1 // TAM_TESELA) + 1)
+        return [(c, f) for f in filas for c in columnas]
+
+    def _renderizar(self, columna, fila, zoom):
+        clip = clip_tesela(self.rect_pagina, self.zoom, columna, fila)
+        pix = self.lista_pagina.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+        return pix, clip
+
+    def _refrescar(self):
+        self._refresco_pendiente = False
+        if self.lista_pagina is None:
+            return
+        visibles = self._teselas_visibles()
+        conjunto = set(visibles)
+
+        for posicion in [p for p in self._items if p not in conjunto]:
+            self.canvas.delete(self._items.pop(posicion)[0])
+
+        for columna, fila in visibles:
+            if (columna, fila) in self._items:
+                continue
+            foto = self._nitidas.get((self.zoom, columna, fila))
+            if foto is not None:
+                self._nitidas.move_to_end((self.zoom, columna, fila))
+                self._colocar(columna, fila, foto, True)
+                continue
+            # Pasada rápida: la tesela a baja resolución, ampliada al tamaño final
+            try:
+                with trazas.tramo("detalle.borrosa", archivo=self.archivo, zoom=self.zoom):
+                    pix, clip = self._renderizar(columna, fila, self.zoom * FACTOR_BAJA_RESOLUCION)
+                    ancho = max(1, round(clip.width * self.zoom))
+                    alto = max(1, round(clip.height * self.zoom))
+                    pix = fitz.Pixmap(pix, ancho, alto, None)
+                    self._colocar(columna, fila, tk.PhotoImage(data=pix.tobytes("ppm")), False)
+            except Exception as e:
+                logging.warning(f"Falló la vista rápida de la tesela {columna},{fila}: {e}")
+
+        # Las nítidas pendientes, en el orden en que aparecen en pantalla
+        self._pendientes = [p for p in visibles if p in self._items and not self._items[p][2]]
+        if self._pendientes and self._trabajo is None:
+            self._trabajo = self.after(1, self._procesar_pendientes)
+
+    def _colocar(self, columna, fila, foto, nitida):
+        anterior = self._items.pop((columna, fila), None)
+        item = self.canvas.create_image(columna * TAM_TESELA, fila * TAM_TESELA, anchor=tk.NW, image=foto)
+        if anterior is not None:
+            self.canvas.delete(anterior[0])
+        self._items[(columna, fila)] = (item, foto, nitida)
+
+    def _procesar_pendientes(self):
+        """
+        Renderiza teselas nítidas hasta agotar el presupuesto del tick.
+        """
+        self._trabajo = None
+        if self.lista_pagina is None:
+            return
+        limite = time.perf_counter() + self.presupuesto_ms / 1000
+        while self._pendientes and time.perf_counter() < limite:
+            columna, fila = self._pendientes.pop(0)
+            if (columna, fila) not in self._items:
+                continue
+            try:
+                with trazas.tramo("detalle.rasterizar", archivo=self.archivo, zoom=self.zoom):
+                    pix, _ = self._renderizar(columna, fila, self.zoom)
+                with trazas.tramo("detalle.convertir", archivo=self.archivo, zoom=self.zoom):
+                    foto = tk.PhotoImage(data=pix.tobytes("ppm"))
+            except Exception as e:
+                logging.warning(f"Falló el renderizado de la tesela {columna},{fila}: {e}")
+                continue
+            self._guardar_nitida((self.zoom, columna, fila), foto)
+            self._colocar(columna, fila, foto, True)
+        if self._pendientes:
+            self._trabajo = self.after(1, self._procesar_pendientes)
+
+    def _guardar_nitida(self, clave, foto):
+        self._nitidas[clave] = foto
+        # Tk guarda las imágenes a 4 bytes por píxel
+        self._bytes_nitidas += foto.width() * foto.height() * 4
+        visibles = {(self.zoom,) + p for p in self._items}
+        for vieja in list(self._nitidas):
+            if self._bytes_nitidas <= self.tope_bytes:
+                break
+            if vieja in visibles:
+                continue
+            f = self._nitidas.pop(vieja)
+            self._bytes_nitidas -= f.width() * f.height() * 4
+
+    def cerrar(self):
+        """
+        Deja de renderizar (hay que llamarlo antes de cerrar el documento).
+        """
+        if self._trabajo is not None:
+            self.after_cancel(self._trabajo)
+            self._trabajo = None
+        self._pendientes = []
+        self.lista_pagina = None